@@ -3,10 +3,16 @@ Agentic meal parsing system
 Processes meal descriptions to extract food items, quantities, and macronutrients
 """
 
-import json
-from typing import Optional
+import asyncio
+import time
+from typing import AsyncIterator, Optional
 from pydantic import BaseModel
+from app.core.json_parsing import IncrementalJSONArrayParser, extract_json
 from app.core.llm_service import LLMService
+from app.core.metrics import metrics
+from app.core.settings import settings
+from app.agents.parse_cache import ParseCache, get_parse_cache
+from app.agents.rule_parser import RuleBasedMealParser
 
 
 class FoodItemParsed(BaseModel):
@@ -16,6 +22,7 @@ class FoodItemParsed(BaseModel):
     unit: str
     estimated_calories: Optional[float] = None
     confidence_score: float  # 0.0-1.0
+    macronutrients: Optional[dict] = None  # Set by the combined prompt
 
 
 class MealParseResult(BaseModel):
@@ -25,12 +32,67 @@ class MealParseResult(BaseModel):
     requires_verification: bool  # True if any item has low confidence
 
 
+_MACRO_PROPERTIES = {
+    "protein_grams": {"type": "number"},
+    "carbs_grams": {"type": "number"},
+    "fat_grams": {"type": "number"},
+    "fiber_grams": {"type": "number"},
+    "sugar_grams": {"type": "number"},
+    "sodium_mg": {"type": "number"}
+}
+
+_ITEM_PROPERTIES = {
+    "food_name": {"type": "string"},
+    "quantity": {"type": "number"},
+    "unit": {
+        "type": "string",
+        "enum": ["GRAMS", "ML", "CUPS", "PIECES", "OUNCES", "TABLESPOONS", "TEASPOONS"]
+    },
+    "estimated_calories": {"type": "number"},
+    "confidence_score": {"type": "number"}
+}
+
+
 class MealParsingAgent:
     """Agent for parsing meal descriptions into structured data"""
     
     # Standard units
     VALID_UNITS = ["GRAMS", "ML", "CUPS", "PIECES", "OUNCES", "TABLESPOONS", "TEASPOONS"]
     
+    # Response schemas passed to providers with structured output
+    PARSING_SCHEMA = {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": _ITEM_PROPERTIES,
+            "required": list(_ITEM_PROPERTIES)
+        }
+    }
+    COMBINED_SCHEMA = {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {**_ITEM_PROPERTIES, **_MACRO_PROPERTIES},
+            "required": list(_ITEM_PROPERTIES) + list(_MACRO_PROPERTIES)
+        }
+    }
+    NUTRITION_SCHEMA = {
+        "type": "object",
+        "properties": _MACRO_PROPERTIES,
+        "required": list(_MACRO_PROPERTIES)
+    }
+    BATCH_NUTRITION_SCHEMA = {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {"index": {"type": "integer"}, **_MACRO_PROPERTIES},
+            "required": ["index"] + list(_MACRO_PROPERTIES)
+        }
+    }
+    
+    # Bump whenever PARSING_PROMPT or COMBINED_PROMPT changes so cached parses are invalidated
+    PROMPT_VERSION = "1"
+    
     # Prompt template for meal parsing
     PARSING_PROMPT = """
 You are a nutrition expert AI assistant. Your task is to parse a meal description and extract:
@@ -67,71 +129,414 @@ Respond with JSON array of items:
 ]
 
 If confidence is low (<0.6) for any item, flag it for user verification.
+"""
+
+    # Prompt template returning items, calories and macros in one call
+    COMBINED_PROMPT = """
+You are a nutrition expert AI assistant. Your task is to parse a meal description and extract:
+1. Individual food items
+2. Quantities and units
+3. Estimated calories and macronutrients for the given quantity
+
+IMPORTANT: Respond ONLY with valid JSON, no other text.
+
+Meal Description: "{meal_description}"
+
+For each food item identified, provide:
+- food_name: The name of the food item
+- quantity: Numeric quantity
+- unit: One of: GRAMS, ML, CUPS, PIECES, OUNCES, TABLESPOONS, TEASPOONS
+- estimated_calories: Estimated calories for this quantity
+- confidence_score: How confident you are (0.0-1.0) where 1.0 is very confident
+- protein_grams, carbs_grams, fat_grams, fiber_grams, sugar_grams, sodium_mg: Macronutrients for this quantity
+
+Respond with JSON array of items:
+[
+  {{
+    "food_name": "string",
+    "quantity": number,
+    "unit": "string",
+    "estimated_calories": number,
+    "confidence_score": number,
+    "protein_grams": number,
+    "carbs_grams": number,
+    "fat_grams": number,
+    "fiber_grams": number,
+    "sugar_grams": number,
+    "sodium_mg": number
+  }}
+]
+
+If uncertain about exact values, provide reasonable estimates for the given quantity.
+"""
+
+    # Prompt template for enriching several items in one call
+    BATCH_NUTRITION_PROMPT = """
+You are a nutrition database AI. Provide detailed macronutrient information for each food item below.
+
+IMPORTANT: Respond ONLY with valid JSON, no other text.
+
+Food items (index. food - quantity unit):
+{item_lines}
+
+Respond with a JSON array containing one object per item, in the same order:
+[
+  {{
+    "index": number,
+    "protein_grams": number,
+    "carbs_grams": number,
+    "fat_grams": number,
+    "fiber_grams": number,
+    "sugar_grams": number,
+    "sodium_mg": number
+  }}
+]
+
+If uncertain about exact values, provide reasonable estimates for the given serving.
 """
 
     @staticmethod
-    async def parse_meal(meal_description: str) -> MealParseResult:
+    async def parse_meal(
+        meal_description: str,
+        combined: bool = False,
+        allow_fast: bool = True
+    ) -> MealParseResult:
         """
         Parse a meal description using LLM.
         
         Args:
             meal_description: Raw text meal description
+            combined: Use COMBINED_PROMPT so items come back with macronutrients
+            allow_fast: Try the rule-based parser first (its items carry no
+                calorie estimates)
             
         Returns:
             Parsed meal result with items and confidence scores
         """
+        if allow_fast:
+            fast_result = MealParsingAgent.parse_meal_fast(meal_description)
+            if fast_result is not None:
+                return fast_result
+        
+        cache, cache_key = MealParsingAgent._get_cache_entry(meal_description, combined)
+        if cache is not None:
+            # Cache I/O is blocking SQLite; keep it off the event loop
+            cached = await asyncio.to_thread(cache.get, cache_key)
+            if cached is not None:
+                return MealParseResult.model_validate(cached)
+        
+        started = time.perf_counter()
         try:
             # Generate prompt
-            prompt = MealParsingAgent.PARSING_PROMPT.format(
+            prompt = MealParsingAgent.get_prompt(combined).format(
                 meal_description=meal_description
             )
             
             # Get LLM response
-            response = await LLMService.generate(prompt, max_tokens=500)
+            response, answered_by = await LLMService.generate_with_model(
+                prompt,
+                max_tokens=MealParsingAgent.get_max_tokens(combined),
+                json_schema=MealParsingAgent.get_schema(combined)
+            )
             
             # Parse JSON response
-            items_data = json.loads(response)
+            items_data = MealParsingAgent.decode_response(response, list)
             
             # Validate and convert to FoodItemParsed objects
-            items = []
-            confidence_scores = []
-            
-            for item_data in items_data:
-                # Validate unit
-                unit = item_data.get("unit", "").upper()
-                if unit not in MealParsingAgent.VALID_UNITS:
-                    unit = "GRAMS"  # Default fallback
-                
-                item = FoodItemParsed(
-                    food_name=item_data.get("food_name", "Unknown"),
-                    quantity=float(item_data.get("quantity", 0)),
-                    unit=unit,
-                    estimated_calories=item_data.get("estimated_calories"),
-                    confidence_score=float(item_data.get("confidence_score", 0.5))
-                )
-                items.append(item)
-                confidence_scores.append(item.confidence_score)
+            items = [
+                MealParsingAgent.build_item(item_data)
+                for item_data in items_data
+            ]
+            result = MealParsingAgent.build_parse_result(items)
             
-            # Calculate overall confidence
-            overall_confidence = (
-                sum(confidence_scores) / len(confidence_scores)
-                if confidence_scores else 0.0
-            )
+            # Empty parses are usually model failures, and the key names the
+            # primary model, so cache neither empty nor fallback answers
+            if cache is not None and items and answered_by == LLMService.model_name():
+                await asyncio.to_thread(cache.set, cache_key, result.model_dump())
             
-            # Check if verification needed (any confidence < 0.6)
-            requires_verification = any(s < 0.6 for s in confidence_scores)
+            metrics.observe("meal_parse.llm", time.perf_counter() - started)
+            return result
+        
+        except ValueError as e:
+            raise Exception(f"Failed to parse LLM response: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Meal parsing error: {str(e)}")
+    
+    @staticmethod
+    async def parse_meal_stream(
+        meal_description: str,
+        combined: bool = False,
+        allow_fast: bool = True
+    ) -> AsyncIterator[FoodItemParsed]:
+        """
+        Parse a meal description, yielding each item as soon as it is decoded.
+        
+        Args:
+            meal_description: Raw text meal description
+            combined: Use COMBINED_PROMPT so items come back with macronutrients
+            allow_fast: Try the rule-based parser first (its items carry no
+                calorie estimates)
             
-            return MealParseResult(
-                items=items,
-                overall_confidence=overall_confidence,
-                requires_verification=requires_verification
+        Yields:
+            Parsed food items in response order
+        """
+        fast_result = MealParsingAgent.parse_meal_fast(meal_description) if allow_fast else None
+        if fast_result is not None:
+            for item in fast_result.items:
+                yield item
+            return
+        
+        cache, cache_key = MealParsingAgent._get_cache_entry(meal_description, combined)
+        if cache is not None:
+            cached = await asyncio.to_thread(cache.get, cache_key)
+            if cached is not None:
+                for item in MealParseResult.model_validate(cached).items:
+                    yield item
+                return
+        
+        try:
+            prompt = MealParsingAgent.get_prompt(combined).format(
+                meal_description=meal_description
             )
+            
+            parser = IncrementalJSONArrayParser()
+            items = []
+            
+            model = LLMService.model_name()
+            answered_by = []
+            metrics.increment(f"llm.parse_attempts.{model}")
+            async for chunk in LLMService.generate_stream(
+                prompt,
+                max_tokens=MealParsingAgent.get_max_tokens(combined),
+                json_schema=MealParsingAgent.get_schema(combined),
+                on_provider=answered_by.append
+            ):
+                for item_data in parser.feed(chunk):
+                    item = MealParsingAgent.build_item(item_data)
+                    items.append(item)
+                    yield item
+                if parser.finished:
+                    break
+            
+            if not parser.finished:
+                metrics.increment(f"llm.parse_failures.{model}")
+            
+            if cache is not None and items and answered_by == [model]:
+                result = MealParsingAgent.build_parse_result(items)
+                await asyncio.to_thread(cache.set, cache_key, result.model_dump())
         
-        except json.JSONDecodeError as e:
-            raise Exception(f"Failed to parse LLM response: {str(e)}")
         except Exception as e:
             raise Exception(f"Meal parsing error: {str(e)}")
     
+    @staticmethod
+    def parser_version() -> str:
+        """
+        Identify the model and prompts currently producing parses.
+        
+        Returns:
+            "<model>/<prompt version>", stored on processed meals
+        """
+        return f"{LLMService.model_name()}/{MealParsingAgent.PROMPT_VERSION}"
+    
+    @staticmethod
+    def get_prompt(combined: bool = False) -> str:
+        """
+        Get the parse prompt template for a mode.
+        
+        Args:
+            combined: Whether items should include macronutrients
+            
+        Returns:
+            Prompt template with a {meal_description} placeholder
+        """
+        if combined:
+            return MealParsingAgent.COMBINED_PROMPT
+        return MealParsingAgent.PARSING_PROMPT
+    
+    @staticmethod
+    def get_schema(combined: bool = False) -> dict:
+        """
+        Get the response schema for a parse mode.
+        
+        Args:
+            combined: Whether items should include macronutrients
+            
+        Returns:
+            JSON schema of the expected item array
+        """
+        if combined:
+            return MealParsingAgent.COMBINED_SCHEMA
+        return MealParsingAgent.PARSING_SCHEMA
+    
+    @staticmethod
+    def decode_response(response: str, expected: type):
+        """
+        Decode model output, counting parse failures per model.
+        
+        Args:
+            response: Raw model output
+            expected: list or dict
+            
+        Returns:
+            Decoded JSON value of the expected type
+            
+        Raises:
+            ValueError: If the output holds no usable JSON of that type
+        """
+        model = LLMService.model_name()
+        metrics.increment(f"llm.parse_attempts.{model}")
+        
+        try:
+            data = extract_json(response)
+            
+            # Object-only JSON modes wrap arrays, e.g. {"items": [...]}
+            if expected is list and isinstance(data, dict):
+                lists = [value for value in data.values() if isinstance(value, list)]
+                if len(lists) == 1:
+                    data = lists[0]
+            
+            if not isinstance(data, expected):
+                raise ValueError(
+                    f"Expected JSON {expected.__name__}, got {type(data).__name__}"
+                )
+        except ValueError:
+            metrics.increment(f"llm.parse_failures.{model}")
+            raise
+        
+        return data
+    
+    @staticmethod
+    def get_max_tokens(combined: bool = False) -> int:
+        """
+        Get the response token budget for a parse mode.
+        
+        Args:
+            combined: Whether items should include macronutrients
+            
+        Returns:
+            Maximum tokens to request
+        """
+        return 1200 if combined else 500
+    
+    @staticmethod
+    def parse_meal_fast(meal_description: str) -> Optional[MealParseResult]:
+        """
+        Try the deterministic rule-based parser.
+        
+        Args:
+            meal_description: Raw text meal description
+            
+        Returns:
+            Parse result if every item cleared the confidence threshold,
+            otherwise None (the caller should use the LLM)
+        """
+        if not settings.fast_parse_enabled:
+            return None
+        
+        started = time.perf_counter()
+        items_data = RuleBasedMealParser.parse(meal_description)
+        accepted = bool(items_data) and all(
+            item_data["confidence_score"] >= settings.fast_parse_confidence_threshold
+            for item_data in items_data
+        )
+        metrics.observe("meal_parse.fast_path", time.perf_counter() - started)
+        
+        if not accepted:
+            metrics.increment("meal_parse.fast_path_misses")
+            return None
+        
+        metrics.increment("meal_parse.fast_path_hits")
+        return MealParsingAgent.build_parse_result([
+            MealParsingAgent.build_item(item_data) for item_data in items_data
+        ])
+    
+    @staticmethod
+    def build_item(item_data: dict) -> FoodItemParsed:
+        """
+        Convert one decoded LLM item into a FoodItemParsed.
+        
+        Args:
+            item_data: Decoded JSON object for a food item
+            
+        Returns:
+            Validated food item
+        """
+        # Validate unit
+        unit = str(item_data.get("unit", "")).upper()
+        if unit not in MealParsingAgent.VALID_UNITS:
+            unit = "GRAMS"  # Default fallback
+        
+        # Combined-prompt items carry macros; ignore them if malformed
+        macronutrients = None
+        if "protein_grams" in item_data:
+            try:
+                macronutrients = MealParsingAgent._normalize_macros(item_data)
+            except (TypeError, ValueError):
+                macronutrients = None
+        
+        return FoodItemParsed(
+            food_name=item_data.get("food_name", "Unknown"),
+            quantity=float(item_data.get("quantity", 0)),
+            unit=unit,
+            estimated_calories=item_data.get("estimated_calories"),
+            confidence_score=float(item_data.get("confidence_score", 0.5)),
+            macronutrients=macronutrients
+        )
+    
+    @staticmethod
+    def build_parse_result(items: list[FoodItemParsed]) -> MealParseResult:
+        """
+        Aggregate parsed items into a meal parse result.
+        
+        Args:
+            items: Parsed food items
+            
+        Returns:
+            Parse result with overall confidence and verification flag
+        """
+        confidence_scores = [item.confidence_score for item in items]
+        
+        # Calculate overall confidence
+        overall_confidence = (
+            sum(confidence_scores) / len(confidence_scores)
+            if confidence_scores else 0.0
+        )
+        
+        # Check if verification needed (any confidence < 0.6)
+        requires_verification = any(s < 0.6 for s in confidence_scores)
+        
+        return MealParseResult(
+            items=items,
+            overall_confidence=overall_confidence,
+            requires_verification=requires_verification
+        )
+    
+    @staticmethod
+    def _get_cache_entry(
+        meal_description: str,
+        combined: bool = False
+    ) -> tuple[Optional[ParseCache], Optional[str]]:
+        """
+        Resolve the parse cache and key for a description.
+        
+        Args:
+            meal_description: Raw text meal description
+            combined: Whether the combined prompt is used (cached separately)
+            
+        Returns:
+            Tuple of (cache, key), both None when caching is disabled
+        """
+        cache = get_parse_cache()
+        if cache is None:
+            return None, None
+        
+        cache_key = ParseCache.make_key(
+            meal_description,
+            LLMService.model_name(),
+            MealParsingAgent.PROMPT_VERSION + ("-combined" if combined else "")
+        )
+        return cache, cache_key
+    
     @staticmethod
     async def enrich_with_nutrition(
         food_name: str,
@@ -168,18 +573,90 @@ Respond ONLY with valid JSON:
 If uncertain about exact values, provide reasonable estimates for a {quantity}{unit} serving.
 """
             
-            response = await LLMService.generate(prompt, max_tokens=200)
-            nutrition_data = json.loads(response)
+            response = await LLMService.generate(
+                prompt,
+                max_tokens=200,
+                json_schema=MealParsingAgent.NUTRITION_SCHEMA
+            )
+            nutrition_data = MealParsingAgent.decode_response(response, dict)
             
-            return {
-                "protein_grams": float(nutrition_data.get("protein_grams", 0)),
-                "carbs_grams": float(nutrition_data.get("carbs_grams", 0)),
-                "fat_grams": float(nutrition_data.get("fat_grams", 0)),
-                "fiber_grams": float(nutrition_data.get("fiber_grams", 0)),
-                "sugar_grams": float(nutrition_data.get("sugar_grams", 0)),
-                "sodium_mg": float(nutrition_data.get("sodium_mg", 0))
-            }
+            return MealParsingAgent._normalize_macros(nutrition_data)
         
         except Exception as e:
             # Fallback: return None if enrichment fails
             return None
+    
+    @staticmethod
+    async def enrich_batch_with_nutrition(
+        items: list[FoodItemParsed]
+    ) -> list[Optional[dict]]:
+        """
+        Enrich several food items with macronutrients in a single LLM call.
+        
+        Args:
+            items: Parsed food items
+            
+        Returns:
+            Macronutrient dictionaries aligned with the input items; an entry
+            is None when the model's answer for that item could not be used
+        """
+        if not items:
+            return []
+        
+        results: list[Optional[dict]] = [None] * len(items)
+        
+        try:
+            item_lines = "\n".join(
+                f"{index}. {item.food_name} - {item.quantity} {item.unit}"
+                for index, item in enumerate(items)
+            )
+            prompt = MealParsingAgent.BATCH_NUTRITION_PROMPT.format(
+                item_lines=item_lines
+            )
+            
+            response = await LLMService.generate(
+                prompt,
+                max_tokens=150 * len(items) + 50,
+                json_schema=MealParsingAgent.BATCH_NUTRITION_SCHEMA
+            )
+            nutrition_list = MealParsingAgent.decode_response(response, list)
+            
+            for position, nutrition_data in enumerate(nutrition_list):
+                if not isinstance(nutrition_data, dict):
+                    continue
+                index = nutrition_data.get("index", position)
+                try:
+                    index = int(index)
+                    if 0 <= index < len(items) and results[index] is None:
+                        results[index] = MealParsingAgent._normalize_macros(nutrition_data)
+                except (TypeError, ValueError):
+                    continue
+        
+        except Exception as e:
+            # Leave every entry as None so callers fall back per item
+            pass
+        
+        return results
+    
+    @staticmethod
+    def _normalize_macros(nutrition_data: dict) -> dict:
+        """
+        Convert raw LLM nutrition output to a macronutrient dictionary.
+        
+        Args:
+            nutrition_data: Decoded JSON object from the model
+            
+        Returns:
+            Macronutrient breakdown with float values
+            
+        Raises:
+            TypeError, ValueError: If a value is not numeric
+        """
+        return {
+            "protein_grams": float(nutrition_data.get("protein_grams", 0)),
+            "carbs_grams": float(nutrition_data.get("carbs_grams", 0)),
+            "fat_grams": float(nutrition_data.get("fat_grams", 0)),
+            "fiber_grams": float(nutrition_data.get("fiber_grams", 0)),
+            "sugar_grams": float(nutrition_data.get("sugar_grams", 0)),
+            "sodium_mg": float(nutrition_data.get("sodium_mg", 0))
+        }
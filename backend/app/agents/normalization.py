@@ -0,0 +1,101 @@
+"""
+Meal description canonicalization
+Maps phrasings of the same meal ("toast and two eggs", "2 Eggs & Toast") to one key
+"""
+
+import re
+import unicodedata
+from app.agents.rule_parser import NUMBER_WORDS
+
+
+# Separators between item phrases
+_PHRASE_SPLIT = re.compile(r",|;|\n|&|\+|\band\b|\bwith\b|\bplus\b")
+
+# A letter in any script, then anything but spaces, digits and ASCII
+# punctuation; combining marks (Devanagari vowel signs etc.) aren't \w
+_WORD = r"[^\W\d_][^\s\d!-/:-@\[-`{-~]*"
+
+_TOKEN = re.compile(rf"\d+(?:\.\d+)?(?:/\d+)?%?|[½⅓⅔¼¾%]|{_WORD}(?:'{_WORD})?")
+
+# Filler words that don't change what was eaten
+STOP_WORDS = {
+    "i", "i'm", "im", "had", "have", "ate", "eaten", "eat", "my", "the", "of",
+    "some", "just", "for", "about", "around", "approx", "approximately", "roughly",
+    "today", "this", "morning", "also", "then", "bit", "little"
+}
+
+# Words whose trailing "s" is not a plural
+INVARIANT_WORDS = {
+    "asparagus", "couscous", "hummus", "molasses", "swiss", "grits", "oats",
+    "hash", "chips", "fries", "greens", "lentils", "beans"
+}
+
+
+def singularize(word: str) -> str:
+    """
+    Reduce an English plural to its singular form with simple suffix rules.
+
+    Args:
+        word: Lowercase word
+
+    Returns:
+        Singular form (unchanged if it doesn't look plural)
+    """
+    if word in INVARIANT_WORDS or len(word) <= 3:
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("oes", "ches", "shes", "sses", "xes", "zes")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def canonicalize_phrase(phrase: str) -> str:
+    """
+    Canonicalize one item phrase.
+
+    Args:
+        phrase: Lowercase item phrase such as "two boiled eggs"
+
+    Returns:
+        Canonical phrase such as "2 boiled egg"
+    """
+    tokens = []
+    for token in _TOKEN.findall(phrase):
+        # "half an avocado": the article after a quantity is not a second quantity
+        if token in ("a", "an") and tokens and tokens[-1][0].isdigit():
+            continue
+        if token in NUMBER_WORDS:
+            token = f"{NUMBER_WORDS[token]:g}"
+        elif token in STOP_WORDS:
+            continue
+        elif token.isalpha():
+            token = singularize(token)
+        tokens.append(token)
+    return " ".join(tokens)
+
+
+def canonicalize_description(meal_description: str) -> str:
+    """
+    Build an order- and phrasing-insensitive key for a meal description.
+
+    Lowercases, splits into item phrases, converts number words to digits,
+    singularizes, drops stop words and sorts the phrases.
+
+    Args:
+        meal_description: Raw meal text
+
+    Returns:
+        Canonical description (phrases joined by ", "), or the whitespace-
+        normalized text when nothing canonical is left
+    """
+    text = unicodedata.normalize("NFC", meal_description).lower()
+    phrases = (
+        canonicalize_phrase(phrase)
+        for phrase in _PHRASE_SPLIT.split(text)
+    )
+    canonical = ", ".join(sorted(phrase for phrase in phrases if phrase))
+    # Never let unrecognized text collapse onto a shared (empty) key
+    return canonical or " ".join(text.split())
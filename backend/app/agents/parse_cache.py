@@ -0,0 +1,211 @@
+"""
+Persistent content-addressed cache for meal parsing results
+Backed by a small SQLite file so cached parses survive restarts
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Optional
+from app.agents.normalization import canonicalize_description
+from app.core.metrics import metrics
+from app.core.settings import settings
+
+
+class ParseCache:
+    """SQLite-backed cache with TTL expiry and LRU eviction"""
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: int,
+        max_entries: int,
+        touch_interval_seconds: int = 3600
+    ):
+        """
+        Initialize parse cache.
+
+        Args:
+            path: SQLite file path (":memory:" for a process-local cache)
+            ttl_seconds: Entry lifetime in seconds
+            max_entries: Maximum number of entries kept before LRU eviction
+            touch_interval_seconds: Minimum age of an entry's access time
+                before a hit updates it (keeps most hits read-only)
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.touch_interval_seconds = touch_interval_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # WAL stays consistent without an fsync per commit; a crash may
+            # only lose the latest cache writes
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS parse_cache (
+                cache_key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_parse_cache_accessed_at ON parse_cache (accessed_at)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(meal_description: str, model: str, prompt_version: str) -> str:
+        """
+        Build a content-addressed cache key.
+
+        Descriptions are canonicalized, so reordered or rephrased
+        descriptions of the same items share a key.
+
+        Args:
+            meal_description: Raw meal text
+            model: LLM model name
+            prompt_version: Version of the parsing prompt
+
+        Returns:
+            SHA-256 hex digest identifying the parse request
+        """
+        material = "\x1f".join([
+            prompt_version,
+            model,
+            canonicalize_description(meal_description)
+        ])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Look up a cached value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value or None on miss/expiry
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at, accessed_at FROM parse_cache WHERE cache_key = ?",
+                (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._conn.execute("DELETE FROM parse_cache WHERE cache_key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                metrics.increment("llm_cache.misses")
+                return None
+
+            # Touch entry for LRU ordering, at most once per touch interval
+            if now - row[2] > self.touch_interval_seconds:
+                self._conn.execute(
+                    "UPDATE parse_cache SET accessed_at = ? WHERE cache_key = ?",
+                    (now, key)
+                )
+                self._conn.commit()
+            self.hits += 1
+            metrics.increment("llm_cache.hits")
+
+        return json.loads(row[0])
+
+    def set(self, key: str, value: dict):
+        """
+        Store a value and evict expired/least recently used entries.
+
+        Args:
+            key: Cache key
+            value: JSON-serializable value
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO parse_cache (cache_key, value, created_at, accessed_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (key, json.dumps(value), now, now)
+            )
+            self._conn.execute(
+                "DELETE FROM parse_cache WHERE created_at < ?",
+                (now - self.ttl_seconds,)
+            )
+            self._conn.execute(
+                """
+                DELETE FROM parse_cache WHERE cache_key IN (
+                    SELECT cache_key FROM parse_cache
+                    ORDER BY accessed_at ASC
+                    LIMIT MAX(0, (SELECT COUNT(*) FROM parse_cache) - ?)
+                )
+                """,
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """Remove all entries and reset counters"""
+        with self._lock:
+            self._conn.execute("DELETE FROM parse_cache")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def size(self) -> int:
+        """Get number of stored entries"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM parse_cache").fetchone()[0]
+
+    def stats(self) -> dict:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hits, misses, hit rate and size
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": self.size(),
+            "max_entries": self.max_entries
+        }
+
+
+_parse_cache: Optional[ParseCache] = None
+
+
+def get_parse_cache() -> Optional[ParseCache]:
+    """
+    Get the process-wide parse cache, creating it on first use.
+
+    Returns:
+        Parse cache or None if caching is disabled
+    """
+    global _parse_cache
+
+    if not settings.llm_cache_enabled:
+        return None
+
+    if _parse_cache is None:
+        _parse_cache = ParseCache(
+            path=settings.llm_cache_path,
+            ttl_seconds=settings.llm_cache_ttl_seconds,
+            max_entries=settings.llm_cache_max_entries
+        )
+        metrics.register_gauge("llm_cache", _parse_cache.stats)
+
+    return _parse_cache
@@ -0,0 +1,166 @@
+"""
+Deterministic rule-based meal parser
+Handles trivially structured descriptions ("2 eggs, 1 cup milk, 30g oats") without an LLM call
+"""
+
+import re
+from fractions import Fraction
+from typing import Optional
+
+
+# Words that stand for a quantity
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11,
+    "twelve": 12, "dozen": 12, "half": 0.5, "quarter": 0.25
+}
+
+UNICODE_FRACTIONS = {"½": 0.5, "⅓": 1 / 3, "⅔": 2 / 3, "¼": 0.25, "¾": 0.75}
+
+# Unit spellings mapped to (canonical unit, multiplier)
+UNIT_ALIASES = {
+    "g": ("GRAMS", 1), "gr": ("GRAMS", 1), "gram": ("GRAMS", 1), "grams": ("GRAMS", 1),
+    "kg": ("GRAMS", 1000), "kilogram": ("GRAMS", 1000), "kilograms": ("GRAMS", 1000),
+    "ml": ("ML", 1), "milliliter": ("ML", 1), "milliliters": ("ML", 1),
+    "millilitre": ("ML", 1), "millilitres": ("ML", 1),
+    "l": ("ML", 1000), "liter": ("ML", 1000), "liters": ("ML", 1000),
+    "litre": ("ML", 1000), "litres": ("ML", 1000),
+    "cup": ("CUPS", 1), "cups": ("CUPS", 1),
+    "oz": ("OUNCES", 1), "ounce": ("OUNCES", 1), "ounces": ("OUNCES", 1),
+    "lb": ("OUNCES", 16), "lbs": ("OUNCES", 16), "pound": ("OUNCES", 16), "pounds": ("OUNCES", 16),
+    "tbsp": ("TABLESPOONS", 1), "tablespoon": ("TABLESPOONS", 1), "tablespoons": ("TABLESPOONS", 1),
+    "tsp": ("TEASPOONS", 1), "teaspoon": ("TEASPOONS", 1), "teaspoons": ("TEASPOONS", 1),
+    "piece": ("PIECES", 1), "pieces": ("PIECES", 1), "pc": ("PIECES", 1), "pcs": ("PIECES", 1),
+    "slice": ("PIECES", 1), "slices": ("PIECES", 1)
+}
+
+# Words that signal a vague amount the rules can't quantify
+VAGUE_WORDS = {
+    "some", "bowl", "bowls", "plate", "plates", "handful", "serving", "servings",
+    "portion", "portions", "bunch", "bit", "lots", "few", "several", "side"
+}
+
+_SEGMENT_SPLIT = re.compile(r",|;|\n|&|\+|\band\b|\bwith\b|\bplus\b", re.IGNORECASE)
+
+_NUMBER = r"(?:\d+\s+\d+\s*/\s*\d+|\d+\s*/\s*\d+|\d+(?:\.\d+)?|[½⅓⅔¼¾])"
+
+_SEGMENT = re.compile(
+    rf"^(?P<quantity>{_NUMBER}|(?:{'|'.join(sorted(NUMBER_WORDS, key=len, reverse=True))})\b)"
+    # "half a cup of yogurt": an article may sit between the quantity and the unit
+    rf"(?:\s*(?:an?\s+)?(?P<unit>{'|'.join(sorted(UNIT_ALIASES, key=len, reverse=True))})\b)?"
+    r"\s*(?:of\s+)?(?P<food>.*)$",
+    re.IGNORECASE
+)
+
+_FOOD_NAME = re.compile(r"^[a-z][a-z' -]*$", re.IGNORECASE)
+
+
+class RuleBasedMealParser:
+    """Parser for simple "<quantity> [unit] <food>" lists"""
+
+    # Calibrated confidence per item shape
+    CONFIDENCE_QUANTITY_AND_UNIT = 0.95
+    CONFIDENCE_QUANTITY_ONLY = 0.85
+    CONFIDENCE_NUMBER_WORD_PENALTY = 0.05
+    CONFIDENCE_UNSTRUCTURED = 0.3
+
+    @staticmethod
+    def parse_quantity(text: str) -> Optional[float]:
+        """
+        Convert a quantity token to a number.
+
+        Args:
+            text: Digits, fraction ("1/2", "1 1/2", "½") or number word
+
+        Returns:
+            Quantity or None if not recognized
+        """
+        text = text.strip().lower()
+
+        if text in NUMBER_WORDS:
+            return float(NUMBER_WORDS[text])
+        if text in UNICODE_FRACTIONS:
+            return UNICODE_FRACTIONS[text]
+
+        # Mixed numbers ("1 1/2") are split into whole and fractional parts
+        parts = re.split(r"\s+(?=\d+\s*/)", text)
+        try:
+            return float(sum(Fraction(part.replace(" ", "")) for part in parts))
+        except (ValueError, ZeroDivisionError):
+            return None
+
+    @staticmethod
+    def parse_segment(segment: str) -> dict:
+        """
+        Parse one item phrase.
+
+        Args:
+            segment: Phrase such as "2 cups milk"
+
+        Returns:
+            Item dictionary in the LLM parse format, with calibrated confidence
+        """
+        segment = segment.strip().strip(".!").strip()
+        match = _SEGMENT.match(segment)
+
+        if not match:
+            return {
+                "food_name": segment or "Unknown",
+                "quantity": 1.0,
+                "unit": "PIECES",
+                "estimated_calories": None,
+                "confidence_score": RuleBasedMealParser.CONFIDENCE_UNSTRUCTURED
+            }
+
+        quantity_text = match.group("quantity")
+        quantity = RuleBasedMealParser.parse_quantity(quantity_text)
+        unit_text = match.group("unit")
+        food_name = match.group("food").strip()
+
+        # Leading articles after a number word ("half an avocado")
+        food_name = re.sub(r"^(?:a|an|the)\s+", "", food_name, flags=re.IGNORECASE)
+
+        if unit_text:
+            unit, multiplier = UNIT_ALIASES[unit_text.lower()]
+            confidence = RuleBasedMealParser.CONFIDENCE_QUANTITY_AND_UNIT
+        else:
+            unit, multiplier = "PIECES", 1
+            confidence = RuleBasedMealParser.CONFIDENCE_QUANTITY_ONLY
+
+        if quantity_text.lower() in NUMBER_WORDS:
+            confidence -= RuleBasedMealParser.CONFIDENCE_NUMBER_WORD_PENALTY
+
+        words = food_name.lower().split()
+        if (
+            quantity is None
+            or quantity <= 0
+            or not _FOOD_NAME.match(food_name)
+            or not 1 <= len(words) <= 4
+            or any(word in VAGUE_WORDS for word in words)
+        ):
+            confidence = RuleBasedMealParser.CONFIDENCE_UNSTRUCTURED
+
+        return {
+            "food_name": food_name or "Unknown",
+            "quantity": (quantity or 1.0) * multiplier,
+            "unit": unit,
+            "estimated_calories": None,
+            "confidence_score": round(confidence, 2)
+        }
+
+    @staticmethod
+    def parse(meal_description: str) -> list[dict]:
+        """
+        Parse a meal description into items.
+
+        Args:
+            meal_description: Raw meal text
+
+        Returns:
+            Item dictionaries (empty if nothing was found)
+        """
+        segments = [
+            segment for segment in _SEGMENT_SPLIT.split(meal_description)
+            if segment and segment.strip(" .!")
+        ]
+        return [RuleBasedMealParser.parse_segment(segment) for segment in segments]
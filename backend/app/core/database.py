@@ -1,9 +1,39 @@
 """Database configuration and session management"""
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import asyncio
+from typing import AsyncIterator, Callable, TypeVar
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from app.core.settings import settings
 
+T = TypeVar("T")
+
+# Async drivers used when async_database_url is not set
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg"
+}
+
+
+def to_async_url(database_url: str) -> str:
+    """
+    Map a synchronous database URL to its async driver.
+    
+    Args:
+        database_url: SQLAlchemy URL (e.g. sqlite:///./pulse.db)
+        
+    Returns:
+        URL using the async driver (e.g. sqlite+aiosqlite:///./pulse.db)
+    """
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if url.get_driver_name() in ("aiosqlite", "asyncpg") or backend not in ASYNC_DRIVERS:
+        return database_url
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
 # Create engine
 engine = create_engine(
     settings.database_url,
@@ -18,6 +48,19 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# Async engine for async routes; same database, non-blocking driver
+async_engine = create_async_engine(
+    settings.async_database_url or to_async_url(settings.database_url),
+    echo=settings.debug
+)
+
+# Objects stay usable after commit: async code can't lazy-load expired attributes
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Create base class for models
 Base = declarative_base()
 
@@ -36,6 +79,120 @@ def get_db():
         db.close()
 
 
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """
+    Dependency injection function for async database session.
+    
+    Yields:
+        Async database session
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def run_in_session(
+    db: Session | AsyncSession,
+    function: Callable[..., T],
+    *args,
+    **kwargs
+) -> T:
+    """
+    Run synchronous ORM code against a Session or an AsyncSession.
+    
+    With an AsyncSession the function runs through run_sync, so its queries
+    use the async driver without blocking the event loop. Calls on one
+    AsyncSession are serialized; it must not be used by two tasks at once.
+    
+    Args:
+        db: Database session
+        function: Called as function(session, *args, **kwargs)
+        
+    Returns:
+        The function's result
+    """
+    if not isinstance(db, AsyncSession):
+        return function(db, *args, **kwargs)
+    
+    lock = db.info.setdefault("run_in_session_lock", asyncio.Lock())
+    async with lock:
+        return await db.run_sync(function, *args, **kwargs)
+
+
+async def close_session(db: Session | AsyncSession):
+    """
+    Close a Session or an AsyncSession.
+    
+    Args:
+        db: Database session
+    """
+    if isinstance(db, AsyncSession):
+        await db.close()
+    else:
+        db.close()
+
+
+def release_connection(db: Session):
+    """
+    End a read-only transaction so the session's pooled connection goes back
+    to the pool; the session checks out a fresh one on its next query.
+    
+    Call it before awaiting slow non-database work (LLM calls) so waiting
+    requests don't hold connections. A session with unflushed changes is
+    left alone; callers must not hold flushed, uncommitted writes.
+    
+    Args:
+        db: Database session
+    """
+    if db.in_transaction() and not (db.new or db.dirty or db.deleted):
+        db.commit()
+
+
+def add_missing_columns(bind) -> list[str]:
+    """
+    Add model columns missing from existing tables.
+    
+    create_all never alters a table, so databases created before a column
+    was added fail on every read of that table. Only nullable columns are
+    added; anything else needs the database rebuilt.
+    
+    Args:
+        bind: Engine or connection
+        
+    Returns:
+        Added columns as "table.column"
+    """
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+    
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if not column.nullable:
+                    raise Exception(
+                        f"Column {table.name}.{column.name} is missing and not nullable; "
+                        f"rebuild the database"
+                    )
+                
+                column_type = column.type.compile(dialect=conn.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                added.append(f"{table.name}.{column.name}")
+            
+            # Indexes on the added columns
+            for index in table.indexes:
+                if any(f"{table.name}.{column.name}" in added for column in index.columns):
+                    index.create(conn, checkfirst=True)
+    
+    return added
+
+
 def init_db():
-    """Initialize database by creating all tables"""
+    """Initialize database by creating all tables and adding new columns"""
     Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
@@ -0,0 +1,204 @@
+"""
+JSON helpers for decoding LLM output
+Includes an incremental parser that yields array items while a response is still streaming
+"""
+
+import json
+from typing import Any
+
+
+class IncrementalJSONArrayParser:
+    """
+    Incrementally decode objects from a top-level JSON array.
+
+    Text before the opening bracket (prose, markdown fences) is skipped, and
+    each object element is returned as soon as its closing brace arrives.
+    """
+
+    def __init__(self):
+        self._started = False
+        self._finished = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._current: list[str] = []
+
+    @property
+    def finished(self) -> bool:
+        """True once the closing bracket of the array has been seen"""
+        return self._finished
+
+    def feed(self, chunk: str) -> list[Any]:
+        """
+        Consume a chunk of streamed text.
+
+        Args:
+            chunk: Next piece of model output
+
+        Returns:
+            Objects completed by this chunk (possibly empty)
+        """
+        completed = []
+
+        for char in chunk:
+            if self._finished:
+                break
+
+            if not self._started:
+                if char == "[":
+                    self._started = True
+                    self._depth = 1
+                continue
+
+            capturing = self._depth >= 2
+            if capturing:
+                self._current.append(char)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if self._depth == 1:
+                    self._current = [char]
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 1:
+                    element = "".join(self._current)
+                    self._current = []
+                    try:
+                        value = json.loads(element)
+                    except json.JSONDecodeError:
+                        continue
+                    if isinstance(value, dict):
+                        completed.append(value)
+                elif self._depth == 0:
+                    self._finished = True
+
+        return completed
+
+
+def _find_value_end(text: str, start: int) -> int:
+    """
+    Find the end of the JSON array/object opening at text[start].
+
+    Args:
+        text: Text containing the value
+        start: Index of the opening bracket or brace
+
+    Returns:
+        Index just past the matching closer, or len(text) if it never closes
+    """
+    depth = 0
+    in_string = False
+    escape = False
+
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+            if depth == 0:
+                return index + 1
+
+    return len(text)
+
+
+def _remove_trailing_commas(text: str) -> str:
+    """
+    Drop commas that directly precede a closing bracket or brace.
+
+    Args:
+        text: JSON text
+
+    Returns:
+        Text with trailing commas outside strings removed
+    """
+    result = []
+    in_string = False
+    escape = False
+    pending_comma = None
+
+    for char in text:
+        if in_string:
+            result.append(char)
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == ",":
+            if pending_comma is not None:
+                result.append(pending_comma)
+            pending_comma = char
+            continue
+        if char.isspace() and pending_comma is not None:
+            pending_comma += char
+            continue
+        if pending_comma is not None:
+            if char not in "}]":
+                result.append(pending_comma)
+            pending_comma = None
+
+        result.append(char)
+        if char == '"':
+            in_string = True
+
+    if pending_comma is not None:
+        result.append(pending_comma)
+    return "".join(result)
+
+
+def extract_json(text: str) -> Any:
+    """
+    Decode JSON from noisy model output.
+
+    Tries a plain decode first; otherwise takes the first array or object
+    in the text (skipping prose and markdown fences) and repairs trailing
+    commas before decoding.
+
+    Args:
+        text: Raw model output
+
+    Returns:
+        Decoded JSON value
+
+    Raises:
+        json.JSONDecodeError: If no decodable array or object is found
+    """
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    starts = [index for index in (text.find("["), text.find("{")) if index != -1]
+    if not starts:
+        raise json.JSONDecodeError("No JSON array or object found", text, 0)
+
+    start = min(starts)
+    candidate = text[start:_find_value_end(text, start)]
+    try:
+        return json.loads(candidate)
+    except json.JSONDecodeError:
+        return json.loads(_remove_trailing_commas(candidate))
@@ -5,52 +5,214 @@ Can be easily extended for OpenAI, Anthropic, etc.
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Optional
+import asyncio
 import httpx
 import json
+import time
+from app.core.metrics import TimingStats, metrics
 from app.core.settings import settings
 
 
 class LLMProvider(ABC):
     """Abstract base class for LLM providers"""
     
+    # Provider name, used to look up per-provider settings such as concurrency
+    name: str = "default"
+    
     @abstractmethod
-    async def generate(self, prompt: str, max_tokens: int = 1000) -> str:
+    async def generate(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+        json_schema: Optional[dict] = None
+    ) -> str:
         """
         Generate text response from LLM.
         
         Args:
             prompt: Input prompt
             max_tokens: Maximum tokens in response
+            json_schema: JSON schema the response must follow; providers
+                with structured output enforce it, others ignore it
             
         Returns:
             Generated text response
         """
         pass
+    
+    async def generate_stream(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+        json_schema: Optional[dict] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream text chunks from LLM as they are generated.
+        
+        Providers without native streaming yield the full response once.
+        
+        Args:
+            prompt: Input prompt
+            max_tokens: Maximum tokens in response
+            json_schema: JSON schema the response must follow; providers
+                with structured output enforce it, others ignore it
+            
+        Yields:
+            Generated text chunks
+        """
+        yield await self.generate(prompt, max_tokens, json_schema)
+    
+    async def start(self):
+        """Start background work (e.g. health checks); called at app startup"""
+        pass
+    
+    async def aclose(self):
+        """Close network resources held by the provider"""
+        client = getattr(self, "client", None)
+        if client is not None:
+            await client.aclose()
+
+
+def build_http_client(headers: Optional[dict] = None) -> httpx.AsyncClient:
+    """
+    Build a pooled HTTP client configured from settings.
+    
+    Args:
+        headers: Default headers sent with every request
+        
+    Returns:
+        Async HTTP client with connection limits, keep-alive and timeouts
+    """
+    return httpx.AsyncClient(
+        headers=headers,
+        http2=settings.llm_http2,
+        limits=httpx.Limits(
+            max_connections=settings.llm_http_max_connections,
+            max_keepalive_connections=settings.llm_http_max_keepalive_connections,
+            keepalive_expiry=settings.llm_http_keepalive_expiry
+        ),
+        timeout=httpx.Timeout(
+            connect=settings.llm_connect_timeout,
+            read=settings.llm_read_timeout,
+            write=settings.llm_write_timeout,
+            pool=settings.llm_pool_timeout
+        )
+    )
+
+
+async def _iter_sse_data(response: httpx.Response) -> AsyncIterator[str]:
+    """
+    Iterate over the data payloads of a server-sent events response.
+    
+    Args:
+        response: Streaming HTTP response
+        
+    Yields:
+        Contents of each "data:" line
+    """
+    async for line in response.aiter_lines():
+        if line.startswith("data:"):
+            yield line[len("data:"):].strip()
 
 
 class LocalLLMProvider(LLMProvider):
     """Local LLM provider using Ollama"""
     
-    def __init__(self, endpoint: str, model: str):
+    name = "local"
+    
+    # Model loads slower than this count as cold starts
+    COLD_START_THRESHOLD_SECONDS = 0.5
+    
+    def __init__(self, endpoint: str, model: str, client: Optional[httpx.AsyncClient] = None):
         """
         Initialize local LLM provider.
         
         Args:
             endpoint: Ollama server endpoint (e.g., http://localhost:11434)
             model: Model name (e.g., llama2)
+            client: Shared HTTP client (a pooled client is built if omitted)
         """
         self.endpoint = endpoint
         self.model = model
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.client = client or build_http_client()
+        self._keep_warm_task: Optional[asyncio.Task] = None
+    
+    def _record_load(self, result: dict):
+        """
+        Record model load time reported by Ollama, separating cold starts.
+        
+        Args:
+            result: Final response object (load_duration is in nanoseconds)
+        """
+        load_seconds = result.get("load_duration", 0) / 1e9
+        if load_seconds >= self.COLD_START_THRESHOLD_SECONDS:
+            metrics.increment("llm.cold_starts")
+            metrics.observe(f"llm.cold_start.{self.name}", load_seconds)
+    
+    async def warm_up(self) -> bool:
+        """
+        Load the model into memory without generating anything.
+        
+        Returns:
+            True if the model is loaded, False if the endpoint failed
+        """
+        try:
+            # An empty prompt makes Ollama load the model and return
+            response = await self.client.post(
+                f"{self.endpoint}/api/generate",
+                json={"model": self.model, "prompt": "", "keep_alive": settings.llm_keep_alive},
+                timeout=settings.llm_warmup_timeout_seconds
+            )
+            response.raise_for_status()
+            self._record_load(response.json())
+            return True
+        except Exception:
+            metrics.increment("llm.warmup_failures")
+            return False
+    
+    async def _keep_warm_loop(self):
+        if settings.llm_warmup_on_startup:
+            await self.warm_up()
+        if settings.llm_keep_warm_interval_seconds <= 0:
+            return
+        while True:
+            await asyncio.sleep(settings.llm_keep_warm_interval_seconds)
+            await self.warm_up()
+    
+    async def start(self):
+        """Preload the model and start periodic keep-warm pings in the background"""
+        # A cold model can take minutes to load; don't hold up app startup
+        if self._keep_warm_task is None and (
+            settings.llm_warmup_on_startup or settings.llm_keep_warm_interval_seconds > 0
+        ):
+            self._keep_warm_task = asyncio.create_task(self._keep_warm_loop())
+    
+    def stop(self):
+        """Stop the warm-up and keep-warm pings"""
+        if self._keep_warm_task is not None:
+            self._keep_warm_task.cancel()
+            self._keep_warm_task = None
+    
+    async def aclose(self):
+        """Stop keep-warm pings and close the HTTP client"""
+        self.stop()
+        await self.client.aclose()
     
-    async def generate(self, prompt: str, max_tokens: int = 1000) -> str:
+    async def generate(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+        json_schema: Optional[dict] = None
+    ) -> str:
         """
         Generate response using local LLM.
         
         Args:
             prompt: Input prompt
             max_tokens: Maximum tokens
+            json_schema: JSON schema the response must follow
             
         Returns:
             Generated text
@@ -60,54 +222,138 @@ class LocalLLMProvider(LLMProvider):
             payload = {
                 "model": self.model,
                 "prompt": prompt,
-                "stream": False
+                "stream": False,
+                "keep_alive": settings.llm_keep_alive
             }
+            if json_schema is not None:
+                # Ollama constrains decoding to the schema
+                payload["format"] = json_schema
             
             response = await self.client.post(url, json=payload)
             response.raise_for_status()
             
             result = response.json()
+            self._record_load(result)
             return result.get("response", "").strip()
         except Exception as e:
             raise Exception(f"Local LLM error: {str(e)}")
+    
+    async def generate_stream(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+        json_schema: Optional[dict] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream response using local LLM.
+        
+        Args:
+            prompt: Input prompt
+            max_tokens: Maximum tokens
+            json_schema: JSON schema the response must follow
+            
+        Yields:
+            Generated text chunks
+        """
+        try:
+            url = f"{self.endpoint}/api/generate"
+            payload = {
+                "model": self.model,
+                "prompt": prompt,
+                "stream": True,
+                "keep_alive": settings.llm_keep_alive
+            }
+            if json_schema is not None:
+                payload["format"] = json_schema
+            
+            async with self.client.stream("POST", url, json=payload) as response:
+                response.raise_for_status()
+                
+                # Ollama streams newline-delimited JSON objects
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("response"):
+                        yield chunk["response"]
+                    if chunk.get("done"):
+                        self._record_load(chunk)
+                        break
+        except Exception as e:
+            raise Exception(f"Local LLM error: {str(e)}")
 
 
 class OpenAIProvider(LLMProvider):
     """OpenAI API provider (for future use)"""
     
-    def __init__(self, api_key: str, model: str = "gpt-3.5-turbo"):
+    name = "openai"
+    
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-3.5-turbo",
+        client: Optional[httpx.AsyncClient] = None,
+        base_url: str = "https://api.openai.com"
+    ):
         """
         Initialize OpenAI provider.
         
         Args:
             api_key: OpenAI API key
             model: Model name
+            client: Shared HTTP client (a pooled client is built if omitted)
+            base_url: API root (e.g. a local fake server)
         """
         self.api_key = api_key
         self.model = model
-        self.client = httpx.AsyncClient(
-            headers={"Authorization": f"Bearer {api_key}"},
-            timeout=30.0
+        self.base_url = base_url.rstrip("/")
+        self.client = client or build_http_client(
+            headers={"Authorization": f"Bearer {api_key}"}
         )
     
-    async def generate(self, prompt: str, max_tokens: int = 1000) -> str:
+    @staticmethod
+    def _response_format(json_schema: Optional[dict]) -> dict:
+        """
+        Map a JSON schema to OpenAI request options.
+        
+        JSON mode only produces top-level objects, so array schemas are
+        left to the prompt and the tolerant decoder.
+        
+        Args:
+            json_schema: Expected response schema
+            
+        Returns:
+            Extra payload fields
+        """
+        if json_schema is not None and json_schema.get("type") == "object":
+            return {"response_format": {"type": "json_object"}}
+        return {}
+    
+    async def generate(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+        json_schema: Optional[dict] = None
+    ) -> str:
         """
         Generate response using OpenAI.
         
         Args:
             prompt: Input prompt
             max_tokens: Maximum tokens
+            json_schema: JSON schema the response must follow
             
         Returns:
             Generated text
         """
         try:
-            url = "https://api.openai.com/v1/chat/completions"
+            url = f"{self.base_url}/v1/chat/completions"
             payload = {
                 "model": self.model,
                 "messages": [{"role": "user", "content": prompt}],
                 "max_tokens": max_tokens
             }
+            payload.update(self._response_format(json_schema))
             
             response = await self.client.post(url, json=payload)
             response.raise_for_status()
@@ -116,93 +362,841 @@ class OpenAIProvider(LLMProvider):
             return result["choices"][0]["message"]["content"].strip()
         except Exception as e:
             raise Exception(f"OpenAI error: {str(e)}")
+    
+    async def generate_stream(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+        json_schema: Optional[dict] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream response using OpenAI.
+        
+        Args:
+            prompt: Input prompt
+            max_tokens: Maximum tokens
+            json_schema: JSON schema the response must follow
+            
+        Yields:
+            Generated text chunks
+        """
+        try:
+            url = f"{self.base_url}/v1/chat/completions"
+            payload = {
+                "model": self.model,
+                "messages": [{"role": "user", "content": prompt}],
+                "max_tokens": max_tokens,
+                "stream": True
+            }
+            payload.update(self._response_format(json_schema))
+            
+            async with self.client.stream("POST", url, json=payload) as response:
+                response.raise_for_status()
+                
+                async for data in _iter_sse_data(response):
+                    if data == "[DONE]":
+                        break
+                    event = json.loads(data)
+                    choices = event.get("choices") or [{}]
+                    content = choices[0].get("delta", {}).get("content")
+                    if content:
+                        yield content
+        except Exception as e:
+            raise Exception(f"OpenAI error: {str(e)}")
 
 
 class AnthropicProvider(LLMProvider):
     """Anthropic Claude provider (for future use)"""
     
-    def __init__(self, api_key: str, model: str = "claude-2"):
+    name = "anthropic"
+    
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "claude-2",
+        client: Optional[httpx.AsyncClient] = None,
+        base_url: str = "https://api.anthropic.com"
+    ):
         """
         Initialize Anthropic provider.
         
         Args:
             api_key: Anthropic API key
             model: Model name
+            client: Shared HTTP client (a pooled client is built if omitted)
+            base_url: API root (e.g. a local fake server)
         """
         self.api_key = api_key
         self.model = model
-        self.client = httpx.AsyncClient(
-            headers={"x-api-key": api_key},
-            timeout=30.0
+        self.base_url = base_url.rstrip("/")
+        self.client = client or build_http_client(
+            headers={"x-api-key": api_key, "anthropic-version": "2023-06-01"}
         )
     
-    async def generate(self, prompt: str, max_tokens: int = 1000) -> str:
+    @staticmethod
+    def _messages(prompt: str, json_schema: Optional[dict]) -> tuple[list[dict], str]:
+        """
+        Build the message list, prefilling the answer when JSON is expected.
+        
+        Args:
+            prompt: Input prompt
+            json_schema: Expected response schema
+            
+        Returns:
+            Tuple of (messages, prefill); the prefill is part of the answer
+        """
+        messages = [{"role": "user", "content": prompt}]
+        if json_schema is None:
+            return messages, ""
+        
+        prefill = "[" if json_schema.get("type") == "array" else "{"
+        messages.append({"role": "assistant", "content": prefill})
+        return messages, prefill
+    
+    async def generate(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+        json_schema: Optional[dict] = None
+    ) -> str:
         """
         Generate response using Claude.
         
         Args:
             prompt: Input prompt
             max_tokens: Maximum tokens
+            json_schema: JSON schema the response must follow
             
         Returns:
             Generated text
         """
         try:
-            url = "https://api.anthropic.com/v1/messages"
+            url = f"{self.base_url}/v1/messages"
+            messages, prefill = self._messages(prompt, json_schema)
             payload = {
                 "model": self.model,
                 "max_tokens": max_tokens,
-                "messages": [{"role": "user", "content": prompt}]
+                "messages": messages
             }
             
             response = await self.client.post(url, json=payload)
             response.raise_for_status()
             
             result = response.json()
-            return result["content"][0]["text"].strip()
+            return (prefill + result["content"][0]["text"]).strip()
+        except Exception as e:
+            raise Exception(f"Anthropic error: {str(e)}")
+    
+    async def generate_stream(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+        json_schema: Optional[dict] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream response using Claude.
+        
+        Args:
+            prompt: Input prompt
+            max_tokens: Maximum tokens
+            json_schema: JSON schema the response must follow
+            
+        Yields:
+            Generated text chunks
+        """
+        try:
+            url = f"{self.base_url}/v1/messages"
+            messages, prefill = self._messages(prompt, json_schema)
+            payload = {
+                "model": self.model,
+                "max_tokens": max_tokens,
+                "messages": messages,
+                "stream": True
+            }
+            
+            async with self.client.stream("POST", url, json=payload) as response:
+                response.raise_for_status()
+                
+                if prefill:
+                    yield prefill
+                
+                async for data in _iter_sse_data(response):
+                    event = json.loads(data)
+                    if event.get("type") == "content_block_delta":
+                        text = event.get("delta", {}).get("text")
+                        if text:
+                            yield text
+                    elif event.get("type") == "message_stop":
+                        break
         except Exception as e:
             raise Exception(f"Anthropic error: {str(e)}")
 
 
+class _PoolNode:
+    """One Ollama endpoint in a provider pool, with health and load state"""
+    
+    def __init__(self, provider: LocalLLMProvider):
+        self.provider = provider
+        self.in_flight = 0
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.requests = 0
+        self.failures = 0
+        self.probe_failures = 0
+        self.latency = TimingStats()
+    
+    def record_success(self, seconds: float):
+        self.requests += 1
+        self.consecutive_failures = 0
+        self.latency.add(seconds)
+    
+    def record_failure(self, failure_threshold: int):
+        self.requests += 1
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self.healthy and self.consecutive_failures >= failure_threshold:
+            self.healthy = False
+            metrics.increment("llm.pool.ejections")
+    
+    def record_probe_failure(self):
+        # A failed health probe ejects the node but is not a served request
+        self.probe_failures += 1
+        if self.healthy:
+            self.healthy = False
+            metrics.increment("llm.pool.ejections")
+    
+    def stats(self) -> dict:
+        return {
+            "endpoint": self.provider.endpoint,
+            "healthy": self.healthy,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures,
+            "probe_failures": self.probe_failures,
+            "latency": self.latency.to_dict()
+        }
+
+
+class PooledLocalLLMProvider(LLMProvider):
+    """Local LLM provider spreading requests over several Ollama endpoints"""
+    
+    name = "local"
+    
+    def __init__(
+        self,
+        endpoints: list[str],
+        model: str,
+        client: Optional[httpx.AsyncClient] = None,
+        failure_threshold: int = 3,
+        health_check_interval: float = 10.0
+    ):
+        """
+        Initialize pooled local LLM provider.
+        
+        Args:
+            endpoints: Ollama server endpoints
+            model: Model name served by every endpoint
+            client: Shared HTTP client (a pooled client is built if omitted)
+            failure_threshold: Consecutive failures before a node is ejected
+            health_check_interval: Seconds between background health checks
+        """
+        if not endpoints:
+            raise ValueError("PooledLocalLLMProvider needs at least one endpoint")
+        
+        self.model = model
+        self.client = client or build_http_client()
+        self.failure_threshold = failure_threshold
+        self.health_check_interval = health_check_interval
+        self.nodes = [
+            _PoolNode(LocalLLMProvider(endpoint, model, client=self.client))
+            for endpoint in endpoints
+        ]
+        self._health_task: Optional[asyncio.Task] = None
+    
+    @property
+    def node_count(self) -> int:
+        """Number of endpoints in the pool"""
+        return len(self.nodes)
+    
+    def _pick_node(self) -> _PoolNode:
+        """Pick the healthy node with the fewest in-flight requests"""
+        candidates = [node for node in self.nodes if node.healthy]
+        if not candidates:
+            # Every node is ejected; keep trying rather than failing outright
+            candidates = self.nodes
+        return min(candidates, key=lambda node: (node.in_flight, node.requests))
+    
+    async def generate(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+        json_schema: Optional[dict] = None
+    ) -> str:
+        """
+        Generate response on the least loaded endpoint.
+        
+        Args:
+            prompt: Input prompt
+            max_tokens: Maximum tokens
+            json_schema: JSON schema the response must follow
+            
+        Returns:
+            Generated text
+        """
+        node = self._pick_node()
+        node.in_flight += 1
+        started = time.perf_counter()
+        try:
+            result = await node.provider.generate(prompt, max_tokens, json_schema)
+        except Exception:
+            node.record_failure(self.failure_threshold)
+            raise
+        finally:
+            node.in_flight -= 1
+        
+        node.record_success(time.perf_counter() - started)
+        return result
+    
+    async def generate_stream(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+        json_schema: Optional[dict] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream response from the least loaded endpoint.
+        
+        Args:
+            prompt: Input prompt
+            max_tokens: Maximum tokens
+            json_schema: JSON schema the response must follow
+            
+        Yields:
+            Generated text chunks
+        """
+        node = self._pick_node()
+        node.in_flight += 1
+        started = time.perf_counter()
+        try:
+            async for chunk in node.provider.generate_stream(prompt, max_tokens, json_schema):
+                yield chunk
+        except Exception:
+            node.record_failure(self.failure_threshold)
+            raise
+        finally:
+            node.in_flight -= 1
+        
+        node.record_success(time.perf_counter() - started)
+    
+    async def check_health(self):
+        """Probe every endpoint, ejecting failing nodes and re-admitting recovered ones"""
+        async def probe(node: _PoolNode):
+            try:
+                response = await self.client.get(
+                    f"{node.provider.endpoint}/api/tags",
+                    timeout=settings.llm_connect_timeout
+                )
+                response.raise_for_status()
+            except Exception:
+                node.record_probe_failure()
+                return
+            
+            node.consecutive_failures = 0
+            if not node.healthy:
+                node.healthy = True
+                metrics.increment("llm.pool.readmissions")
+        
+        await asyncio.gather(*[probe(node) for node in self.nodes])
+    
+    async def _health_check_loop(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            await self.check_health()
+    
+    async def start(self):
+        """Preload the model on every node and start background health checks"""
+        await asyncio.gather(*[node.provider.start() for node in self.nodes])
+        if self._health_task is None and self.health_check_interval > 0:
+            self._health_task = asyncio.create_task(self._health_check_loop())
+    
+    async def aclose(self):
+        """Stop health checks and keep-warm pings and close the shared HTTP client"""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        for node in self.nodes:
+            node.provider.stop()
+        await self.client.aclose()
+    
+    def stats(self) -> list[dict]:
+        """
+        Get per-node statistics.
+        
+        Returns:
+            List of node health, load and latency dictionaries
+        """
+        return [node.stats() for node in self.nodes]
+
+
+class ConcurrencyLimiter:
+    """Process-wide cap on simultaneous requests to one LLM provider"""
+    
+    def __init__(self, name: str, limit: int):
+        """
+        Initialize concurrency limiter.
+        
+        Args:
+            name: Provider name (used in metric names)
+            limit: Maximum number of requests in flight at once
+        """
+        self.name = name
+        self.limit = max(1, limit)
+        self.in_flight = 0
+        self.waiting = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Semaphores are bound to an event loop; rebuild if the loop changed
+        # (e.g. between test clients)
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.limit)
+            self._loop = loop
+        return self._semaphore
+    
+    @asynccontextmanager
+    async def acquire(self):
+        """Wait for a free slot, recording queue depth and wait time"""
+        semaphore = self._get_semaphore()
+        self.waiting += 1
+        started = time.perf_counter()
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        
+        metrics.observe(f"llm.queue_wait.{self.name}", time.perf_counter() - started)
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            semaphore.release()
+    
+    def stats(self) -> dict:
+        """
+        Get limiter statistics.
+        
+        Returns:
+            Dictionary with limit, in-flight requests and queue depth
+        """
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting
+        }
+
+
 class LLMService:
     """Factory and manager for LLM providers"""
     
     _provider: Optional[LLMProvider] = None
+    _fallbacks: list[LLMProvider] = []
+    _limiters: dict[str, ConcurrencyLimiter] = {}
+    _inflight: dict[tuple, asyncio.Future] = {}
     
     @classmethod
     def initialize(cls):
-        """Initialize LLM provider based on settings"""
+        """Initialize LLM provider and fallback chain based on settings"""
         service = settings.llm_service.lower()
         
-        if service == "local":
-            cls._provider = LocalLLMProvider(
+        cls._provider = cls._build_provider(service)
+        cls._fallbacks = [
+            cls._build_provider(name.lower())
+            for name in settings.llm_fallback_chain
+            if name.lower() != service
+        ]
+    
+    @staticmethod
+    def _build_provider(service: str) -> LLMProvider:
+        """
+        Build a provider from settings.
+        
+        Args:
+            service: Provider name (local, openai, anthropic)
+            
+        Returns:
+            Configured LLM provider
+        """
+        if service == "local" and settings.llm_local_endpoints:
+            pool = PooledLocalLLMProvider(
+                endpoints=settings.llm_local_endpoints,
+                model=settings.llm_local_model,
+                failure_threshold=settings.llm_pool_failure_threshold,
+                health_check_interval=settings.llm_pool_health_check_interval
+            )
+            metrics.register_gauge("llm.pool", pool.stats)
+            return pool
+        elif service == "local":
+            return LocalLLMProvider(
                 endpoint=settings.llm_local_endpoint,
                 model=settings.llm_local_model
             )
         elif service == "openai":
-            cls._provider = OpenAIProvider(
-                api_key=settings.llm_openai_key
+            return OpenAIProvider(
+                api_key=settings.llm_openai_key,
+                base_url=settings.llm_openai_base_url
             )
         elif service == "anthropic":
-            cls._provider = AnthropicProvider(
-                api_key=settings.llm_anthropic_key
+            return AnthropicProvider(
+                api_key=settings.llm_anthropic_key,
+                base_url=settings.llm_anthropic_base_url
             )
         else:
             raise ValueError(f"Unknown LLM service: {service}")
     
     @classmethod
-    async def generate(cls, prompt: str, max_tokens: int = 1000) -> str:
+    def _providers(cls) -> list[LLMProvider]:
+        """Get the primary provider followed by the fallback chain"""
+        if cls._provider is None:
+            cls.initialize()
+        
+        return [cls._provider] + list(cls._fallbacks)
+    
+    @classmethod
+    async def startup(cls):
+        """Create the configured providers and their HTTP connection pools"""
+        for provider in cls._providers():
+            await provider.start()
+    
+    @classmethod
+    async def shutdown(cls):
+        """Close provider connection pools; providers are rebuilt on next use"""
+        providers = [cls._provider] + list(cls._fallbacks)
+        cls._provider = None
+        cls._fallbacks = []
+        
+        for provider in providers:
+            if provider is not None:
+                await provider.aclose()
+    
+    @classmethod
+    def model_name(cls) -> str:
+        """
+        Get the model name of the configured provider.
+        
+        Returns:
+            Model name, or "unknown" if the provider does not expose one
+        """
+        if cls._provider is None:
+            cls.initialize()
+        
+        return getattr(cls._provider, "model", "unknown")
+    
+    @classmethod
+    async def generate(
+        cls,
+        prompt: str,
+        max_tokens: int = 1000,
+        json_schema: Optional[dict] = None
+    ) -> str:
         """
         Generate text using configured provider.
         
         Args:
             prompt: Input prompt
             max_tokens: Maximum tokens
+            json_schema: JSON schema the response must follow
             
         Returns:
             Generated text
         """
+        text, _ = await cls.generate_with_model(prompt, max_tokens, json_schema)
+        return text
+    
+    @classmethod
+    async def generate_with_model(
+        cls,
+        prompt: str,
+        max_tokens: int = 1000,
+        json_schema: Optional[dict] = None
+    ) -> tuple[str, str]:
+        """
+        Generate text and report which model produced it.
+        
+        Args:
+            prompt: Input prompt
+            max_tokens: Maximum tokens
+            json_schema: JSON schema the response must follow
+            
+        Returns:
+            Tuple of (generated text, model of the provider that answered,
+            which differs from model_name() after a fallback)
+        """
         if cls._provider is None:
             cls.initialize()
         
-        return await cls._provider.generate(prompt, max_tokens)
+        provider = cls._provider
+        
+        # Single-flight: identical prompts already in flight share one call
+        key = (
+            getattr(provider, "name", "default"),
+            getattr(provider, "model", "unknown"),
+            prompt,
+            max_tokens,
+            json.dumps(json_schema, sort_keys=True) if json_schema is not None else None
+        )
+        shared = cls._inflight.get(key)
+        if shared is not None and shared.get_loop() is asyncio.get_running_loop():
+            metrics.increment("llm.coalesced_requests")
+            return await asyncio.shield(shared)
+        
+        task = asyncio.ensure_future(
+            cls._generate_with_fallback(prompt, max_tokens, json_schema)
+        )
+        cls._inflight[key] = task
+        
+        def _on_done(finished: asyncio.Future):
+            if cls._inflight.get(key) is finished:
+                del cls._inflight[key]
+            if not finished.cancelled():
+                finished.exception()  # Mark retrieved even if every caller left
+        
+        task.add_done_callback(_on_done)
+        
+        # Shield so one caller being cancelled doesn't cancel the others
+        return await asyncio.shield(task)
+    
+    @classmethod
+    async def _generate_with_fallback(
+        cls,
+        prompt: str,
+        max_tokens: int,
+        json_schema: Optional[dict] = None
+    ) -> tuple[str, str]:
+        """
+        Generate text through the provider chain within the request deadline.
+        
+        A failed provider hands over to the next one in the chain. With
+        hedging enabled (llm_hedge_after_ms > 0), the next provider is also
+        started when the current ones have not answered in time; the first
+        successful answer wins and the others are cancelled.
+        
+        Args:
+            prompt: Input prompt
+            max_tokens: Maximum tokens
+            json_schema: JSON schema the response must follow
+            
+        Returns:
+            Tuple of (generated text, model of the provider that answered)
+            
+        Raises:
+            Exception: If every provider failed or the deadline passed
+        """
+        providers = cls._providers()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.llm_request_deadline_seconds
+        hedge_delay = settings.llm_hedge_after_ms / 1000
+        
+        pending: dict[asyncio.Future, LLMProvider] = {}
+        errors = []
+        next_index = 0
+        
+        def launch():
+            nonlocal next_index
+            provider = providers[next_index]
+            next_index += 1
+            task = asyncio.ensure_future(
+                cls._generate_with_provider(provider, prompt, max_tokens, json_schema)
+            )
+            pending[task] = provider
+        
+        launch()
+        try:
+            while pending:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                
+                can_hedge = hedge_delay > 0 and next_index < len(providers)
+                done, _ = await asyncio.wait(
+                    pending.keys(),
+                    timeout=min(remaining, hedge_delay) if can_hedge else remaining,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                
+                if not done:
+                    if can_hedge:
+                        metrics.increment("llm.hedged_requests")
+                        launch()
+                    continue
+                
+                winner = None
+                for task in done:
+                    provider = pending.pop(task)
+                    error = task.exception()
+                    if error is not None:
+                        errors.append(f"{getattr(provider, 'name', 'default')}: {str(error)}")
+                    elif winner is None:
+                        winner = (provider, task.result())
+                
+                if winner is not None:
+                    if winner[0] is not providers[0]:
+                        metrics.increment("llm.fallback_successes")
+                    return winner[1], getattr(winner[0], "model", "unknown")
+                
+                if next_index < len(providers):
+                    metrics.increment("llm.fallbacks")
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        if pending:
+            metrics.increment("llm.deadline_exceeded")
+            raise Exception(
+                f"LLM request exceeded {settings.llm_request_deadline_seconds}s deadline"
+            )
+        
+        raise Exception(f"All LLM providers failed: {'; '.join(errors)}")
+    
+    @classmethod
+    async def _generate_with_provider(
+        cls,
+        provider: LLMProvider,
+        prompt: str,
+        max_tokens: int,
+        json_schema: Optional[dict] = None
+    ) -> str:
+        """
+        Call a provider inside its concurrency slot, recording latency.
+        
+        Args:
+            provider: LLM provider
+            prompt: Input prompt
+            max_tokens: Maximum tokens
+            json_schema: JSON schema the response must follow
+            
+        Returns:
+            Generated text
+        """
+        limiter = cls._get_limiter(provider)
+        metrics.increment("llm.provider_requests")
+        
+        async with limiter.acquire():
+            started = time.perf_counter()
+            try:
+                return await provider.generate(prompt, max_tokens, json_schema=json_schema)
+            finally:
+                metrics.observe(f"llm.latency.{limiter.name}", time.perf_counter() - started)
+    
+    @classmethod
+    async def generate_stream(
+        cls,
+        prompt: str,
+        max_tokens: int = 1000,
+        json_schema: Optional[dict] = None,
+        on_provider: Optional[Callable[[str], None]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream text using configured provider.
+        
+        The provider's concurrency slot is held until the stream finishes. If
+        a provider fails before producing any output, the next provider in
+        the fallback chain is tried.
+        
+        Args:
+            prompt: Input prompt
+            max_tokens: Maximum tokens
+            json_schema: JSON schema the response must follow
+            on_provider: Called with the model name of the provider whose
+                output is streamed, before its first chunk
+            
+        Yields:
+            Generated text chunks
+        """
+        providers = cls._providers()
+        
+        for index, provider in enumerate(providers):
+            produced_output = False
+            try:
+                async for chunk in cls._stream_with_provider(
+                    provider, prompt, max_tokens, json_schema
+                ):
+                    if not produced_output and on_provider is not None:
+                        on_provider(getattr(provider, "model", "unknown"))
+                    produced_output = True
+                    yield chunk
+                return
+            except Exception:
+                if produced_output or index == len(providers) - 1:
+                    raise
+                metrics.increment("llm.fallbacks")
+    
+    @classmethod
+    async def _stream_with_provider(
+        cls,
+        provider: LLMProvider,
+        prompt: str,
+        max_tokens: int,
+        json_schema: Optional[dict] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream from a provider inside its concurrency slot, recording latency.
+        
+        Args:
+            provider: LLM provider
+            prompt: Input prompt
+            max_tokens: Maximum tokens
+            json_schema: JSON schema the response must follow
+            
+        Yields:
+            Generated text chunks
+        """
+        limiter = cls._get_limiter(provider)
+        
+        async with limiter.acquire():
+            started = time.perf_counter()
+            first_chunk = True
+            try:
+                async for chunk in provider.generate_stream(
+                    prompt, max_tokens, json_schema=json_schema
+                ):
+                    if first_chunk:
+                        metrics.observe(
+                            f"llm.time_to_first_chunk.{limiter.name}",
+                            time.perf_counter() - started
+                        )
+                        first_chunk = False
+                    yield chunk
+            finally:
+                metrics.observe(f"llm.latency.{limiter.name}", time.perf_counter() - started)
+    
+    @classmethod
+    def _get_limiter(cls, provider: LLMProvider) -> ConcurrencyLimiter:
+        """
+        Get the shared concurrency limiter for a provider.
+        
+        Args:
+            provider: LLM provider
+            
+        Returns:
+            Limiter sized from settings (llm_max_concurrency_<name>),
+            multiplied by the node count for pooled providers
+        """
+        name = getattr(provider, "name", "default")
+        
+        if name not in cls._limiters:
+            limit = getattr(
+                settings,
+                f"llm_max_concurrency_{name}",
+                settings.llm_max_concurrency_local
+            ) * getattr(provider, "node_count", 1)
+            cls._limiters[name] = ConcurrencyLimiter(name, limit)
+            metrics.register_gauge(
+                "llm.limiters",
+                lambda: {key: value.stats() for key, value in cls._limiters.items()}
+            )
+        
+        return cls._limiters[name]
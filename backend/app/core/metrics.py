@@ -0,0 +1,131 @@
+"""
+In-process metrics registry
+Collects counters, timings and gauges for the LLM pipeline and exposes them as a snapshot
+"""
+
+import threading
+from collections import defaultdict, deque
+from typing import Callable
+
+
+class TimingStats:
+    """Running statistics for a timed operation"""
+
+    # Number of recent samples kept for percentile estimates
+    WINDOW_SIZE = 1000
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent = deque(maxlen=self.WINDOW_SIZE)
+
+    def add(self, seconds: float):
+        """Record a single observation (in seconds)"""
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self._recent.append(seconds)
+
+    def _percentile(self, percent: float) -> float:
+        if not self._recent:
+            return 0.0
+        ordered = sorted(self._recent)
+        index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def to_dict(self) -> dict:
+        """Serialize statistics to a plain dictionary"""
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            "p50_ms": round(self._percentile(50) * 1000, 2),
+            "p95_ms": round(self._percentile(95) * 1000, 2),
+            "p99_ms": round(self._percentile(99) * 1000, 2),
+            "max_ms": round(self.max * 1000, 2)
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe registry of counters, timings and gauges"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = defaultdict(float)
+        self._timings: dict[str, TimingStats] = {}
+        self._gauges: dict[str, Callable[[], object]] = {}
+
+    def increment(self, name: str, value: float = 1):
+        """
+        Increment a counter.
+
+        Args:
+            name: Counter name
+            value: Amount to add
+        """
+        with self._lock:
+            self._counters[name] += value
+
+    def observe(self, name: str, seconds: float):
+        """
+        Record a timing observation.
+
+        Args:
+            name: Timing name
+            seconds: Observed duration in seconds
+        """
+        with self._lock:
+            if name not in self._timings:
+                self._timings[name] = TimingStats()
+            self._timings[name].add(seconds)
+
+    def register_gauge(self, name: str, callback: Callable[[], object]):
+        """
+        Register a gauge whose value is read at snapshot time.
+
+        Args:
+            name: Gauge name
+            callback: Zero-argument callable returning the current value
+        """
+        with self._lock:
+            self._gauges[name] = callback
+
+    def counter(self, name: str) -> float:
+        """Get the current value of a counter"""
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> dict:
+        """
+        Get a point-in-time view of all metrics.
+
+        Returns:
+            Dictionary with counters, timings and gauges
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            timings = {name: stats.to_dict() for name, stats in self._timings.items()}
+            gauges = dict(self._gauges)
+
+        gauge_values = {}
+        for name, callback in gauges.items():
+            try:
+                gauge_values[name] = callback()
+            except Exception as e:
+                gauge_values[name] = f"error: {str(e)}"
+
+        return {
+            "counters": counters,
+            "timings": timings,
+            "gauges": gauge_values
+        }
+
+    def reset(self):
+        """Clear counters and timings (gauges stay registered)"""
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+
+
+# Create global metrics registry
+metrics = MetricsRegistry()
@@ -9,6 +9,8 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str = "sqlite:///./pulse.db"
+    # Async driver URL for async routes; derived from database_url when empty
+    async_database_url: str = ""
     
     # JWT
     secret_key: str = "your-secret-key-change-in-production"
@@ -23,9 +25,67 @@ class Settings(BaseSettings):
     llm_service: Literal["local", "openai", "anthropic"] = "local"
     llm_local_endpoint: str = "http://localhost:11434"
     llm_local_model: str = "llama2"
+    # Several Ollama hosts, as a JSON list; takes precedence over llm_local_endpoint
+    llm_local_endpoints: list[str] = []
+    llm_pool_health_check_interval: float = 10.0
+    llm_pool_failure_threshold: int = 3
     llm_openai_key: str = ""
     llm_anthropic_key: str = ""
+    # API roots; point them at app.fake_llm (pulse-fake-llm) for offline testing
+    llm_openai_base_url: str = "https://api.openai.com"
+    llm_anthropic_base_url: str = "https://api.anthropic.com"
+
+    # Providers tried after llm_service fails, as a JSON list (e.g. ["openai", "anthropic"])
+    llm_fallback_chain: list[Literal["local", "openai", "anthropic"]] = []
+    # Overall time budget for one generate call across the whole chain
+    llm_request_deadline_seconds: float = 20.0
+    # Start the next provider if no answer after this many ms (0 disables hedging)
+    llm_hedge_after_ms: int = 0
+    
+    # LLM HTTP client pool and timeouts (seconds)
+    llm_http_max_connections: int = 20
+    llm_http_max_keepalive_connections: int = 10
+    llm_http_keepalive_expiry: float = 30.0
+    llm_http2: bool = False  # Requires the "http2" extra (h2)
+    llm_connect_timeout: float = 5.0
+    llm_read_timeout: float = 30.0
+    llm_write_timeout: float = 10.0
+    llm_pool_timeout: float = 10.0
+    
+    # Ollama model residency: keep_alive sent with every request (e.g. "30m", "-1" = forever)
+    llm_keep_alive: str = "30m"
+    # Preload the model at startup (runs in the background; startup doesn't wait)
+    llm_warmup_on_startup: bool = True
+    llm_warmup_timeout_seconds: float = 120.0
+    # Seconds between keep-warm pings (0 disables)
+    llm_keep_warm_interval_seconds: float = 300.0
+    
+    # Max simultaneous requests per LLM provider (process-wide; per host for pools)
+    llm_max_concurrency_local: int = 2
+    llm_max_concurrency_openai: int = 16
+    llm_max_concurrency_anthropic: int = 16
     
+    # Rule-based fast path: skip the LLM when every item parses at or above threshold
+    fast_parse_enabled: bool = True
+    fast_parse_confidence_threshold: float = 0.8
+    
+    # Asynchronous AI meal processing (in-process worker pool; 0 workers disables it)
+    meal_job_workers: int = 2
+    meal_job_poll_interval_seconds: float = 2.0
+    # Job leases: expire unless renewed by a heartbeat; expired jobs are retried
+    meal_job_lease_seconds: float = 60.0
+    meal_job_heartbeat_seconds: float = 15.0
+    meal_job_max_attempts: int = 3
+    
+    # Meals parsed at once by the batch logging endpoint
+    meal_batch_concurrency: int = 4
+    
+    # LLM meal parse cache
+    llm_cache_enabled: bool = True
+    llm_cache_path: str = "./llm_cache.db"
+    llm_cache_ttl_seconds: int = 7 * 24 * 3600
+    llm_cache_max_entries: int = 10000
+
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -0,0 +1,420 @@
+"""
+Local fake LLM server
+Speaks the Ollama, OpenAI and Anthropic HTTP APIs and answers meal prompts with
+deterministic JSON, with configurable latency, errors and concurrency, for
+integration tests and load benchmarks without a model or network
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from typing import AsyncIterator, Literal, Optional
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+from app.agents.rule_parser import RuleBasedMealParser
+from app.core.metrics import TimingStats
+
+
+class FakeLLMConfig(BaseModel):
+    """Behaviour of the fake server"""
+
+    model: str = "fake-llm"
+    # Time to the full answer: fixed, uniform (0..2x), exponential or lognormal around latency_ms
+    latency_distribution: Literal["fixed", "uniform", "exponential", "lognormal"] = "fixed"
+    latency_ms: float = 200.0
+    # Added uniformly in [-jitter_ms, +jitter_ms]
+    jitter_ms: float = 0.0
+    # Fraction of requests answered with HTTP 500
+    error_rate: float = 0.0
+    # Requests generated at once (like OLLAMA_NUM_PARALLEL); others wait
+    max_concurrency: int = 4
+    # Requests allowed to wait for a slot before HTTP 503 (0 = unbounded)
+    max_queue: int = 0
+    # Characters per streamed chunk
+    stream_chunk_chars: int = 16
+    # Reported model load time on the first request (Ollama load_duration)
+    cold_start_ms: float = 0.0
+    seed: Optional[int] = None
+
+
+_MEAL_DESCRIPTION = re.compile(r'Meal Description: "(.*)"')
+_SINGLE_FOOD = re.compile(r"^Food: (.+)$\s*^Quantity: ([\d.]+) (\w+)$", re.MULTILINE)
+_BATCH_LINE = re.compile(r"^(\d+)\. (.+) - ([\d.]+) (\w+)$", re.MULTILINE)
+
+# Rough grams per unit, used to scale the fake per-100g values
+_UNIT_GRAMS = {
+    "GRAMS": 1, "ML": 1, "CUPS": 240, "PIECES": 100,
+    "OUNCES": 28.35, "TABLESPOONS": 15, "TEASPOONS": 5
+}
+
+
+def _food_profile(food_name: str) -> dict:
+    """
+    Derive stable per-100g nutrition values from a food name.
+
+    Args:
+        food_name: Food name
+
+    Returns:
+        Calories and macronutrients per 100 g
+    """
+    digest = hashlib.sha256(food_name.strip().lower().encode()).digest()
+    return {
+        "calories": 40 + digest[0] % 260,
+        "protein_grams": digest[1] % 25,
+        "carbs_grams": digest[2] % 60,
+        "fat_grams": digest[3] % 20,
+        "fiber_grams": digest[4] % 8,
+        "sugar_grams": digest[5] % 15,
+        "sodium_mg": digest[6] * 2
+    }
+
+
+def _macros(food_name: str, quantity: float, unit: str) -> dict:
+    profile = _food_profile(food_name)
+    scale = quantity * _UNIT_GRAMS.get(unit.upper(), 100) / 100
+    return {
+        key: round(value * scale, 1)
+        for key, value in profile.items()
+        if key != "calories"
+    }
+
+
+def _calories(food_name: str, quantity: float, unit: str) -> float:
+    scale = quantity * _UNIT_GRAMS.get(unit.upper(), 100) / 100
+    return round(_food_profile(food_name)["calories"] * scale, 1)
+
+
+def fake_completion(prompt: str) -> str:
+    """
+    Answer a P.U.L.S.E prompt with deterministic JSON.
+
+    Meal prompts are parsed with the rule-based parser; nutrition prompts get
+    values derived from the food name. Other prompts (e.g. the empty warm-up
+    prompt) get an empty answer.
+
+    Args:
+        prompt: Prompt sent by MealParsingAgent
+
+    Returns:
+        Model output text
+    """
+    meal = _MEAL_DESCRIPTION.search(prompt)
+    if meal:
+        combined = "protein_grams" in prompt
+        items = []
+        for parsed in RuleBasedMealParser.parse(meal.group(1)):
+            food_name, quantity, unit = parsed["food_name"], parsed["quantity"], parsed["unit"]
+            item = {
+                "food_name": food_name,
+                "quantity": quantity,
+                "unit": unit,
+                "estimated_calories": _calories(food_name, quantity, unit),
+                "confidence_score": 0.9
+            }
+            if combined:
+                item.update(_macros(food_name, quantity, unit))
+            items.append(item)
+        return json.dumps(items)
+
+    if "Food items (index." in prompt:
+        return json.dumps([
+            {"index": int(index), **_macros(food_name, float(quantity), unit)}
+            for index, food_name, quantity, unit in _BATCH_LINE.findall(prompt)
+        ])
+
+    single = _SINGLE_FOOD.search(prompt)
+    if single:
+        food_name, quantity, unit = single.groups()
+        return json.dumps(_macros(food_name, float(quantity), unit))
+
+    return ""
+
+
+class FakeLLMServer:
+    """Request admission, latency and failure injection for the fake endpoints"""
+
+    def __init__(self, config: FakeLLMConfig):
+        self.config = config
+        self._random = random.Random(config.seed)
+        self._slots = asyncio.Semaphore(max(1, config.max_concurrency))
+        self._loaded = False
+        self.waiting = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.rejected = 0
+        self.latency = TimingStats()
+
+    def sample_latency(self) -> float:
+        """
+        Draw one response latency.
+
+        Returns:
+            Latency in seconds (never negative)
+        """
+        mean = self.config.latency_ms
+        distribution = self.config.latency_distribution
+        if distribution == "uniform":
+            latency = self._random.uniform(0, 2 * mean)
+        elif distribution == "exponential":
+            latency = self._random.expovariate(1 / mean) if mean > 0 else 0.0
+        elif distribution == "lognormal":
+            # sigma 0.5 gives a long tail with the requested median
+            latency = mean * self._random.lognormvariate(0, 0.5)
+        else:
+            latency = mean
+
+        latency += self._random.uniform(-self.config.jitter_ms, self.config.jitter_ms)
+        return max(0.0, latency) / 1000
+
+    def should_fail(self) -> bool:
+        return self._random.random() < self.config.error_rate
+
+    def load_duration_ns(self) -> int:
+        """Report a cold start on the first request only"""
+        if self._loaded:
+            return 0
+        self._loaded = True
+        return int(self.config.cold_start_ms * 1e6)
+
+    async def acquire(self) -> bool:
+        """
+        Wait for a generation slot.
+
+        Returns:
+            False if the wait queue is full and the request is rejected
+        """
+        if self.config.max_queue and self._slots.locked() and self.waiting >= self.config.max_queue:
+            self.rejected += 1
+            return False
+
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        return True
+
+    def release(self, started: float):
+        self.in_flight -= 1
+        self._slots.release()
+        self.latency.add(time.perf_counter() - started)
+
+    def chunks(self, text: str) -> list[str]:
+        size = max(1, self.config.stream_chunk_chars)
+        return [text[start:start + size] for start in range(0, len(text), size)] or [""]
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "peak_in_flight": self.peak_in_flight,
+            "latency": self.latency.to_dict()
+        }
+
+
+def _error(status_code: int, message: str) -> JSONResponse:
+    return JSONResponse(status_code=status_code, content={"error": message})
+
+
+def _strip_prefill(messages: list[dict], text: str) -> str:
+    """Drop an assistant prefill from the answer; the client prepends it itself"""
+    if messages and messages[-1].get("role") == "assistant":
+        prefill = messages[-1].get("content") or ""
+        if text.startswith(prefill):
+            return text[len(prefill):]
+    return text
+
+
+def create_fake_llm_app(config: Optional[FakeLLMConfig] = None) -> FastAPI:
+    """
+    Build the fake LLM application.
+
+    Args:
+        config: Server behaviour (defaults to FakeLLMConfig())
+
+    Returns:
+        FastAPI app; its FakeLLMServer is available as app.state.server
+    """
+    server = FakeLLMServer(config or FakeLLMConfig())
+    app = FastAPI(title="P.U.L.S.E fake LLM")
+    app.state.server = server
+
+    async def respond(text: str, stream: bool, render_full, render_chunk, render_end, media_type: str):
+        """Apply admission, errors and latency, then answer whole or streamed"""
+        if not await server.acquire():
+            return _error(503, "server busy")
+        started = time.perf_counter()
+
+        if server.should_fail():
+            server.errors += 1
+            server.release(started)
+            return _error(500, "injected failure")
+
+        latency = server.sample_latency()
+        if not stream:
+            try:
+                await asyncio.sleep(latency)
+                return JSONResponse(render_full(text))
+            finally:
+                server.release(started)
+
+        chunks = server.chunks(text)
+
+        async def body() -> AsyncIterator[str]:
+            try:
+                # Spread the latency over the chunks like token generation
+                for chunk in chunks:
+                    await asyncio.sleep(latency / len(chunks))
+                    yield render_chunk(chunk)
+                yield render_end()
+            finally:
+                server.release(started)
+
+        return StreamingResponse(body(), media_type=media_type)
+
+    @app.get("/api/tags")
+    async def ollama_tags():
+        return {"models": [{"name": server.config.model, "model": server.config.model}]}
+
+    @app.post("/api/generate")
+    async def ollama_generate(request: Request):
+        payload = await request.json()
+        model = payload.get("model", server.config.model)
+        load_duration = server.load_duration_ns()
+
+        def done(text: str = "") -> dict:
+            return {
+                "model": model,
+                "response": text,
+                "done": True,
+                "load_duration": load_duration
+            }
+
+        return await respond(
+            fake_completion(payload.get("prompt", "")),
+            payload.get("stream", True),
+            render_full=done,
+            render_chunk=lambda chunk: json.dumps(
+                {"model": model, "response": chunk, "done": False}
+            ) + "\n",
+            render_end=lambda: json.dumps(done()) + "\n",
+            media_type="application/x-ndjson"
+        )
+
+    @app.post("/v1/chat/completions")
+    async def openai_chat(request: Request):
+        payload = await request.json()
+        messages = payload.get("messages", [])
+        prompt = messages[-1].get("content", "") if messages else ""
+        model = payload.get("model", server.config.model)
+
+        return await respond(
+            fake_completion(prompt),
+            payload.get("stream", False),
+            render_full=lambda text: {
+                "object": "chat.completion",
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop"
+                }]
+            },
+            render_chunk=lambda chunk: "data: " + json.dumps({
+                "object": "chat.completion.chunk",
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": chunk}}]
+            }) + "\n\n",
+            render_end=lambda: "data: [DONE]\n\n",
+            media_type="text/event-stream"
+        )
+
+    @app.post("/v1/messages")
+    async def anthropic_messages(request: Request):
+        payload = await request.json()
+        messages = payload.get("messages", [])
+        prompt = next(
+            (message.get("content", "") for message in messages if message.get("role") == "user"),
+            ""
+        )
+        model = payload.get("model", server.config.model)
+
+        return await respond(
+            _strip_prefill(messages, fake_completion(prompt)),
+            payload.get("stream", False),
+            render_full=lambda text: {
+                "type": "message",
+                "role": "assistant",
+                "model": model,
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": "end_turn"
+            },
+            render_chunk=lambda chunk: "event: content_block_delta\ndata: " + json.dumps({
+                "type": "content_block_delta",
+                "index": 0,
+                "delta": {"type": "text_delta", "text": chunk}
+            }) + "\n\n",
+            render_end=lambda: 'event: message_stop\ndata: {"type": "message_stop"}\n\n',
+            media_type="text/event-stream"
+        )
+
+    @app.get("/stats")
+    async def fake_stats():
+        return server.stats()
+
+    return app
+
+
+def main():
+    """Console entry point (pulse-fake-llm)"""
+    parser = argparse.ArgumentParser(description="Run a fake Ollama/OpenAI/Anthropic server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--model", default="fake-llm")
+    parser.add_argument(
+        "--latency-distribution",
+        choices=["fixed", "uniform", "exponential", "lognormal"],
+        default="fixed"
+    )
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Mean (median for lognormal)")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction answered with 500")
+    parser.add_argument("--max-concurrency", type=int, default=4, help="Requests generated at once")
+    parser.add_argument("--max-queue", type=int, default=0, help="Waiting requests before 503 (0 = unbounded)")
+    parser.add_argument("--cold-start-ms", type=float, default=0.0, help="Load time reported on first request")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = FakeLLMConfig(
+        model=args.model,
+        latency_distribution=args.latency_distribution,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        max_concurrency=args.max_concurrency,
+        max_queue=args.max_queue,
+        cold_start_ms=args.cold_start_ms,
+        seed=args.seed
+    )
+
+    import uvicorn
+    uvicorn.run(create_fake_llm_app(config), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -54,6 +54,7 @@ class MealEntry(Base):
     meal_date = Column(Date, nullable=False, index=True)
     meal_time = Column(Time, nullable=True)
     is_processed = Column(Boolean, default=False)
+    parser_version = Column(String, nullable=True, index=True)  # "<model>/<prompt version>" that produced the items
     original_log = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -61,6 +62,7 @@ class MealEntry(Base):
     # Relationships
     user = relationship("User", back_populates="meal_entries")
     meal_items = relationship("MealItem", back_populates="meal_entry", cascade="all, delete-orphan")
+    processing_jobs = relationship("MealProcessingJob", back_populates="meal_entry", cascade="all, delete-orphan")
 
 
 class MealItem(Base):
@@ -72,6 +74,7 @@ class MealItem(Base):
     food_name = Column(String, nullable=False)
     quantity = Column(Float, nullable=False)
     unit = Column(String, nullable=False)  # GRAMS, ML, CUPS, PIECES, OUNCES
+    quantity_grams = Column(Float, nullable=True)  # Normalized at write time; None if unknown
     calories = Column(Float, nullable=True)
     is_verified = Column(Boolean, default=False)
     source = Column(String, default="USER_INPUT")  # USER_INPUT, AGENTIC_IDENTIFIED, MANUAL_CORRECTION
@@ -109,7 +112,17 @@ class FoodDatabase(Base):
     food_name = Column(String, nullable=False, index=True)
     serving_size = Column(Float, nullable=False)
     serving_unit = Column(String, nullable=False)
+    serving_grams = Column(Float, nullable=True)  # Serving normalized to grams
+    density_g_per_ml = Column(Float, nullable=True)
+    grams_per_piece = Column(Float, nullable=True)
     calories_per_serving = Column(Float, nullable=True)
+    # Macronutrients per serving (nullable: not every food has a breakdown)
+    protein_grams = Column(Float, nullable=True)
+    carbs_grams = Column(Float, nullable=True)
+    fat_grams = Column(Float, nullable=True)
+    fiber_grams = Column(Float, nullable=True)
+    sugar_grams = Column(Float, nullable=True)
+    sodium_mg = Column(Float, nullable=True)
     category = Column(String, nullable=True)  # FRUIT, VEGETABLE, PROTEIN, GRAIN, DAIRY, etc.
     verified_by_usda = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -138,3 +151,27 @@ class DailyNutritionSummary(Base):
     __table_args__ = (
         UniqueConstraint('user_id', 'date', name='_user_date_uc'),
     )
+
+
+class MealProcessingJob(Base):
+    """Queued AI processing of a meal logged asynchronously"""
+    __tablename__ = "meal_processing_jobs"
+    
+    job_id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    meal_id = Column(String, ForeignKey("meal_entries.meal_id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(String, ForeignKey("users.user_id"), nullable=False, index=True)
+    status = Column(String, default="PENDING", index=True)  # PENDING, RUNNING, SUCCEEDED, FAILED
+    options = Column(JSON, default={})  # auto_enrich, combined_prompt
+    attempts = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+    # Lease held by the worker running the job; expired leases are re-claimable
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True, index=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    meal_entry = relationship("MealEntry", back_populates="processing_jobs")
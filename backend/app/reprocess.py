@@ -0,0 +1,75 @@
+"""
+Bulk meal re-processing CLI
+Reparses unprocessed or stale meals after a model or prompt change; safe to interrupt and rerun
+"""
+
+import argparse
+import asyncio
+from app.core.database import SessionLocal, init_db
+from app.core.llm_service import LLMService
+from app.services.meal_reprocessing_service import MealReprocessingService
+
+
+def _print_progress(checkpoint: dict):
+    print(
+        f"updated={checkpoint['updated']} failed={checkpoint['failed']} "
+        f"last_meal_id={checkpoint['last_meal_id']}",
+        flush=True
+    )
+
+
+async def run_reprocess(args: argparse.Namespace) -> dict:
+    """
+    Run a reprocessing pass with LLM connection pools open.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        Final checkpoint
+    """
+    await LLMService.startup()
+    try:
+        return await MealReprocessingService.run(
+            SessionLocal,
+            checkpoint_path=args.checkpoint,
+            chunk_size=args.chunk_size,
+            concurrency=args.concurrency,
+            include_stale=args.include_stale,
+            auto_enrich=not args.no_enrich,
+            restart=args.restart,
+            progress=_print_progress
+        )
+    finally:
+        await LLMService.shutdown()
+
+
+def main():
+    """Console entry point (pulse-reprocess)"""
+    parser = argparse.ArgumentParser(description="Reparse unprocessed or stale meals")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Meals per write transaction")
+    parser.add_argument("--concurrency", type=int, default=8, help="Meals parsed at once")
+    parser.add_argument(
+        "--include-stale",
+        action="store_true",
+        help="Also reparse meals produced by another model or prompt version"
+    )
+    parser.add_argument("--no-enrich", action="store_true", help="Skip detailed macro enrichment")
+    parser.add_argument(
+        "--checkpoint",
+        default="./reprocess_checkpoint.json",
+        help="Progress file used to resume after an interruption"
+    )
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    init_db()
+    checkpoint = asyncio.run(run_reprocess(args))
+    print(
+        f"Done: updated={checkpoint['updated']} failed={checkpoint['failed']} "
+        f"summaries_rebuilt={checkpoint['summaries_rebuilt']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,11 @@
 """Food database API routes"""
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
 from app.core.security import get_current_user_id
 from app.schemas import FoodDatabaseCreate, FoodDatabaseResponse
-from app.services.nutrition_service import FoodService
+from app.services.nutrition_service import AsyncFoodService
 from fastapi import Header
 
 router = APIRouter(prefix="/api/foods", tags=["foods"])
@@ -14,11 +14,11 @@ router = APIRouter(prefix="/api/foods", tags=["foods"])
 
 
 @router.get("/search", response_model=list[FoodDatabaseResponse])
-def search_foods(
+async def search_foods(
     q: str,
     limit: int = 10,
     user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Search food database by name.
@@ -38,15 +38,15 @@ def search_foods(
             detail="Search query must be at least 2 characters"
         )
     
-    foods = FoodService.search_food(db, q, limit)
+    foods = await AsyncFoodService.search_food(db, q, limit)
     return foods
 
 
 @router.get("/{food_id}", response_model=FoodDatabaseResponse)
-def get_food(
+async def get_food(
     food_id: str,
     user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get a specific food by ID.
@@ -59,7 +59,7 @@ def get_food(
     Returns:
         Food entry
     """
-    food = FoodService.get_food_by_id(db, food_id)
+    food = await AsyncFoodService.get_food_by_id(db, food_id)
     if not food:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -69,11 +69,11 @@ def get_food(
 
 
 @router.get("/category/{category}", response_model=list[FoodDatabaseResponse])
-def get_foods_by_category(
+async def get_foods_by_category(
     category: str,
     limit: int = 20,
     user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get foods by category.
@@ -87,15 +87,15 @@ def get_foods_by_category(
     Returns:
         List of foods in category
     """
-    foods = FoodService.get_foods_by_category(db, category, limit)
+    foods = await AsyncFoodService.get_foods_by_category(db, category, limit)
     return foods
 
 
 @router.post("", response_model=FoodDatabaseResponse)
-def create_food(
+async def create_food(
     food_data: FoodDatabaseCreate,
     user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a new food entry (user-contributed).
@@ -108,16 +108,16 @@ def create_food(
     Returns:
         Created food entry
     """
-    food = FoodService.create_food(db, food_data)
+    food = await AsyncFoodService.create_food(db, food_data)
     return food
 
 
 @router.get("", response_model=list[FoodDatabaseResponse])
-def get_all_foods(
+async def get_all_foods(
     limit: int = 100,
     offset: int = 0,
     user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get all foods in database.
@@ -131,5 +131,5 @@ def get_all_foods(
     Returns:
         List of foods
     """
-    foods = FoodService.get_all_foods(db, limit, offset)
+    foods = await AsyncFoodService.get_all_foods(db, limit, offset)
     return foods
@@ -2,16 +2,15 @@
 
 from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.security import get_current_user_id
 from app.schemas import (
     MealEntryCreate, MealEntryUpdate, MealEntryResponse,
     MealItemCreate, MealItemUpdate, MealItemResponse
 )
-from app.services.meal_service import MealService
-from app.services.nutrition_service import NutritionService
+from app.services.meal_service import AsyncMealService
 
 
 router = APIRouter(prefix="/api/meals", tags=["meals"])
@@ -19,10 +18,10 @@ router = APIRouter(prefix="/api/meals", tags=["meals"])
 
 
 @router.post("/log", response_model=MealEntryResponse)
-def log_meal(
+async def log_meal(
     meal_data: MealEntryCreate,
     user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Log a new meal entry.
@@ -35,20 +34,17 @@ def log_meal(
     Returns:
         Created meal entry
     """
-    meal = MealService.create_meal_entry(db, user_id, meal_data)
-    
-    # Update daily nutrition summary
-    NutritionService.update_daily_summary(db, user_id, meal.meal_date)
+    meal = await AsyncMealService.create_meal_entry(db, user_id, meal_data)
     
     return meal
 
 
 @router.get("/all", response_model=list[MealEntryResponse])
-def get_all_meals(
+async def get_all_meals(
     limit: int = 100,
     offset: int = 0,
     user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get all meals for current user.
@@ -62,15 +58,15 @@ def get_all_meals(
     Returns:
         List of meal entries
     """
-    meals = MealService.get_user_meals(db, user_id, limit, offset)
+    meals = await AsyncMealService.get_user_meals(db, user_id, limit, offset)
     return meals
 
 
 @router.get("/date/{meal_date}", response_model=list[MealEntryResponse])
-def get_meals_by_date(
+async def get_meals_by_date(
     meal_date: date,
     user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get all meals for current user on a specific date.
@@ -83,15 +79,15 @@ def get_meals_by_date(
     Returns:
         List of meal entries
     """
-    meals = MealService.get_user_meals_by_date(db, user_id, meal_date)
+    meals = await AsyncMealService.get_user_meals_by_date(db, user_id, meal_date)
     return meals
 
 
 @router.get("/{meal_id}", response_model=MealEntryResponse)
-def get_meal(
+async def get_meal(
     meal_id: str,
     user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get a specific meal entry.
@@ -104,7 +100,7 @@ def get_meal(
     Returns:
         Meal entry
     """
-    meal = MealService.get_meal_by_id(db, meal_id, user_id)
+    meal = await AsyncMealService.get_meal_by_id(db, meal_id, user_id)
     if not meal:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -114,11 +110,11 @@ def get_meal(
 
 
 @router.put("/{meal_id}", response_model=MealEntryResponse)
-def update_meal(
+async def update_meal(
     meal_id: str,
     meal_data: MealEntryUpdate,
     user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update a meal entry.
@@ -132,24 +128,21 @@ def update_meal(
     Returns:
         Updated meal entry
     """
-    meal = MealService.update_meal_entry(db, meal_id, user_id, meal_data)
+    meal = await AsyncMealService.update_meal_entry(db, meal_id, user_id, meal_data)
     if not meal:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Meal not found"
         )
     
-    # Update daily nutrition summary
-    NutritionService.update_daily_summary(db, user_id, meal.meal_date)
-    
     return meal
 
 
 @router.delete("/{meal_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_meal(
+async def delete_meal(
     meal_id: str,
     user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a meal entry.
@@ -159,27 +152,19 @@ def delete_meal(
         user_id: Current user ID
         db: Database session
     """
-    # Get meal first to know the date for updating summary
-    meal = MealService.get_meal_by_id(db, meal_id, user_id)
-    if not meal:
+    if not await AsyncMealService.delete_meal_entry(db, meal_id, user_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Meal not found"
         )
-    
-    meal_date = meal.meal_date
-    MealService.delete_meal_entry(db, meal_id, user_id)
-    
-    # Update daily nutrition summary
-    NutritionService.update_daily_summary(db, user_id, meal_date)
 
 
 # Meal Item endpoints
 @router.get("/{meal_id}/items", response_model=list[MealItemResponse])
-def get_meal_items(
+async def get_meal_items(
     meal_id: str,
     user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get all items in a meal.
@@ -193,22 +178,22 @@ def get_meal_items(
         List of meal items
     """
     # Verify meal ownership
-    meal = MealService.get_meal_by_id(db, meal_id, user_id)
+    meal = await AsyncMealService.get_meal_by_id(db, meal_id, user_id)
     if not meal:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Meal not found"
         )
     
-    return MealService.get_meal_items(db, meal_id)
+    return await AsyncMealService.get_meal_items(db, meal_id)
 
 
 @router.post("/{meal_id}/items", response_model=MealItemResponse)
-def add_meal_item(
+async def add_meal_item(
     meal_id: str,
     item_data: MealItemCreate,
     user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Add an item to a meal.
@@ -223,28 +208,25 @@ def add_meal_item(
         Created meal item
     """
     # Verify meal ownership
-    meal = MealService.get_meal_by_id(db, meal_id, user_id)
+    meal = await AsyncMealService.get_meal_by_id(db, meal_id, user_id)
     if not meal:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Meal not found"
         )
     
-    item = MealService.add_meal_item(db, meal_id, item_data)
-    
-    # Update daily nutrition summary
-    NutritionService.update_daily_summary(db, user_id, meal.meal_date)
+    item = await AsyncMealService.add_meal_item(db, meal_id, item_data)
     
     return item
 
 
 @router.put("/{meal_id}/items/{item_id}", response_model=MealItemResponse)
-def update_meal_item(
+async def update_meal_item(
     meal_id: str,
     item_id: str,
     item_data: MealItemUpdate,
     user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update a meal item.
@@ -260,32 +242,29 @@ def update_meal_item(
         Updated meal item
     """
     # Verify meal ownership
-    meal = MealService.get_meal_by_id(db, meal_id, user_id)
+    meal = await AsyncMealService.get_meal_by_id(db, meal_id, user_id)
     if not meal:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Meal not found"
         )
     
-    item = MealService.update_meal_item(db, item_id, item_data)
+    item = await AsyncMealService.update_meal_item(db, item_id, item_data)
     if not item:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Item not found"
         )
     
-    # Update daily nutrition summary
-    NutritionService.update_daily_summary(db, user_id, meal.meal_date)
-    
     return item
 
 
 @router.delete("/{meal_id}/items/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_meal_item(
+async def delete_meal_item(
     meal_id: str,
     item_id: str,
     user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a meal item.
@@ -297,18 +276,15 @@ def delete_meal_item(
         db: Database session
     """
     # Verify meal ownership
-    meal = MealService.get_meal_by_id(db, meal_id, user_id)
+    meal = await AsyncMealService.get_meal_by_id(db, meal_id, user_id)
     if not meal:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Meal not found"
         )
     
-    if not MealService.delete_meal_item(db, item_id):
+    if not await AsyncMealService.delete_meal_item(db, item_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Item not found"
         )
-    
-    # Update daily nutrition summary
-    NutritionService.update_daily_summary(db, user_id, meal.meal_date)
@@ -1,12 +1,16 @@
 """Enhanced meal routes with agentic processing"""
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import json
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date
-from pydantic import BaseModel
-from app.core.database import get_db
+from pydantic import BaseModel, Field
+from app.agents import MealParsingAgent
+from app.core.database import get_async_db, run_in_session
 from app.core.security import get_current_user_id
-from app.schemas import MealEntryResponse
+from app.schemas import MealEntryResponse, MealProcessingJobResponse
+from app.services.meal_job_service import MealJobService
 from app.services.meal_processing_service import MealProcessingService
 from fastapi import Header
 
@@ -20,13 +24,19 @@ class MealLogRequest(BaseModel):
     meal_date: date
     meal_time: str = None
     auto_enrich: bool = True  # Auto-fetch detailed macros
+    combined_prompt: bool = False  # Parse items and macros in one LLM call
+
+
+class MealBatchLogRequest(BaseModel):
+    """Request for logging several meals with natural language"""
+    meals: list[MealLogRequest] = Field(..., min_length=1, max_length=100)
 
 
 @router.post("/log-ai", response_model=MealEntryResponse)
 async def log_meal_with_ai(
     request: MealLogRequest,
     user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Log a meal using natural language processing.
@@ -48,7 +58,8 @@ async def log_meal_with_ai(
             meal_type=request.meal_type,
             meal_date=request.meal_date,
             meal_time=request.meal_time,
-            auto_enrich=request.auto_enrich
+            auto_enrich=request.auto_enrich,
+            combined_prompt=request.combined_prompt
         )
         return meal
     except Exception as e:
@@ -58,6 +69,180 @@ async def log_meal_with_ai(
         )
 
 
+@router.post("/log-ai/batch", response_model=list[MealEntryResponse])
+async def log_meals_with_ai_batch(
+    request: MealBatchLogRequest,
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Log several meals using natural language processing in one request.
+    Equivalent descriptions are parsed once and all meals are saved together.
+    
+    Args:
+        request: Meals to log
+        user_id: Current user ID
+        db: Database session
+        
+    Returns:
+        Created meal entries, in request order
+    """
+    try:
+        return await MealProcessingService.process_meals_batch(
+            db=db,
+            user_id=user_id,
+            meals=[meal.model_dump() for meal in request.meals]
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Meal processing failed: {str(e)}"
+        )
+
+
+def _job_response(job) -> MealProcessingJobResponse:
+    """Build a job status response, including the meal once processed"""
+    response = MealProcessingJobResponse.model_validate(job)
+    # The meal may have been deleted since the job finished
+    if job.status == "SUCCEEDED" and job.meal_entry is not None:
+        response.meal = MealEntryResponse.model_validate(job.meal_entry)
+    return response
+
+
+@router.post(
+    "/log-ai/async",
+    response_model=MealProcessingJobResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
+async def log_meal_with_ai_async(
+    request: MealLogRequest,
+    response: Response,
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Log a meal and process it with the AI agent in the background.
+    The meal is stored immediately (is_processed=False); poll the job
+    status endpoint until it has succeeded or failed.
+    
+    Args:
+        request: Meal logging request with natural language description
+        response: Response (used to set the Location header)
+        user_id: Current user ID
+        db: Database session
+        
+    Returns:
+        Queued job
+    """
+    try:
+        job = await run_in_session(
+            db,
+            MealJobService.create_meal_job,
+            user_id=user_id,
+            meal_description=request.meal_description,
+            meal_type=request.meal_type,
+            meal_date=request.meal_date,
+            meal_time=request.meal_time,
+            auto_enrich=request.auto_enrich,
+            combined_prompt=request.combined_prompt
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to queue meal: {str(e)}"
+        )
+    
+    response.headers["Location"] = f"{router.prefix}/jobs/{job.job_id}"
+    return _job_response(job)
+
+
+@router.get("/jobs/{job_id}", response_model=MealProcessingJobResponse)
+async def get_meal_job(
+    job_id: str,
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get the status of an asynchronous meal processing job.
+    
+    Args:
+        job_id: Job ID
+        user_id: Current user ID
+        db: Database session
+        
+    Returns:
+        Job status, with the processed meal once it has succeeded
+    """
+    job = await run_in_session(db, MealJobService.get_job, job_id, user_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return _job_response(job)
+
+
+def _sse_event(event: str, data: dict) -> str:
+    """Format a server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/log-ai/stream")
+async def log_meal_with_ai_stream(
+    request: MealLogRequest,
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Log a meal using natural language processing, streaming progress as
+    server-sent events.
+    
+    Emits an "item" event for each food item as soon as the model has
+    produced it, then a "meal" event with the saved meal entry (or an
+    "error" event if processing fails).
+    
+    Args:
+        request: Meal logging request with natural language description
+        user_id: Current user ID
+        db: Database session
+        
+    Returns:
+        Event stream response
+    """
+    async def event_stream():
+        try:
+            items = []
+            # Rule-parsed items have no calories; without enrichment ask the model
+            async for item in MealParsingAgent.parse_meal_stream(
+                request.meal_description,
+                combined=request.combined_prompt,
+                allow_fast=request.auto_enrich
+            ):
+                items.append(item)
+                yield _sse_event("item", item.model_dump())
+            
+            meal = await MealProcessingService.process_meal_with_agent(
+                db=db,
+                user_id=user_id,
+                meal_description=request.meal_description,
+                meal_type=request.meal_type,
+                meal_date=request.meal_date,
+                meal_time=request.meal_time,
+                auto_enrich=request.auto_enrich,
+                parse_result=MealParsingAgent.build_parse_result(items)
+            )
+            meal_response = MealEntryResponse.model_validate(meal)
+            yield _sse_event("meal", meal_response.model_dump(mode="json"))
+        except Exception as e:
+            yield _sse_event("error", {"detail": f"Meal processing failed: {str(e)}"})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 class ManualMealLogRequest(BaseModel):
     """Request for logging a meal manually"""
     meal_description: str
@@ -71,7 +256,7 @@ class ManualMealLogRequest(BaseModel):
 async def log_meal_manual(
     request: ManualMealLogRequest,
     user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Log a meal with manually provided items.
@@ -2,12 +2,12 @@
 
 from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.security import get_current_user_id
 from app.schemas import DailyNutritionSummaryResponse
-from app.services.nutrition_service import NutritionService
+from app.services.nutrition_service import AsyncNutritionService
 from fastapi import Header
 
 router = APIRouter(prefix="/api/nutrition", tags=["nutrition"])
@@ -15,10 +15,10 @@ router = APIRouter(prefix="/api/nutrition", tags=["nutrition"])
 
 
 @router.get("/daily/{nutrition_date}", response_model=DailyNutritionSummaryResponse)
-def get_daily_nutrition(
+async def get_daily_nutrition(
     nutrition_date: date,
     user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get daily nutrition summary for a specific date.
@@ -31,19 +31,19 @@ def get_daily_nutrition(
     Returns:
         Daily nutrition summary
     """
-    summary = NutritionService.get_daily_summary(db, user_id, nutrition_date)
+    summary = await AsyncNutritionService.get_daily_summary(db, user_id, nutrition_date)
     if not summary:
         # Return empty summary if none exists
-        summary = NutritionService.update_daily_summary(db, user_id, nutrition_date)
+        summary = await AsyncNutritionService.update_daily_summary(db, user_id, nutrition_date)
     
     return summary
 
 
 @router.get("/weekly", response_model=list[DailyNutritionSummaryResponse])
-def get_weekly_nutrition(
+async def get_weekly_nutrition(
     end_date: date = None,
     user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get weekly nutrition summary (last 7 days).
@@ -63,18 +63,18 @@ def get_weekly_nutrition(
     
     start_date = end_date - timedelta(days=6)
     
-    summaries = NutritionService.get_date_range_summaries(
+    summaries = await AsyncNutritionService.get_date_range_summaries(
         db, user_id, start_date, end_date
     )
     return summaries
 
 
 @router.get("/range", response_model=list[DailyNutritionSummaryResponse])
-def get_nutrition_range(
+async def get_nutrition_range(
     start_date: date,
     end_date: date,
     user_id: str = Depends(get_current_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get nutrition summaries for a custom date range.
@@ -88,7 +88,7 @@ def get_nutrition_range(
     Returns:
         List of daily nutrition summaries
     """
-    summaries = NutritionService.get_date_range_summaries(
+    summaries = await AsyncNutritionService.get_date_range_summaries(
         db, user_id, start_date, end_date
     )
     return summaries
@@ -123,6 +123,7 @@ class MealItemResponse(MealItemBase):
     """Meal item response schema"""
     item_id: str
     meal_id: str
+    quantity_grams: Optional[float] = None
     calories: Optional[float]
     is_verified: bool
     source: str
@@ -161,6 +162,7 @@ class MealEntryResponse(MealEntryBase):
     meal_id: str
     user_id: str
     is_processed: bool
+    parser_version: Optional[str] = None
     meal_items: List[MealItemResponse]
     created_at: datetime
     updated_at: datetime
@@ -169,6 +171,22 @@ class MealEntryResponse(MealEntryBase):
         from_attributes = True
 
 
+class MealProcessingJobResponse(BaseModel):
+    """Asynchronous meal processing job status"""
+    job_id: str
+    meal_id: str
+    status: str  # PENDING, RUNNING, SUCCEEDED, FAILED
+    attempts: int
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    meal: Optional[MealEntryResponse] = None  # Set once the job has succeeded
+    
+    class Config:
+        from_attributes = True
+
+
 # Daily Nutrition Summary Schemas
 class DailyNutritionSummaryResponse(BaseModel):
     """Daily nutrition summary response schema"""
@@ -194,7 +212,15 @@ class FoodDatabaseBase(BaseModel):
     food_name: str
     serving_size: float
     serving_unit: str
+    density_g_per_ml: Optional[float] = None
+    grams_per_piece: Optional[float] = None
     calories_per_serving: Optional[float] = None
+    protein_grams: Optional[float] = None
+    carbs_grams: Optional[float] = None
+    fat_grams: Optional[float] = None
+    fiber_grams: Optional[float] = None
+    sugar_grams: Optional[float] = None
+    sodium_mg: Optional[float] = None
     category: Optional[str] = None
 
 
@@ -206,6 +232,7 @@ class FoodDatabaseCreate(FoodDatabaseBase):
 class FoodDatabaseResponse(FoodDatabaseBase):
     """Food database response schema"""
     food_id: str
+    serving_grams: Optional[float] = None
     verified_by_usda: bool
     created_at: datetime
     
@@ -0,0 +1,442 @@
+"""
+Asynchronous AI meal processing
+Stores meals immediately and runs the LLM pipeline from a DB-backed job queue
+"""
+
+import asyncio
+import os
+import socket
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Callable, Optional
+from sqlalchemy import and_, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from app.core.database import close_session, run_in_session
+from app.core.metrics import metrics
+from app.core.settings import settings
+from app.models import MealEntry, MealItem, MealProcessingJob
+from app.schemas import MealEntryCreate
+from app.services.meal_processing_service import MealProcessingService
+from app.services.nutrition_service import NutritionService
+
+
+class MealJobService:
+    """Service for queueing and running meal processing jobs"""
+    
+    @staticmethod
+    def create_meal_job(
+        db: Session,
+        user_id: str,
+        meal_description: str,
+        meal_type: str,
+        meal_date: date,
+        meal_time = None,
+        auto_enrich: bool = True,
+        combined_prompt: bool = False
+    ) -> MealProcessingJob:
+        """
+        Store an unprocessed meal and queue it for AI processing.
+        
+        Args:
+            db: Database session
+            user_id: User ID
+            meal_description: Raw meal text
+            meal_type: Type of meal (BREAKFAST, LUNCH, etc.)
+            meal_date: Date of meal
+            meal_time: Time of meal (optional)
+            auto_enrich: Whether to fetch detailed nutrition data
+            combined_prompt: Parse and enrich with a single LLM prompt
+        
+        Returns:
+            Created job (PENDING)
+        """
+        meal_data = MealEntryCreate(
+            meal_type=meal_type,
+            meal_description=meal_description,
+            meal_date=meal_date,
+            meal_time=meal_time,
+            meal_items=[]
+        )
+        
+        meal = MealEntry(
+            user_id=user_id,
+            meal_type=meal_data.meal_type,
+            meal_description=meal_data.meal_description,
+            meal_date=meal_data.meal_date,
+            meal_time=meal_data.meal_time,
+            original_log=meal_description,
+            is_processed=False  # Items are added by the worker
+        )
+        db.add(meal)
+        db.flush()
+        
+        job = MealProcessingJob(
+            meal_id=meal.meal_id,
+            user_id=user_id,
+            status="PENDING",
+            options={"auto_enrich": auto_enrich, "combined_prompt": combined_prompt}
+        )
+        db.add(job)
+        # The meal counts toward its day now; items add to it when processed
+        NutritionService.apply_summary_delta(db, user_id, meal.meal_date, meal_count=1)
+        db.commit()
+        db.refresh(job)
+        
+        metrics.increment("meal_jobs.created")
+        MealJobWorkerPool.notify()
+        return job
+    
+    @staticmethod
+    def get_job(db: Session, job_id: str, user_id: str) -> MealProcessingJob | None:
+        """
+        Get a job by ID (ensuring it belongs to user).
+        
+        Args:
+            db: Database session
+            job_id: Job ID
+            user_id: User ID
+        
+        Returns:
+            Job or None (with its meal, items and macros loaded)
+        """
+        return db.query(MealProcessingJob).options(
+            selectinload(MealProcessingJob.meal_entry)
+            .selectinload(MealEntry.meal_items)
+            .selectinload(MealItem.macronutrients)
+        ).filter(
+            MealProcessingJob.job_id == job_id,
+            MealProcessingJob.user_id == user_id
+        ).first()
+    
+    @staticmethod
+    def claim_next_job(db: Session, owner: str) -> MealProcessingJob | None:
+        """
+        Lease the oldest claimable job.
+        
+        A job is claimable when PENDING or when its lease has expired (the
+        worker running it died). The claim is a conditional UPDATE, so when
+        several workers race for the same job exactly one wins.
+        
+        Args:
+            db: Database session
+            owner: Worker identity recorded as the lease owner
+        
+        Returns:
+            Leased job or None if nothing is claimable
+        """
+        now = datetime.utcnow()
+        claimable = or_(
+            MealProcessingJob.status == "PENDING",
+            and_(
+                MealProcessingJob.status == "RUNNING",
+                MealProcessingJob.lease_expires_at < now
+            )
+        )
+        
+        candidates = db.query(
+            MealProcessingJob.job_id, MealProcessingJob.attempts
+        ).filter(claimable).order_by(MealProcessingJob.created_at).limit(10).all()
+        
+        for job_id, attempts in candidates:
+            if (attempts or 0) >= settings.meal_job_max_attempts:
+                # Give up on jobs whose workers keep dying
+                values = {
+                    "status": "FAILED",
+                    "error": f"Lease expired after {attempts} attempts",
+                    "finished_at": now,
+                    "lease_owner": None,
+                    "lease_expires_at": None
+                }
+            else:
+                values = {
+                    "status": "RUNNING",
+                    "attempts": MealProcessingJob.attempts + 1,
+                    "started_at": now,
+                    "heartbeat_at": now,
+                    "lease_owner": owner,
+                    "lease_expires_at": now + timedelta(seconds=settings.meal_job_lease_seconds)
+                }
+            
+            claimed = db.execute(
+                update(MealProcessingJob)
+                .where(MealProcessingJob.job_id == job_id, claimable)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+            
+            if not claimed:
+                metrics.increment("meal_jobs.claim_conflicts")
+                continue
+            if values["status"] == "FAILED":
+                metrics.increment("meal_jobs.abandoned")
+                continue
+            
+            job = db.get(MealProcessingJob, job_id, populate_existing=True)
+            metrics.observe(
+                "meal_jobs.queue_wait",
+                (job.started_at - job.created_at).total_seconds()
+            )
+            return job
+        
+        return None
+    
+    @staticmethod
+    def renew_lease(db: Session, job_id: str, owner: str) -> bool:
+        """
+        Extend a job lease (heartbeat).
+        
+        Args:
+            db: Database session
+            job_id: Job ID
+            owner: Worker identity holding the lease
+        
+        Returns:
+            True if the lease is still held by owner
+        """
+        now = datetime.utcnow()
+        renewed = db.execute(
+            update(MealProcessingJob)
+            .where(
+                MealProcessingJob.job_id == job_id,
+                MealProcessingJob.lease_owner == owner,
+                MealProcessingJob.status == "RUNNING"
+            )
+            .values(
+                heartbeat_at=now,
+                lease_expires_at=now + timedelta(seconds=settings.meal_job_lease_seconds)
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        return bool(renewed)
+    
+    @staticmethod
+    def _finish_job(db: Session, job_id: str, owner: str, status: str, error: Optional[str]) -> bool:
+        """
+        Record a job outcome if owner still holds its lease (no commit).
+        
+        Args:
+            db: Database session
+            job_id: Job ID
+            owner: Worker identity holding the lease
+            status: SUCCEEDED or FAILED
+            error: Failure message
+        
+        Returns:
+            True if the job was updated
+        """
+        return bool(db.execute(
+            update(MealProcessingJob)
+            .where(
+                MealProcessingJob.job_id == job_id,
+                MealProcessingJob.lease_owner == owner,
+                MealProcessingJob.status == "RUNNING"
+            )
+            .values(
+                status=status,
+                error=error,
+                finished_at=datetime.utcnow(),
+                lease_owner=None,
+                lease_expires_at=None
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount)
+    
+    @staticmethod
+    async def _heartbeat(
+        session_factory: Callable[[], Session | AsyncSession],
+        job_id: str,
+        owner: str
+    ):
+        """Renew a lease periodically until cancelled"""
+        while True:
+            await asyncio.sleep(settings.meal_job_heartbeat_seconds)
+            db = session_factory()
+            try:
+                if not await run_in_session(db, MealJobService.renew_lease, job_id, owner):
+                    return
+            except Exception:
+                metrics.increment("meal_jobs.heartbeat_errors")
+            finally:
+                await close_session(db)
+    
+    @staticmethod
+    async def run_job(
+        db: Session | AsyncSession,
+        job: MealProcessingJob,
+        owner: str,
+        session_factory: Optional[Callable[[], Session | AsyncSession]] = None
+    ) -> MealProcessingJob:
+        """
+        Run the AI pipeline for a leased job and write results back.
+        
+        The meal items, their summary delta and the job outcome are
+        committed together, and only
+        if the lease is still ours; a worker that lost its lease (e.g. it
+        stalled past the visibility timeout) discards its results.
+        
+        Args:
+            db: Database session (sync or async)
+            job: Leased job
+            owner: Worker identity holding the lease
+            session_factory: Creates sessions for heartbeats (none if omitted)
+        
+        Returns:
+            The job, refreshed with its final state
+        """
+        options = job.options or {}
+        job_id = job.job_id
+        started = datetime.utcnow()
+        
+        heartbeat = None
+        if session_factory is not None:
+            heartbeat = asyncio.create_task(
+                MealJobService._heartbeat(session_factory, job_id, owner)
+            )
+        
+        try:
+            meal = await run_in_session(db, Session.get, MealEntry, job.meal_id)
+            await MealProcessingService.attach_agent_items(
+                db,
+                meal,
+                auto_enrich=options.get("auto_enrich", True),
+                combined_prompt=options.get("combined_prompt", False)
+            )
+            status, error = "SUCCEEDED", None
+        except Exception as e:
+            await run_in_session(db, Session.rollback)
+            status, error = "FAILED", f"Meal processing failed: {str(e)}"
+        finally:
+            if heartbeat is not None:
+                heartbeat.cancel()
+        
+        def finish(session: Session) -> bool:
+            if MealJobService._finish_job(session, job_id, owner, status, error):
+                session.commit()
+                return True
+            session.rollback()
+            return False
+        
+        if await run_in_session(db, finish):
+            metrics.increment(f"meal_jobs.{status.lower()}")
+        else:
+            metrics.increment("meal_jobs.lease_lost")
+        
+        metrics.observe("meal_jobs.run", (datetime.utcnow() - started).total_seconds())
+        return await run_in_session(
+            db, Session.get, MealProcessingJob, job_id, populate_existing=True
+        )
+    
+    @staticmethod
+    async def run_next_job(
+        db: Session | AsyncSession,
+        owner: str,
+        session_factory: Optional[Callable[[], Session | AsyncSession]] = None
+    ) -> MealProcessingJob | None:
+        """
+        Lease and run the oldest claimable job.
+        
+        Args:
+            db: Database session (sync or async)
+            owner: Worker identity
+            session_factory: Creates sessions for heartbeats
+        
+        Returns:
+            Finished job or None if the queue was empty
+        """
+        job = await run_in_session(db, MealJobService.claim_next_job, owner)
+        if job is None:
+            return None
+        return await MealJobService.run_job(db, job, owner, session_factory)
+
+
+def make_worker_id() -> str:
+    """
+    Build a worker identity unique across hosts and processes.
+    
+    Returns:
+        "<hostname>:<pid>:<random>"
+    """
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class MealJobWorkerPool:
+    """
+    Workers draining the meal processing job queue (in the API or a worker process)
+    
+    Workers share the event loop with whatever else runs there, so give them
+    an AsyncSession factory; a sync one blocks the loop on every query.
+    """
+    
+    _tasks: list[asyncio.Task] = []
+    _wakeup: Optional[asyncio.Event] = None
+    _session_factory: Optional[Callable[[], Session | AsyncSession]] = None
+    _owner: Optional[str] = None
+    
+    @classmethod
+    async def start(
+        cls,
+        session_factory: Callable[[], Session | AsyncSession],
+        workers: Optional[int] = None
+    ):
+        """
+        Start worker tasks on the running event loop.
+        
+        Args:
+            session_factory: Creates a database session per job (preferably async)
+            workers: Number of concurrent jobs (defaults to settings.meal_job_workers)
+        """
+        workers = settings.meal_job_workers if workers is None else workers
+        if cls._tasks or workers <= 0:
+            return
+        
+        cls._session_factory = session_factory
+        cls._wakeup = asyncio.Event()
+        cls._owner = make_worker_id()
+        cls._tasks = [asyncio.create_task(cls._worker()) for _ in range(workers)]
+    
+    @classmethod
+    async def stop(cls):
+        """Cancel worker tasks; their leases expire and the jobs are retried"""
+        tasks = cls._tasks
+        cls._tasks = []
+        cls._wakeup = None
+        
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    @classmethod
+    def notify(cls):
+        """Wake idle workers because a job was queued"""
+        if cls._wakeup is not None:
+            cls._wakeup.set()
+    
+    @classmethod
+    async def _worker(cls):
+        wakeup = cls._wakeup
+        while True:
+            # Clear before claiming so a job queued meanwhile still wakes us
+            wakeup.clear()
+            
+            db = cls._session_factory()
+            try:
+                job = await MealJobService.run_next_job(
+                    db, cls._owner, cls._session_factory
+                )
+            except Exception:
+                metrics.increment("meal_jobs.worker_errors")
+                job = None
+            finally:
+                await close_session(db)
+            
+            if job is None:
+                try:
+                    await asyncio.wait_for(
+                        wakeup.wait(),
+                        timeout=settings.meal_job_poll_interval_seconds
+                    )
+                except asyncio.TimeoutError:
+                    pass
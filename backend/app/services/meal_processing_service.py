@@ -2,17 +2,29 @@
 Meal processing service that integrates agentic parsing
 """
 
+import asyncio
+from typing import Optional
 from sqlalchemy.orm import Session
 from datetime import date
-from app.models import MealEntry
+from app.agents import MealParseResult, MealParsingAgent
+from app.agents.normalization import canonicalize_description
+from app.core.database import run_in_session
+from app.core.metrics import metrics
+from app.core.settings import settings
+from app.models import MealEntry, MealItem, Macronutrients
 from app.services.meal_service import MealService
 from app.services.validation_service import MealValidationService
 from app.services.nutrition_service import NutritionService
-from app.schemas import MealItemCreate, MacronutrientsBase
+from app.services.unit_conversion_service import UnitConversionService
 
 
 class MealProcessingService:
-    """Service for processing meals with agentic parsing"""
+    """
+    Service for processing meals with agentic parsing
+    
+    Methods take a Session or an AsyncSession; database work runs through
+    run_in_session so async callers never block the event loop on it.
+    """
     
     @staticmethod
     async def process_meal_with_agent(
@@ -22,19 +34,23 @@ class MealProcessingService:
         meal_type: str,
         meal_date: date,
         meal_time = None,
-        auto_enrich: bool = True
+        auto_enrich: bool = True,
+        parse_result: Optional[MealParseResult] = None,
+        combined_prompt: bool = False
     ) -> MealEntry:
         """
         Process a meal description using agentic parsing.
         
         Args:
-            db: Database session
+            db: Database session (sync or async)
             user_id: User ID
             meal_description: Raw meal text
             meal_type: Type of meal (BREAKFAST, LUNCH, etc.)
             meal_date: Date of meal
             meal_time: Time of meal (optional)
             auto_enrich: Whether to fetch detailed nutrition data
+            parse_result: Already parsed items (e.g. from a stream); skips parsing
+            combined_prompt: Parse and enrich with a single LLM prompt
             
         Returns:
             Created meal entry with parsed items
@@ -44,7 +60,9 @@ class MealProcessingService:
             parse_result, enriched_items = await MealValidationService.parse_and_enrich_meal(
                 meal_description,
                 db,
-                enrich_nutrition=auto_enrich
+                enrich_nutrition=auto_enrich,
+                parse_result=parse_result,
+                combined=combined_prompt
             )
             
             # Create meal entry
@@ -57,69 +75,267 @@ class MealProcessingService:
                 meal_items=[]
             )
             
-            meal = MealEntry(
-                user_id=user_id,
-                meal_type=meal_data.meal_type,
-                meal_description=meal_data.meal_description,
-                meal_date=meal_data.meal_date,
-                meal_time=meal_data.meal_time,
-                original_log=meal_description,
-                is_processed=True  # Mark as processed by agent
-            )
-            
-            db.add(meal)
-            db.flush()  # Get meal_id
-            
-            # Add enriched items to meal
-            for enriched_item in enriched_items:
-                # Validate item
-                is_valid, errors = MealValidationService.validate_meal_item(
-                    enriched_item["food_name"],
-                    enriched_item["quantity"],
-                    enriched_item["estimated_calories"],
-                    enriched_item["confidence_score"]
+            def save(session: Session) -> MealEntry:
+                meal = MealEntry(
+                    user_id=user_id,
+                    meal_type=meal_data.meal_type,
+                    meal_description=meal_data.meal_description,
+                    meal_date=meal_data.meal_date,
+                    meal_time=meal_data.meal_time,
+                    original_log=meal_description,
+                    is_processed=True,  # Mark as processed by agent
+                    parser_version=MealParsingAgent.parser_version()
                 )
                 
-                # Create meal item (add even if validation errors, flag for review)
-                item = MealItem(
-                    meal_id=meal.meal_id,
-                    food_name=enriched_item["food_name"],
-                    quantity=enriched_item["quantity"],
-                    unit=enriched_item["unit"],
-                    calories=enriched_item["estimated_calories"],
-                    source=enriched_item["source"],
-                    confidence_score=enriched_item["confidence_score"],
-                    is_verified=is_valid  # Mark verified if no errors
-                )
+                session.add(meal)
+                session.flush()  # Get meal_id
                 
-                db.add(item)
-                db.flush()
+                totals = MealProcessingService._add_enriched_items(session, meal, enriched_items)
+                NutritionService.apply_summary_delta(session, user_id, meal_date, totals, meal_count=1)
                 
-                # Add macronutrients if available
-                if enriched_item["macronutrients"]:
-                    macros = Macronutrients(
-                        item_id=item.item_id,
-                        protein_grams=enriched_item["macronutrients"].get("protein_grams", 0),
-                        carbs_grams=enriched_item["macronutrients"].get("carbs_grams", 0),
-                        fat_grams=enriched_item["macronutrients"].get("fat_grams", 0),
-                        fiber_grams=enriched_item["macronutrients"].get("fiber_grams", 0),
-                        sugar_grams=enriched_item["macronutrients"].get("sugar_grams", 0),
-                        sodium_mg=enriched_item["macronutrients"].get("sodium_mg", 0)
+                session.commit()
+                return MealService.load_meal(session, meal.meal_id)
+            
+            return await run_in_session(db, save)
+        
+        except Exception as e:
+            await run_in_session(db, Session.rollback)
+            raise Exception(f"Meal processing failed: {str(e)}")
+    
+    @staticmethod
+    async def process_meals_batch(
+        db: Session,
+        user_id: str,
+        meals: list[dict]
+    ) -> list[MealEntry]:
+        """
+        Process several meal descriptions with agentic parsing at once.
+        
+        Equivalent descriptions (same canonical form) are parsed once,
+        parsing runs with at most settings.meal_batch_concurrency meals in
+        flight, and every meal is inserted in a single transaction along
+        with one summary update per affected day.
+        
+        Args:
+            db: Database session (sync or async)
+            user_id: User ID
+            meals: Meal dicts with meal_description, meal_type, meal_date and
+                optional meal_time, auto_enrich, combined_prompt
+            
+        Returns:
+            Created meal entries, in input order
+        """
+        def parse_key(meal_data: dict) -> tuple:
+            return (
+                canonicalize_description(meal_data["meal_description"]),
+                meal_data.get("auto_enrich", True),
+                meal_data.get("combined_prompt", False)
+            )
+        
+        unique = {}
+        for meal_data in meals:
+            unique.setdefault(parse_key(meal_data), meal_data["meal_description"])
+        metrics.increment("meal_batch.deduplicated", len(meals) - len(unique))
+        
+        semaphore = asyncio.Semaphore(max(1, settings.meal_batch_concurrency))
+        
+        async def parse(key: tuple, meal_description: str) -> list[dict]:
+            async with semaphore:
+                _, enriched_items = await MealValidationService.parse_and_enrich_meal(
+                    meal_description,
+                    db,
+                    enrich_nutrition=key[1],
+                    combined=key[2]
+                )
+                return enriched_items
+        
+        try:
+            results = await asyncio.gather(*[
+                parse(key, meal_description) for key, meal_description in unique.items()
+            ])
+            enriched_by_key = dict(zip(unique.keys(), results))
+            
+            from app.schemas import MealEntryCreate
+            
+            def save(session: Session) -> list[MealEntry]:
+                created = []
+                day_totals: dict[date, list[dict]] = {}
+                for meal_data in meals:
+                    entry_data = MealEntryCreate(
+                        meal_type=meal_data["meal_type"],
+                        meal_description=meal_data["meal_description"],
+                        meal_date=meal_data["meal_date"],
+                        meal_time=meal_data.get("meal_time"),
+                        meal_items=[]
+                    )
+                    meal = MealEntry(
+                        user_id=user_id,
+                        meal_type=entry_data.meal_type,
+                        meal_description=entry_data.meal_description,
+                        meal_date=entry_data.meal_date,
+                        meal_time=entry_data.meal_time,
+                        original_log=meal_data["meal_description"],
+                        is_processed=True,
+                        parser_version=MealParsingAgent.parser_version()
+                    )
+                    session.add(meal)
+                    session.flush()
+                    
+                    totals = MealProcessingService._add_enriched_items(
+                        session, meal, enriched_by_key[parse_key(meal_data)]
                     )
-                    db.add(macros)
+                    day_totals.setdefault(meal.meal_date, []).append(totals)
+                    created.append(meal.meal_id)
+                
+                # Update each affected daily summary once
+                for meal_date in sorted(day_totals):
+                    NutritionService.apply_summary_delta(
+                        session,
+                        user_id,
+                        meal_date,
+                        NutritionService.combine_totals(*day_totals[meal_date]),
+                        meal_count=len(day_totals[meal_date])
+                    )
+                
+                session.commit()
+                return [MealService.load_meal(session, meal_id) for meal_id in created]
             
-            db.commit()
-            db.refresh(meal)
+            return await run_in_session(db, save)
+        
+        except Exception as e:
+            await run_in_session(db, Session.rollback)
+            raise Exception(f"Batch meal processing failed: {str(e)}")
+    
+    @staticmethod
+    async def process_existing_meal(
+        db: Session,
+        meal: MealEntry,
+        auto_enrich: bool = True,
+        combined_prompt: bool = False
+    ) -> MealEntry:
+        """
+        Parse a stored, unprocessed meal and attach its items.
+        
+        Args:
+            db: Database session (sync or async)
+            meal: Meal entry saved without items
+            auto_enrich: Whether to fetch detailed nutrition data
+            combined_prompt: Parse and enrich with a single LLM prompt
+            
+        Returns:
+            The meal entry, now processed
+        """
+        try:
+            await MealProcessingService.attach_agent_items(
+                db, meal, auto_enrich, combined_prompt
+            )
             
-            # Update daily summary
-            NutritionService.update_daily_summary(db, user_id, meal_date)
+            def commit(session: Session) -> MealEntry:
+                session.commit()
+                return MealService.load_meal(session, meal.meal_id)
             
-            return meal
+            return await run_in_session(db, commit)
         
         except Exception as e:
-            db.rollback()
+            await run_in_session(db, Session.rollback)
             raise Exception(f"Meal processing failed: {str(e)}")
     
+    @staticmethod
+    async def attach_agent_items(
+        db: Session,
+        meal: MealEntry,
+        auto_enrich: bool = True,
+        combined_prompt: bool = False
+    ) -> MealEntry:
+        """
+        Parse a stored meal and add its items (and their summary delta)
+        without committing, so the caller can make the write conditional
+        (e.g. on holding a job lease).
+        
+        Args:
+            db: Database session (sync or async)
+            meal: Meal entry saved without items
+            auto_enrich: Whether to fetch detailed nutrition data
+            combined_prompt: Parse and enrich with a single LLM prompt
+            
+        Returns:
+            The meal entry, marked processed (pending commit)
+        """
+        _, enriched_items = await MealValidationService.parse_and_enrich_meal(
+            meal.meal_description,
+            db,
+            enrich_nutrition=auto_enrich,
+            combined=combined_prompt
+        )
+        
+        def attach(session: Session):
+            totals = MealProcessingService._add_enriched_items(session, meal, enriched_items)
+            meal.is_processed = True
+            meal.parser_version = MealParsingAgent.parser_version()
+            session.flush()
+            NutritionService.apply_summary_delta(session, meal.user_id, meal.meal_date, totals)
+        
+        await run_in_session(db, attach)
+        return meal
+    
+    @staticmethod
+    def _add_enriched_items(db: Session, meal: MealEntry, enriched_items: list[dict]) -> dict:
+        """
+        Add enriched items (and their macros) to a meal without committing.
+        
+        Args:
+            db: Database session
+            meal: Meal entry with a meal_id
+            enriched_items: Items from MealValidationService.parse_and_enrich_meal
+            
+        Returns:
+            The items' daily summary contribution (see NutritionService.item_totals)
+        """
+        totals = []
+        for enriched_item in enriched_items:
+            # Validate item
+            is_valid, errors = MealValidationService.validate_meal_item(
+                enriched_item["food_name"],
+                enriched_item["quantity"],
+                enriched_item["estimated_calories"],
+                enriched_item["confidence_score"]
+            )
+            
+            # Create meal item (add even if validation errors, flag for review)
+            item = MealItem(
+                meal_id=meal.meal_id,
+                food_name=enriched_item["food_name"],
+                quantity=enriched_item["quantity"],
+                unit=enriched_item["unit"],
+                quantity_grams=enriched_item["quantity_grams"],
+                calories=enriched_item["estimated_calories"],
+                source=enriched_item["source"],
+                confidence_score=enriched_item["confidence_score"],
+                is_verified=is_valid  # Mark verified if no errors
+            )
+            
+            db.add(item)
+            db.flush()
+            
+            # Add macronutrients if available
+            if enriched_item["macronutrients"]:
+                macros = Macronutrients(
+                    item_id=item.item_id,
+                    protein_grams=enriched_item["macronutrients"].get("protein_grams", 0),
+                    carbs_grams=enriched_item["macronutrients"].get("carbs_grams", 0),
+                    fat_grams=enriched_item["macronutrients"].get("fat_grams", 0),
+                    fiber_grams=enriched_item["macronutrients"].get("fiber_grams", 0),
+                    sugar_grams=enriched_item["macronutrients"].get("sugar_grams", 0),
+                    sodium_mg=enriched_item["macronutrients"].get("sodium_mg", 0)
+                )
+                db.add(macros)
+            else:
+                macros = None
+            
+            totals.append(NutritionService.item_totals(item.calories, macros))
+        
+        return NutritionService.combine_totals(*totals)
+    
     @staticmethod
     async def process_meal_manual(
         db: Session,
@@ -134,7 +350,7 @@ class MealProcessingService:
         Process a meal with manually provided items.
         
         Args:
-            db: Database session
+            db: Database session (sync or async)
             user_id: User ID
             meal_description: Meal description
             meal_type: Type of meal
@@ -145,7 +361,7 @@ class MealProcessingService:
         Returns:
             Created meal entry
         """
-        try:
+        def save(session: Session) -> MealEntry:
             # Create meal entry
             meal = MealEntry(
                 user_id=user_id,
@@ -157,24 +373,30 @@ class MealProcessingService:
                 is_processed=False  # Manual entry
             )
             
-            db.add(meal)
-            db.flush()
+            session.add(meal)
+            session.flush()
             
             # Add items
+            totals = []
             for item_data in meal_items:
                 item = MealItem(
                     meal_id=meal.meal_id,
                     food_name=item_data.get("food_name"),
                     quantity=item_data.get("quantity"),
                     unit=item_data.get("unit"),
+                    quantity_grams=UnitConversionService.to_grams(
+                        item_data.get("quantity"),
+                        item_data.get("unit"),
+                        item_data.get("food_name")
+                    ),
                     calories=item_data.get("calories"),
                     source="USER_INPUT",
                     confidence_score=1.0,
                     is_verified=True  # Manual entries are pre-verified
                 )
                 
-                db.add(item)
-                db.flush()
+                session.add(item)
+                session.flush()
                 
                 # Add macros if provided
                 if "macronutrients" in item_data:
@@ -187,16 +409,22 @@ class MealProcessingService:
                         sugar_grams=item_data["macronutrients"].get("sugar_grams", 0),
                         sodium_mg=item_data["macronutrients"].get("sodium_mg", 0)
                     )
-                    db.add(macros)
-            
-            db.commit()
-            db.refresh(meal)
+                    session.add(macros)
+                else:
+                    macros = None
+                
+                totals.append(NutritionService.item_totals(item.calories, macros))
             
-            # Update daily summary
-            NutritionService.update_daily_summary(db, user_id, meal_date)
+            NutritionService.apply_summary_delta(
+                session, user_id, meal_date, NutritionService.combine_totals(*totals), meal_count=1
+            )
             
-            return meal
+            session.commit()
+            return MealService.load_meal(session, meal.meal_id)
+        
+        try:
+            return await run_in_session(db, save)
         
         except Exception as e:
-            db.rollback()
+            await run_in_session(db, Session.rollback)
             raise Exception(f"Manual meal processing failed: {str(e)}")
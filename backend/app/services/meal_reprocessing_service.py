@@ -0,0 +1,308 @@
+"""
+Bulk re-processing of stored meals
+Reparses unprocessed meals, or meals parsed by an older model/prompt, in resumable chunks
+"""
+
+import asyncio
+import json
+import os
+from datetime import datetime
+from typing import Callable, Optional
+from sqlalchemy import and_, exists, or_
+from sqlalchemy.orm import Session
+from app.agents import MealParsingAgent
+from app.agents.normalization import canonicalize_description
+from app.core.metrics import metrics
+from app.models import MealEntry, MealItem, MealProcessingJob
+from app.services.meal_processing_service import MealProcessingService
+from app.services.meal_service import MEAL_TREE_OPTIONS
+from app.services.nutrition_service import NutritionService
+from app.services.validation_service import MealValidationService
+
+
+class MealReprocessingService:
+    """Service for reparsing stored meals in bulk"""
+
+    # Items with these sources were entered or fixed by the user; never overwrite them
+    PROTECTED_SOURCES = ["USER_INPUT", "MANUAL_CORRECTION"]
+
+    @staticmethod
+    def load_checkpoint(path: str) -> dict:
+        """
+        Load reprocessing progress.
+
+        Args:
+            path: Checkpoint file path
+
+        Returns:
+            Checkpoint dictionary (empty if there is none)
+        """
+        if not os.path.exists(path):
+            return {}
+        with open(path) as checkpoint_file:
+            return json.load(checkpoint_file)
+
+    @staticmethod
+    def save_checkpoint(path: str, checkpoint: dict):
+        """
+        Atomically write reprocessing progress.
+
+        Args:
+            path: Checkpoint file path
+            checkpoint: Progress to store
+        """
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def candidate_filter(parser_version: str, include_stale: bool):
+        """
+        Build the filter selecting meals to reparse.
+
+        Args:
+            parser_version: Current parser version
+            include_stale: Also select processed meals from another parser version
+
+        Returns:
+            SQLAlchemy filter expression
+        """
+        needs_parse = MealEntry.is_processed == False  # noqa: E712
+        if include_stale:
+            needs_parse = or_(
+                needs_parse,
+                MealEntry.parser_version.is_(None),
+                MealEntry.parser_version != parser_version
+            )
+
+        return and_(
+            needs_parse,
+            ~exists().where(
+                MealItem.meal_id == MealEntry.meal_id,
+                MealItem.source.in_(MealReprocessingService.PROTECTED_SOURCES)
+            ),
+            # Meals queued for async processing are left to the job workers
+            ~exists().where(
+                MealProcessingJob.meal_id == MealEntry.meal_id,
+                MealProcessingJob.status.in_(["PENDING", "RUNNING"])
+            )
+        )
+
+    @staticmethod
+    def fetch_chunk(
+        db: Session,
+        after_meal_id: Optional[str],
+        chunk_size: int,
+        parser_version: str,
+        include_stale: bool
+    ) -> list[tuple[str, str]]:
+        """
+        Fetch the next chunk of candidates by keyset pagination on meal_id.
+
+        Args:
+            db: Database session
+            after_meal_id: Last meal ID already handled (None to start)
+            chunk_size: Maximum meals to return
+            parser_version: Current parser version
+            include_stale: Also select meals from another parser version
+
+        Returns:
+            List of (meal_id, meal_description)
+        """
+        query = db.query(MealEntry.meal_id, MealEntry.meal_description).filter(
+            MealReprocessingService.candidate_filter(parser_version, include_stale)
+        )
+        if after_meal_id is not None:
+            query = query.filter(MealEntry.meal_id > after_meal_id)
+
+        return [
+            (meal_id, description)
+            for meal_id, description in query.order_by(MealEntry.meal_id).limit(chunk_size)
+        ]
+
+    @staticmethod
+    async def reprocess_chunk(
+        db: Session,
+        chunk: list[tuple[str, str]],
+        concurrency: int,
+        auto_enrich: bool = True,
+        include_stale: bool = False
+    ) -> tuple[int, int]:
+        """
+        Reparse a chunk and write its results in one transaction.
+
+        Meals that stopped qualifying while the LLM ran (the user added or
+        corrected an item, or an async job was queued) are left untouched.
+
+        Args:
+            db: Database session
+            chunk: List of (meal_id, meal_description)
+            concurrency: Maximum meals parsed at once
+            auto_enrich: Whether to fetch detailed nutrition data
+            include_stale: Also treat meals from another parser version as candidates
+
+        Returns:
+            Tuple of (meals updated, meals that failed to parse)
+        """
+        unique = {}
+        for _, description in chunk:
+            unique.setdefault(canonicalize_description(description), description)
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def parse(description: str) -> Optional[list[dict]]:
+            async with semaphore:
+                try:
+                    _, enriched_items = await MealValidationService.parse_and_enrich_meal(
+                        description, db, enrich_nutrition=auto_enrich
+                    )
+                    return enriched_items
+                except Exception:
+                    metrics.increment("meal_reprocess.failures")
+                    return None
+
+        results = await asyncio.gather(*[parse(description) for description in unique.values()])
+        enriched_by_key = dict(zip(unique.keys(), results))
+
+        parser_version = MealParsingAgent.parser_version()
+        # Re-check candidacy: the chunk was selected before the LLM phase
+        meals = {
+            meal.meal_id: meal
+            for meal in db.query(MealEntry).options(*MEAL_TREE_OPTIONS).filter(
+                MealEntry.meal_id.in_([meal_id for meal_id, _ in chunk]),
+                MealReprocessingService.candidate_filter(parser_version, include_stale)
+            )
+        }
+
+        updated = failed = 0
+        for meal_id, description in chunk:
+            enriched_items = enriched_by_key[canonicalize_description(description)]
+            meal = meals.get(meal_id)
+            if meal is None:
+                metrics.increment("meal_reprocess.skipped")
+                continue
+            if enriched_items is None:
+                failed += 1
+                continue
+
+            # Replace earlier agentic items (and their macros)
+            previous = NutritionService.meal_totals(meal)
+            for item in list(meal.meal_items):
+                db.delete(item)
+            db.flush()
+
+            totals = MealProcessingService._add_enriched_items(db, meal, enriched_items)
+            meal.is_processed = True
+            meal.parser_version = parser_version
+            NutritionService.apply_summary_delta(
+                db, meal.user_id, meal.meal_date,
+                NutritionService.combine_totals(totals, NutritionService.combine_totals(previous, sign=-1.0))
+            )
+            updated += 1
+
+        db.commit()
+        metrics.increment("meal_reprocess.updated", updated)
+        return updated, failed
+
+    @staticmethod
+    def rebuild_summaries(db: Session, since: datetime, parser_version: str) -> int:
+        """
+        Recompute daily summaries for every day touched by a run.
+
+        Args:
+            db: Database session
+            since: Run start time
+            parser_version: Parser version written by the run
+
+        Returns:
+            Number of summaries rebuilt
+        """
+        days = db.query(MealEntry.user_id, MealEntry.meal_date).filter(
+            MealEntry.updated_at >= since,
+            MealEntry.parser_version == parser_version
+        ).distinct().all()
+        rebuilt = 0
+        # Bounded chunks keep the (user_id, date) IN list under bind parameter limits
+        for start in range(0, len(days), 500):
+            rebuilt += NutritionService.recompute_summaries(
+                db, days=[tuple(day) for day in days[start:start + 500]]
+            )
+            db.commit()
+        return rebuilt
+
+    @staticmethod
+    async def run(
+        session_factory: Callable[[], Session],
+        checkpoint_path: str,
+        chunk_size: int = 500,
+        concurrency: int = 8,
+        include_stale: bool = False,
+        auto_enrich: bool = True,
+        restart: bool = False,
+        progress: Optional[Callable[[dict], None]] = None
+    ) -> dict:
+        """
+        Reparse every candidate meal, resuming from the checkpoint.
+
+        Args:
+            session_factory: Creates a database session per chunk
+            checkpoint_path: File recording progress after each chunk
+            chunk_size: Meals per chunk (and per write transaction)
+            concurrency: Maximum meals parsed at once
+            include_stale: Also reparse meals from another parser version
+            auto_enrich: Whether to fetch detailed nutrition data
+            restart: Ignore an existing checkpoint
+            progress: Called with the checkpoint after each chunk
+
+        Returns:
+            Final checkpoint with counts and summaries rebuilt
+        """
+        parser_version = MealParsingAgent.parser_version()
+        checkpoint = {} if restart else MealReprocessingService.load_checkpoint(checkpoint_path)
+
+        if checkpoint.get("parser_version") != parser_version or checkpoint.get("done"):
+            checkpoint = {}
+        if not checkpoint:
+            checkpoint = {
+                "parser_version": parser_version,
+                "started_at": datetime.utcnow().isoformat(),
+                "last_meal_id": None,
+                "updated": 0,
+                "failed": 0,
+                "done": False
+            }
+
+        while True:
+            db = session_factory()
+            try:
+                chunk = MealReprocessingService.fetch_chunk(
+                    db, checkpoint["last_meal_id"], chunk_size, parser_version, include_stale
+                )
+                if not chunk:
+                    break
+
+                updated, failed = await MealReprocessingService.reprocess_chunk(
+                    db, chunk, concurrency, auto_enrich, include_stale
+                )
+            finally:
+                db.close()
+
+            checkpoint["last_meal_id"] = chunk[-1][0]
+            checkpoint["updated"] += updated
+            checkpoint["failed"] += failed
+            MealReprocessingService.save_checkpoint(checkpoint_path, checkpoint)
+            if progress is not None:
+                progress(checkpoint)
+
+        db = session_factory()
+        try:
+            checkpoint["summaries_rebuilt"] = MealReprocessingService.rebuild_summaries(
+                db, datetime.fromisoformat(checkpoint["started_at"]), parser_version
+            )
+        finally:
+            db.close()
+
+        checkpoint["done"] = True
+        MealReprocessingService.save_checkpoint(checkpoint_path, checkpoint)
+        return checkpoint
@@ -2,8 +2,10 @@
 
 import uuid
 from datetime import date
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import and_
+from app.core.database import run_in_session
 from app.models import (
     MealEntry, MealItem, Macronutrients, 
     FoodDatabase, DailyNutritionSummary, User
@@ -12,6 +14,15 @@ from app.schemas import (
     MealEntryCreate, MealEntryUpdate, MealItemCreate, 
     MealItemUpdate, MealEntryResponse
 )
+from app.services.nutrition_service import NutritionService
+from app.services.unit_conversion_service import UnitConversionService
+
+
+# Loads the tree serialized by MealEntryResponse (meal -> items -> macros) in
+# one extra query per level instead of one per meal and per item
+MEAL_TREE_OPTIONS = (
+    selectinload(MealEntry.meal_items).selectinload(MealItem.macronutrients),
+)
 
 
 class MealService:
@@ -44,9 +55,14 @@ class MealService:
         db.flush()  # Get meal_id before adding items
         
         # Add meal items if provided
-        if meal_data.meal_items:
-            for item_data in meal_data.meal_items:
-                MealService.add_meal_item(db, meal.meal_id, item_data)
+        totals = []
+        for item_data in meal_data.meal_items or []:
+            MealService._insert_meal_item(db, meal.meal_id, item_data)
+            totals.append(NutritionService.item_totals(item_data.calories, item_data.macronutrients))
+        
+        NutritionService.apply_summary_delta(
+            db, user_id, meal.meal_date, NutritionService.combine_totals(*totals), meal_count=1
+        )
         
         db.commit()
         db.refresh(meal)
@@ -65,10 +81,42 @@ class MealService:
         Returns:
             Meal entry or None
         """
-        return db.query(MealEntry).filter(
+        return db.query(MealEntry).options(*MEAL_TREE_OPTIONS).filter(
             and_(MealEntry.meal_id == meal_id, MealEntry.user_id == user_id)
         ).first()
     
+    @staticmethod
+    def load_meal(db: Session, meal_id: str) -> MealEntry | None:
+        """
+        Load a meal with its items and macros, replacing any stale in-session state.
+        
+        Args:
+            db: Database session
+            meal_id: Meal ID
+            
+        Returns:
+            Meal entry or None
+        """
+        return db.query(MealEntry).options(*MEAL_TREE_OPTIONS).populate_existing().filter(
+            MealEntry.meal_id == meal_id
+        ).first()
+    
+    @staticmethod
+    def load_meal_item(db: Session, item_id: str) -> MealItem | None:
+        """
+        Load a meal item with its macros, replacing any stale in-session state.
+        
+        Args:
+            db: Database session
+            item_id: Item ID
+            
+        Returns:
+            Meal item or None
+        """
+        return db.query(MealItem).options(
+            selectinload(MealItem.macronutrients)
+        ).populate_existing().filter(MealItem.item_id == item_id).first()
+    
     @staticmethod
     def get_user_meals(db: Session, user_id: str, limit: int = 100, offset: int = 0) -> list[MealEntry]:
         """
@@ -83,7 +131,7 @@ class MealService:
         Returns:
             List of meal entries
         """
-        return db.query(MealEntry).filter(
+        return db.query(MealEntry).options(*MEAL_TREE_OPTIONS).filter(
             MealEntry.user_id == user_id
         ).order_by(MealEntry.meal_date.desc()).limit(limit).offset(offset).all()
     
@@ -100,7 +148,7 @@ class MealService:
         Returns:
             List of meal entries
         """
-        return db.query(MealEntry).filter(
+        return db.query(MealEntry).options(*MEAL_TREE_OPTIONS).filter(
             and_(MealEntry.user_id == user_id, MealEntry.meal_date == meal_date)
         ).order_by(MealEntry.meal_time).all()
     
@@ -122,6 +170,8 @@ class MealService:
         if not meal:
             return None
         
+        previous_date = meal.meal_date
+        
         if meal_data.meal_type:
             meal.meal_type = meal_data.meal_type
         if meal_data.meal_description:
@@ -131,6 +181,16 @@ class MealService:
         if meal_data.meal_time:
             meal.meal_time = meal_data.meal_time
         
+        if meal.meal_date != previous_date:
+            # Move the meal's contribution to its new day
+            totals = NutritionService.meal_totals(meal)
+            db.flush()
+            NutritionService.apply_summary_delta(
+                db, user_id, previous_date,
+                NutritionService.combine_totals(totals, sign=-1.0), meal_count=-1
+            )
+            NutritionService.apply_summary_delta(db, user_id, meal.meal_date, totals, meal_count=1)
+        
         db.commit()
         db.refresh(meal)
         return meal
@@ -152,7 +212,14 @@ class MealService:
         if not meal:
             return False
         
+        totals = NutritionService.meal_totals(meal)
         db.delete(meal)
+        db.flush()
+        NutritionService.apply_summary_delta(
+            db, user_id, meal.meal_date,
+            NutritionService.combine_totals(totals, sign=-1.0), meal_count=-1
+        )
+        
         db.commit()
         return True
     
@@ -169,11 +236,39 @@ class MealService:
         Returns:
             Created meal item
         """
+        item = MealService._insert_meal_item(db, meal_id, item_data)
+        
+        meal = db.get(MealEntry, meal_id)
+        NutritionService.apply_summary_delta(
+            db, meal.user_id, meal.meal_date,
+            NutritionService.item_totals(item_data.calories, item_data.macronutrients)
+        )
+        
+        db.commit()
+        db.refresh(item)
+        return item
+    
+    @staticmethod
+    def _insert_meal_item(db: Session, meal_id: str, item_data: MealItemCreate) -> MealItem:
+        """
+        Insert a meal item and its macros without committing.
+        
+        Args:
+            db: Database session
+            meal_id: Meal ID
+            item_data: Item creation data
+            
+        Returns:
+            Created meal item (flushed)
+        """
         item = MealItem(
             meal_id=meal_id,
             food_name=item_data.food_name,
             quantity=item_data.quantity,
             unit=item_data.unit,
+            quantity_grams=UnitConversionService.to_grams(
+                item_data.quantity, item_data.unit, item_data.food_name
+            ),
             calories=item_data.calories or 0.0
         )
         
@@ -193,8 +288,6 @@ class MealService:
             )
             db.add(macro)
         
-        db.commit()
-        db.refresh(item)
         return item
     
     @staticmethod
@@ -214,12 +307,18 @@ class MealService:
         if not item:
             return None
         
+        before = NutritionService.item_totals(item.calories, item.macronutrients)
+        
         if item_data.food_name:
             item.food_name = item_data.food_name
         if item_data.quantity:
             item.quantity = item_data.quantity
         if item_data.unit:
             item.unit = item_data.unit
+        if item_data.food_name or item_data.quantity or item_data.unit:
+            item.quantity_grams = UnitConversionService.to_grams(
+                item.quantity, item.unit, item.food_name
+            )
         if item_data.calories is not None:
             item.calories = item_data.calories
         if item_data.is_verified is not None:
@@ -240,6 +339,16 @@ class MealService:
             macro.sugar_grams = item_data.macronutrients.sugar_grams
             macro.sodium_mg = item_data.macronutrients.sodium_mg
         
+        after = NutritionService.item_totals(
+            item.calories, item_data.macronutrients or item.macronutrients
+        )
+        meal = item.meal_entry
+        db.flush()
+        NutritionService.apply_summary_delta(
+            db, meal.user_id, meal.meal_date,
+            NutritionService.combine_totals(after, NutritionService.combine_totals(before, sign=-1.0))
+        )
+        
         db.commit()
         db.refresh(item)
         return item
@@ -260,7 +369,15 @@ class MealService:
         if not item:
             return False
         
+        totals = NutritionService.item_totals(item.calories, item.macronutrients)
+        meal = item.meal_entry
         db.delete(item)
+        db.flush()
+        NutritionService.apply_summary_delta(
+            db, meal.user_id, meal.meal_date,
+            NutritionService.combine_totals(totals, sign=-1.0)
+        )
+        
         db.commit()
         return True
     
@@ -276,4 +393,73 @@ class MealService:
         Returns:
             List of meal items
         """
-        return db.query(MealItem).filter(MealItem.meal_id == meal_id).all()
+        return db.query(MealItem).options(
+            selectinload(MealItem.macronutrients)
+        ).filter(MealItem.meal_id == meal_id).all()
+
+
+class AsyncMealService:
+    """MealService for AsyncSession; runs the same ORM code without blocking the event loop"""
+    
+    @staticmethod
+    async def create_meal_entry(db: AsyncSession, user_id: str, meal_data: MealEntryCreate) -> MealEntry:
+        """See MealService.create_meal_entry; returns the meal with items loaded"""
+        meal = await run_in_session(db, MealService.create_meal_entry, user_id, meal_data)
+        return await run_in_session(db, MealService.load_meal, meal.meal_id)
+    
+    @staticmethod
+    async def get_meal_by_id(db: AsyncSession, meal_id: str, user_id: str) -> MealEntry | None:
+        """See MealService.get_meal_by_id"""
+        return await run_in_session(db, MealService.get_meal_by_id, meal_id, user_id)
+    
+    @staticmethod
+    async def get_user_meals(db: AsyncSession, user_id: str, limit: int = 100, offset: int = 0) -> list[MealEntry]:
+        """See MealService.get_user_meals"""
+        return await run_in_session(db, MealService.get_user_meals, user_id, limit, offset)
+    
+    @staticmethod
+    async def get_user_meals_by_date(db: AsyncSession, user_id: str, meal_date: date) -> list[MealEntry]:
+        """See MealService.get_user_meals_by_date"""
+        return await run_in_session(db, MealService.get_user_meals_by_date, user_id, meal_date)
+    
+    @staticmethod
+    async def update_meal_entry(
+        db: AsyncSession,
+        meal_id: str,
+        user_id: str,
+        meal_data: MealEntryUpdate
+    ) -> MealEntry | None:
+        """See MealService.update_meal_entry; returns the meal with items loaded"""
+        meal = await run_in_session(db, MealService.update_meal_entry, meal_id, user_id, meal_data)
+        if not meal:
+            return None
+        return await run_in_session(db, MealService.load_meal, meal.meal_id)
+    
+    @staticmethod
+    async def delete_meal_entry(db: AsyncSession, meal_id: str, user_id: str) -> bool:
+        """See MealService.delete_meal_entry"""
+        return await run_in_session(db, MealService.delete_meal_entry, meal_id, user_id)
+    
+    @staticmethod
+    async def add_meal_item(db: AsyncSession, meal_id: str, item_data: MealItemCreate) -> MealItem:
+        """See MealService.add_meal_item; returns the item with macros loaded"""
+        item = await run_in_session(db, MealService.add_meal_item, meal_id, item_data)
+        return await run_in_session(db, MealService.load_meal_item, item.item_id)
+    
+    @staticmethod
+    async def update_meal_item(db: AsyncSession, item_id: str, item_data: MealItemUpdate) -> MealItem | None:
+        """See MealService.update_meal_item; returns the item with macros loaded"""
+        item = await run_in_session(db, MealService.update_meal_item, item_id, item_data)
+        if not item:
+            return None
+        return await run_in_session(db, MealService.load_meal_item, item.item_id)
+    
+    @staticmethod
+    async def delete_meal_item(db: AsyncSession, item_id: str) -> bool:
+        """See MealService.delete_meal_item"""
+        return await run_in_session(db, MealService.delete_meal_item, item_id)
+    
+    @staticmethod
+    async def get_meal_items(db: AsyncSession, meal_id: str) -> list[MealItem]:
+        """See MealService.get_meal_items"""
+        return await run_in_session(db, MealService.get_meal_items, meal_id)
@@ -1,12 +1,17 @@
 """Service layer for nutrition tracking and food database"""
 
-from datetime import date
+from datetime import date, datetime
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, func, insert, select, tuple_, update
+from app.core.database import run_in_session
+from sqlalchemy.dialects import postgresql, sqlite
 from app.models import (
-    DailyNutritionSummary, MealEntry, FoodDatabase
+    DailyNutritionSummary, MealEntry, MealItem, Macronutrients, FoodDatabase
 )
 from app.schemas import FoodDatabaseCreate
+from app.services.unit_conversion_service import UnitConversionService
 
 
 class NutritionService:
@@ -32,10 +37,262 @@ class NutritionService:
             )
         ).first()
     
+    # Summary columns and the item values they total
+    SUMMARY_TOTALS = {
+        "total_calories": "calories",
+        "total_protein": "protein_grams",
+        "total_carbs": "carbs_grams",
+        "total_fat": "fat_grams",
+        "total_fiber": "fiber_grams"
+    }
+    
+    @staticmethod
+    def item_totals(calories: Optional[float], macronutrients) -> dict:
+        """
+        Get the summary contribution of one meal item.
+        
+        Args:
+            calories: Item calories
+            macronutrients: Macronutrients row or schema (None if missing)
+            
+        Returns:
+            Dictionary keyed by summary column
+        """
+        totals = {column: 0.0 for column in NutritionService.SUMMARY_TOTALS}
+        totals["total_calories"] = calories or 0.0
+        if macronutrients is not None:
+            for column, field in NutritionService.SUMMARY_TOTALS.items():
+                if field != "calories":
+                    totals[column] = getattr(macronutrients, field) or 0.0
+        return totals
+    
+    @staticmethod
+    def combine_totals(*totals: dict, sign: float = 1.0) -> dict:
+        """
+        Sum summary contributions, optionally negated.
+        
+        Args:
+            totals: Dictionaries from item_totals
+            sign: 1.0 to add, -1.0 to subtract
+            
+        Returns:
+            Dictionary keyed by summary column
+        """
+        return {
+            column: sign * sum(part.get(column, 0.0) for part in totals)
+            for column in NutritionService.SUMMARY_TOTALS
+        }
+    
+    @staticmethod
+    def meal_totals(meal: MealEntry) -> dict:
+        """
+        Get the summary contribution of a meal's items.
+        
+        Args:
+            meal: Meal entry
+            
+        Returns:
+            Dictionary keyed by summary column
+        """
+        return NutritionService.combine_totals(*[
+            NutritionService.item_totals(item.calories, item.macronutrients)
+            for item in meal.meal_items
+        ])
+    
+    @staticmethod
+    def apply_summary_delta(
+        db: Session,
+        user_id: str,
+        summary_date: date,
+        totals: Optional[dict] = None,
+        meal_count: int = 0
+    ):
+        """
+        Add a nutrient difference to a daily summary (no commit).
+        
+        Call after the meal or item write it accounts for, in the same
+        transaction. The update is a single UPDATE ... SET x = x + delta, so
+        concurrent writers don't lose each other's changes. If the day has
+        no summary yet, it is built from scratch instead.
+        
+        Args:
+            db: Database session
+            user_id: User ID
+            summary_date: Date of the changed meal
+            totals: Difference keyed by summary column (see item_totals)
+            meal_count: Change in number of meals
+        """
+        totals = totals or {}
+        values = {
+            column: getattr(DailyNutritionSummary, column) + totals[column]
+            for column in NutritionService.SUMMARY_TOTALS
+            if totals.get(column)
+        }
+        if meal_count:
+            values["meal_count"] = DailyNutritionSummary.meal_count + meal_count
+        
+        summary_filter = and_(
+            DailyNutritionSummary.user_id == user_id,
+            DailyNutritionSummary.date == summary_date
+        )
+        if not values:
+            if db.query(DailyNutritionSummary.summary_id).filter(summary_filter).first():
+                return
+        elif db.execute(
+            update(DailyNutritionSummary).where(summary_filter).values(**values)
+        ).rowcount:
+            return
+        
+        # First write for the day: the write itself is included once flushed
+        NutritionService.recompute_summaries(db, days=[(user_id, summary_date)])
+    
+    @staticmethod
+    def recompute_summaries(
+        db: Session,
+        user_ids: Optional[list[str]] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        days: Optional[list[tuple[str, date]]] = None
+    ) -> int:
+        """
+        Rebuild daily summaries from meal data in the database (no commit).
+        
+        Totals come from one aggregate query (meals LEFT JOIN items LEFT
+        JOIN macronutrients, grouped by user and date) and are written with
+        one upsert, so backfills and range repairs never load ORM objects.
+        Summaries in scope whose meals are all gone are zeroed. With no
+        arguments every summary is rebuilt.
+        
+        Args:
+            db: Database session
+            user_ids: Limit to these users
+            start_date: First date to rebuild (inclusive)
+            end_date: Last date to rebuild (inclusive)
+            days: Limit to these (user_id, date) pairs
+            
+        Returns:
+            Number of summaries written
+        """
+        def scope(user_column, date_column) -> list:
+            conditions = []
+            if user_ids is not None:
+                conditions.append(user_column.in_(user_ids))
+            if start_date is not None:
+                conditions.append(date_column >= start_date)
+            if end_date is not None:
+                conditions.append(date_column <= end_date)
+            if days is not None:
+                conditions.append(tuple_(user_column, date_column).in_(days))
+            return conditions
+        
+        # Include pending writes (sessions don't autoflush)
+        db.flush()
+        
+        totals = db.execute(
+            select(
+                MealEntry.user_id,
+                MealEntry.meal_date,
+                func.count(func.distinct(MealEntry.meal_id)),
+                func.coalesce(func.sum(MealItem.calories), 0.0),
+                func.coalesce(func.sum(Macronutrients.protein_grams), 0.0),
+                func.coalesce(func.sum(Macronutrients.carbs_grams), 0.0),
+                func.coalesce(func.sum(Macronutrients.fat_grams), 0.0),
+                func.coalesce(func.sum(Macronutrients.fiber_grams), 0.0)
+            )
+            .select_from(MealEntry)
+            .outerjoin(MealItem, MealItem.meal_id == MealEntry.meal_id)
+            .outerjoin(Macronutrients, Macronutrients.item_id == MealItem.item_id)
+            .where(*scope(MealEntry.user_id, MealEntry.meal_date))
+            .group_by(MealEntry.user_id, MealEntry.meal_date)
+        ).all()
+        
+        now = datetime.utcnow()
+        db.execute(
+            update(DailyNutritionSummary)
+            .where(*scope(DailyNutritionSummary.user_id, DailyNutritionSummary.date))
+            .values(
+                meal_count=0,
+                updated_at=now,
+                **{column: 0.0 for column in NutritionService.SUMMARY_TOTALS}
+            )
+            .execution_options(synchronize_session=False)
+        )
+        
+        rows = [
+            {
+                "user_id": user_id,
+                "date": summary_date,
+                "meal_count": meal_count,
+                "total_calories": calories,
+                "total_protein": protein,
+                "total_carbs": carbs,
+                "total_fat": fat,
+                "total_fiber": fiber,
+                "updated_at": now
+            }
+            for user_id, summary_date, meal_count, calories, protein, carbs, fat, fiber in totals
+        ]
+        if rows:
+            NutritionService._upsert_summaries(db, rows)
+        
+        # Summaries already in the session were changed behind its back
+        for summary in [obj for obj in db.identity_map.values() if isinstance(obj, DailyNutritionSummary)]:
+            db.expire(summary)
+        
+        return len(rows)
+    
+    @staticmethod
+    def _upsert_summaries(db: Session, rows: list[dict]):
+        """
+        Insert or overwrite summary rows keyed by (user_id, date).
+        
+        Args:
+            db: Database session
+            rows: Summary column values
+        """
+        table = DailyNutritionSummary.__table__
+        dialect = db.get_bind().dialect.name
+        
+        if dialect in ("sqlite", "postgresql"):
+            dialect_insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+            statement = dialect_insert(table)
+            db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[table.c.user_id, table.c.date],
+                    set_={
+                        key: statement.excluded[key]
+                        for key in rows[0]
+                        if key not in ("user_id", "date")
+                    }
+                ),
+                rows
+            )
+            return
+        
+        # Other databases: update what exists, insert the rest
+        existing = set(db.execute(
+            select(table.c.user_id, table.c.date).where(
+                tuple_(table.c.user_id, table.c.date).in_([(row["user_id"], row["date"]) for row in rows])
+            )
+        ).all())
+        for row in rows:
+            if (row["user_id"], row["date"]) in existing:
+                db.execute(
+                    update(table)
+                    .where(table.c.user_id == row["user_id"], table.c.date == row["date"])
+                    .values(**row)
+                )
+        missing = [row for row in rows if (row["user_id"], row["date"]) not in existing]
+        if missing:
+            db.execute(insert(table), missing)
+    
     @staticmethod
     def update_daily_summary(db: Session, user_id: str, summary_date: date) -> DailyNutritionSummary:
         """
-        Create or update daily nutrition summary by aggregating meal data.
+        Create or fully recompute a daily nutrition summary from meal data.
+        
+        Writes keep summaries current with apply_summary_delta; this is the
+        repair path (and creates summaries for days without one).
         
         Args:
             db: Database session
@@ -45,10 +302,11 @@ class NutritionService:
         Returns:
             Updated daily nutrition summary
         """
-        # Get or create summary
-        summary = NutritionService.get_daily_summary(db, user_id, summary_date)
+        NutritionService.recompute_summaries(db, days=[(user_id, summary_date)])
         
+        summary = NutritionService.get_daily_summary(db, user_id, summary_date)
         if not summary:
+            # Day without meals
             summary = DailyNutritionSummary(
                 user_id=user_id,
                 date=summary_date,
@@ -61,34 +319,6 @@ class NutritionService:
             )
             db.add(summary)
         
-        # Get all meals for the date
-        meals = db.query(MealEntry).filter(
-            and_(
-                MealEntry.user_id == user_id,
-                MealEntry.meal_date == summary_date
-            )
-        ).all()
-        
-        # Reset totals
-        summary.total_calories = 0.0
-        summary.total_protein = 0.0
-        summary.total_carbs = 0.0
-        summary.total_fat = 0.0
-        summary.total_fiber = 0.0
-        summary.meal_count = len(meals)
-        
-        # Aggregate from meal items
-        for meal in meals:
-            for item in meal.meal_items:
-                if item.calories:
-                    summary.total_calories += item.calories
-                
-                if item.macronutrients:
-                    summary.total_protein += item.macronutrients.protein_grams
-                    summary.total_carbs += item.macronutrients.carbs_grams
-                    summary.total_fat += item.macronutrients.fat_grams
-                    summary.total_fiber += item.macronutrients.fiber_grams
-        
         db.commit()
         db.refresh(summary)
         return summary
@@ -116,6 +346,37 @@ class NutritionService:
         ).order_by(DailyNutritionSummary.date.desc()).all()
 
 
+class AsyncNutritionService:
+    """NutritionService for AsyncSession; runs the same ORM code without blocking the event loop"""
+    
+    @staticmethod
+    async def get_daily_summary(db: AsyncSession, user_id: str, summary_date: date) -> DailyNutritionSummary | None:
+        """See NutritionService.get_daily_summary"""
+        return await run_in_session(db, NutritionService.get_daily_summary, user_id, summary_date)
+    
+    @staticmethod
+    async def update_daily_summary(db: AsyncSession, user_id: str, summary_date: date) -> DailyNutritionSummary:
+        """See NutritionService.update_daily_summary"""
+        return await run_in_session(db, NutritionService.update_daily_summary, user_id, summary_date)
+    
+    @staticmethod
+    async def recompute_summaries(db: AsyncSession, **scope) -> int:
+        """See NutritionService.recompute_summaries (no commit)"""
+        return await run_in_session(db, NutritionService.recompute_summaries, **scope)
+    
+    @staticmethod
+    async def get_date_range_summaries(
+        db: AsyncSession,
+        user_id: str,
+        start_date: date,
+        end_date: date
+    ) -> list[DailyNutritionSummary]:
+        """See NutritionService.get_date_range_summaries"""
+        return await run_in_session(
+            db, NutritionService.get_date_range_summaries, user_id, start_date, end_date
+        )
+
+
 class FoodService:
     """Service for food database operations"""
     
@@ -147,7 +408,22 @@ class FoodService:
             food_name=food_data.food_name,
             serving_size=food_data.serving_size,
             serving_unit=food_data.serving_unit,
+            serving_grams=UnitConversionService.to_grams(
+                food_data.serving_size,
+                food_data.serving_unit,
+                food_data.food_name,
+                food_data.density_g_per_ml,
+                food_data.grams_per_piece
+            ),
+            density_g_per_ml=food_data.density_g_per_ml,
+            grams_per_piece=food_data.grams_per_piece,
             calories_per_serving=food_data.calories_per_serving,
+            protein_grams=food_data.protein_grams,
+            carbs_grams=food_data.carbs_grams,
+            fat_grams=food_data.fat_grams,
+            fiber_grams=food_data.fiber_grams,
+            sugar_grams=food_data.sugar_grams,
+            sodium_mg=food_data.sodium_mg,
             category=food_data.category,
             verified_by_usda=False
         )
@@ -219,3 +495,32 @@ class FoodService:
             List of foods
         """
         return db.query(FoodDatabase).limit(limit).offset(offset).all()
+
+
+class AsyncFoodService:
+    """FoodService for AsyncSession; runs the same ORM code without blocking the event loop"""
+    
+    @staticmethod
+    async def create_food(db: AsyncSession, food_data: FoodDatabaseCreate) -> FoodDatabase:
+        """See FoodService.create_food"""
+        return await run_in_session(db, FoodService.create_food, food_data)
+    
+    @staticmethod
+    async def search_food(db: AsyncSession, query: str, limit: int = 10) -> list[FoodDatabase]:
+        """See FoodService.search_food"""
+        return await run_in_session(db, FoodService.search_food, query, limit)
+    
+    @staticmethod
+    async def get_food_by_id(db: AsyncSession, food_id: str) -> FoodDatabase | None:
+        """See FoodService.get_food_by_id"""
+        return await run_in_session(db, FoodService.get_food_by_id, food_id)
+    
+    @staticmethod
+    async def get_foods_by_category(db: AsyncSession, category: str, limit: int = 20) -> list[FoodDatabase]:
+        """See FoodService.get_foods_by_category"""
+        return await run_in_session(db, FoodService.get_foods_by_category, category, limit)
+    
+    @staticmethod
+    async def get_all_foods(db: AsyncSession, limit: int = 100, offset: int = 0) -> list[FoodDatabase]:
+        """See FoodService.get_all_foods"""
+        return await run_in_session(db, FoodService.get_all_foods, limit, offset)
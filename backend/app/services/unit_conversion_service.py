@@ -0,0 +1,139 @@
+"""
+Unit normalization service
+Converts meal item quantities to canonical grams using generic factors and per-food density/piece weights
+"""
+
+import re
+from functools import lru_cache
+from typing import Optional
+
+
+@lru_cache(maxsize=None)
+def _keyword_pattern(keyword: str) -> re.Pattern:
+    """Pattern for a food keyword ending a name; a trailing "*" marks a stem"""
+    if keyword.endswith("*"):
+        return re.compile(rf"\b{re.escape(keyword[:-1])}\w*$")
+    return re.compile(rf"\b{re.escape(keyword)}(?:e?s)?$")
+
+
+class UnitConversionService:
+    """Service for converting quantities to grams"""
+
+    # Generic factors: grams per mass unit, millilitres per volume unit
+    GRAMS_PER_UNIT = {"GRAMS": 1.0, "OUNCES": 28.3495}
+    ML_PER_UNIT = {"ML": 1.0, "CUPS": 240.0, "TABLESPOONS": 15.0, "TEASPOONS": 5.0}
+
+    # Density used for liquids/volumes of unknown foods (water)
+    DEFAULT_DENSITY_G_PER_ML = 1.0
+
+    # Per-food table: keyword -> (density in g/ml, grams per piece).
+    # Keywords match the head noun, i.e. the last word(s) of the name
+    # (plural "s"/"es" allowed); "*" marks a stem.
+    FOOD_TABLE = {
+        "almond": (0.6, 1.2),
+        "apple": (None, 182.0),
+        "avocado": (None, 150.0),
+        "bagel": (None, 105.0),
+        "banana": (None, 118.0),
+        "bread": (None, 30.0),
+        "butter": (0.96, None),
+        "cheese": (0.5, 20.0),
+        "chicken breast": (None, 175.0),
+        "cookie": (None, 15.0),
+        "egg": (None, 50.0),
+        "eggplant": (None, 450.0),
+        "flour": (0.53, None),
+        "grape": (None, 5.0),
+        "grapefruit": (None, 230.0),
+        "honey": (1.42, None),
+        "juice": (1.04, None),
+        "milk": (1.03, None),
+        "oat": (0.34, None),
+        "oatmeal": (0.98, None),
+        "oil": (0.92, None),
+        "orange": (None, 131.0),
+        "pasta": (0.6, None),
+        "peanut butter": (1.08, None),
+        "rice": (0.66, None),
+        "strawberr*": (None, 12.0),
+        "sugar": (0.85, None),
+        "toast": (None, 30.0),
+        "tortilla": (None, 45.0),
+        "yogurt": (1.04, None)
+    }
+
+    @staticmethod
+    def lookup_food(food_name: Optional[str]) -> tuple[Optional[float], Optional[float]]:
+        """
+        Look up density and piece weight for a food name.
+
+        Args:
+            food_name: Food name (matched on the longest keyword that ends
+                it, ignoring qualifiers after a comma, "(" or "with")
+
+        Returns:
+            Tuple of (density in g/ml, grams per piece); either may be None.
+            Dishes whose head noun isn't in the table ("cheese pizza") get
+            (None, None) rather than the values of a modifier.
+        """
+        if not food_name:
+            return None, None
+
+        # "Eggs, whole" / "rice (cooked)" / "toast with butter" -> head part
+        name = re.split(r"[,(]|\bwith\b", food_name.lower())[0].strip()
+        matches = [
+            keyword for keyword in UnitConversionService.FOOD_TABLE
+            if _keyword_pattern(keyword).search(name)
+        ]
+        if not matches:
+            return None, None
+
+        return UnitConversionService.FOOD_TABLE[max(matches, key=len)]
+
+    @staticmethod
+    def to_grams(
+        quantity: Optional[float],
+        unit: Optional[str],
+        food_name: Optional[str] = None,
+        density_g_per_ml: Optional[float] = None,
+        grams_per_piece: Optional[float] = None
+    ) -> Optional[float]:
+        """
+        Convert a quantity to grams.
+
+        Explicit density/piece weight (e.g. from the food database) win over
+        the built-in food table.
+
+        Args:
+            quantity: Amount in the given unit
+            unit: GRAMS, ML, CUPS, PIECES, OUNCES, TABLESPOONS or TEASPOONS
+            food_name: Food name for density/piece-weight lookup
+            density_g_per_ml: Known density of the food
+            grams_per_piece: Known weight of one piece
+
+        Returns:
+            Quantity in grams, or None if it can't be determined
+        """
+        if quantity is None:
+            return None
+
+        unit = (unit or "").upper()
+
+        if unit in UnitConversionService.GRAMS_PER_UNIT:
+            return quantity * UnitConversionService.GRAMS_PER_UNIT[unit]
+
+        table_density, table_piece = UnitConversionService.lookup_food(food_name)
+
+        if unit in UnitConversionService.ML_PER_UNIT:
+            density = (
+                density_g_per_ml
+                or table_density
+                or UnitConversionService.DEFAULT_DENSITY_G_PER_ML
+            )
+            return quantity * UnitConversionService.ML_PER_UNIT[unit] * density
+
+        if unit == "PIECES":
+            piece = grams_per_piece or table_piece
+            return quantity * piece if piece else None
+
+        return None
@@ -3,11 +3,17 @@ Meal validation and data enrichment service
 Handles confidence scoring and data verification
 """
 
-from datetime import date
+import asyncio
+import re
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.models import MealItem, Macronutrients, FoodDatabase
+from app.core.database import release_connection, run_in_session
+from app.models import FoodDatabase
 from app.agents import MealParsingAgent, MealParseResult
+from app.agents.normalization import STOP_WORDS, singularize
 from app.schemas import MacronutrientsBase
+from app.services.unit_conversion_service import UnitConversionService
 
 
 class MealValidationService:
@@ -17,95 +23,311 @@ class MealValidationService:
     MIN_FOOD_CALORIES = 0
     MAX_FOOD_CALORIES = 2000  # Per serving
     
+    # Descriptors ignored when matching names against the food database
+    NEUTRAL_FOOD_WORDS = {"raw", "cooked", "fresh", "whole", "plain", "regular", "organic"}
+    
+    MACRO_FIELDS = [
+        "protein_grams", "carbs_grams", "fat_grams",
+        "fiber_grams", "sugar_grams", "sodium_mg"
+    ]
+    
     @staticmethod
     async def parse_and_enrich_meal(
         meal_description: str,
-        db: Session,
-        enrich_nutrition: bool = True
+        db: Session | AsyncSession,
+        enrich_nutrition: bool = True,
+        parse_result: Optional[MealParseResult] = None,
+        combined: bool = False
     ) -> tuple[MealParseResult, list[dict]]:
         """
         Parse meal description and enrich with nutrition data.
         
+        No database connection is held during LLM calls: the read-only
+        transaction is ended before each one, so peak pool usage doesn't grow
+        with model latency. The caller writes results in its own short
+        transaction afterwards.
+        
         Args:
             meal_description: Raw meal text
-            db: Database session
+            db: Database session (sync or async)
             enrich_nutrition: Whether to fetch detailed macros
+            parse_result: Already parsed items (e.g. from a stream); skips parsing
+            combined: Parse with the combined prompt, which returns macros
+                alongside items so enrichment usually needs no further calls
             
         Returns:
             Tuple of (parse result, enriched items)
         """
-        # Step 1: Parse meal using agent
-        parse_result = await MealParsingAgent.parse_meal(meal_description)
+        # Step 1: Parse meal using agent, with no connection checked out
+        parsed_by_rules = False
+        if parse_result is None:
+            parse_result = MealParsingAgent.parse_meal_fast(meal_description)
+            parsed_by_rules = parse_result is not None
+            if parse_result is None:
+                await run_in_session(db, release_connection)
+                parse_result = await MealParsingAgent.parse_meal(
+                    meal_description, combined, allow_fast=False
+                )
         
-        enriched_items = []
+        # Step 2: Match items against the food database (short read)
+        enriched_items = await run_in_session(
+            db, MealValidationService.match_items, parse_result.items
+        )
+        
+        # Rule-parsed items have no calorie estimate; without enrichment only
+        # a database match or the LLM can supply one
+        if parsed_by_rules and not enrich_nutrition and any(
+            enriched_item["estimated_calories"] is None and enriched_item["macronutrients"] is None
+            for enriched_item in enriched_items
+        ):
+            await run_in_session(db, release_connection)
+            parse_result = await MealParsingAgent.parse_meal(
+                meal_description, combined, allow_fast=False
+            )
+            enriched_items = await run_in_session(
+                db, MealValidationService.match_items, parse_result.items
+            )
+        
+        # Step 3: Ask the LLM only for items the database couldn't cover;
+        # hand the connection back first so it isn't held during the call
+        if enrich_nutrition:
+            pending = [
+                index for index, enriched_item in enumerate(enriched_items)
+                if enriched_item["macronutrients"] is None
+            ]
+            if pending:
+                await run_in_session(db, release_connection)
+            macros_list = await MealValidationService._enrich_items(
+                [parse_result.items[index] for index in pending]
+            )
+            for index, macros in zip(pending, macros_list):
+                if macros:
+                    enriched_items[index]["macronutrients"] = macros
+        
+        # Step 4: Rule-parsed items carry no calorie estimate; derive it
+        for enriched_item in enriched_items:
+            if enriched_item["estimated_calories"] is None and enriched_item["macronutrients"]:
+                enriched_item["estimated_calories"] = (
+                    MealValidationService.calculate_macro_calories(
+                        MacronutrientsBase(**enriched_item["macronutrients"])
+                    )
+                )
+        
+        return parse_result, enriched_items
+    
+    @staticmethod
+    def match_items(db: Session, items: list) -> list[dict]:
+        """
+        Match parsed items against the food database, scaling its
+        per-serving values to the parsed quantity.
         
-        # Step 2: Enrich each item
-        for item in parse_result.items:
+        Args:
+            db: Database session
+            items: Parsed food items
+            
+        Returns:
+            Enriched item dictionaries aligned with items
+        """
+        enriched_items = []
+        for item in items:
             enriched_item = {
                 "food_name": item.food_name,
                 "quantity": item.quantity,
                 "unit": item.unit,
                 "estimated_calories": item.estimated_calories,
                 "confidence_score": item.confidence_score,
-                "macronutrients": None,
+                "quantity_grams": UnitConversionService.to_grams(
+                    item.quantity, item.unit, item.food_name
+                ),
+                "macronutrients": item.macronutrients,
                 "source": "AGENTIC_IDENTIFIED"
             }
             
-            # Try to get nutrition if requested
-            if enrich_nutrition:
-                macros = await MealParsingAgent.enrich_with_nutrition(
-                    item.food_name,
-                    item.quantity,
-                    item.unit
-                )
-                if macros:
-                    enriched_item["macronutrients"] = macros
-            
-            # Try to find in food database for better accuracy
             db_food = MealValidationService._find_similar_food(
                 db, item.food_name
             )
-            if db_food and db_food.calories_per_serving:
-                enriched_item["source"] = "DATABASE_MATCHED"
-                # Adjust calories based on database
-                enriched_item["estimated_calories"] = db_food.calories_per_serving
-                # Increase confidence if found in DB
-                enriched_item["confidence_score"] = min(
-                    1.0,
-                    enriched_item["confidence_score"] + 0.2
+            if db_food:
+                # The matched food's own density/piece weight beat the generic table
+                if db_food.density_g_per_ml or db_food.grams_per_piece:
+                    enriched_item["quantity_grams"] = UnitConversionService.to_grams(
+                        item.quantity,
+                        item.unit,
+                        item.food_name,
+                        db_food.density_g_per_ml,
+                        db_food.grams_per_piece
+                    )
+                scale = MealValidationService._serving_scale(
+                    item.quantity, item.unit, enriched_item["quantity_grams"], db_food
                 )
+                
+                if db_food.calories_per_serving:
+                    enriched_item["source"] = "DATABASE_MATCHED"
+                    # Adjust calories based on database
+                    enriched_item["estimated_calories"] = (
+                        db_food.calories_per_serving * scale
+                        if scale is not None else db_food.calories_per_serving
+                    )
+                    # Increase confidence if found in DB
+                    enriched_item["confidence_score"] = min(
+                        1.0,
+                        enriched_item["confidence_score"] + 0.2
+                    )
+                
+                if scale is not None and db_food.protein_grams is not None:
+                    enriched_item["source"] = "DATABASE_MATCHED"
+                    enriched_item["macronutrients"] = MealValidationService._scale_food_macros(
+                        db_food, scale
+                    )
             
             enriched_items.append(enriched_item)
         
-        return parse_result, enriched_items
+        return enriched_items
+    
+    @staticmethod
+    async def _enrich_items(items: list) -> list[Optional[dict]]:
+        """
+        Fetch macros for all items in one LLM round trip, falling back to
+        per-item calls only for items the batch answer missed.
+        
+        Args:
+            items: Parsed food items
+            
+        Returns:
+            Macronutrient dictionaries (or None) aligned with items
+        """
+        if not items:
+            return []
+        
+        macros_list = await MealParsingAgent.enrich_batch_with_nutrition(items)
+        missing = [
+            index for index, macros in enumerate(macros_list) if macros is None
+        ]
+        
+        # Fan out; LLMService's limiter bounds how many run at once
+        fallback_macros = await asyncio.gather(*[
+            MealParsingAgent.enrich_with_nutrition(
+                items[index].food_name,
+                items[index].quantity,
+                items[index].unit
+            )
+            for index in missing
+        ])
+        for index, macros in zip(missing, fallback_macros):
+            macros_list[index] = macros
+        
+        return macros_list
+    
+    @staticmethod
+    def _serving_scale(
+        quantity: float,
+        unit: str,
+        quantity_grams: Optional[float],
+        food: FoodDatabase
+    ) -> Optional[float]:
+        """
+        Get how many database servings a parsed quantity represents.
+        
+        Args:
+            quantity: Parsed quantity
+            unit: Parsed unit
+            quantity_grams: Parsed quantity normalized to grams
+            food: Matched food
+            
+        Returns:
+            Number of servings, or None if the units can't be compared
+        """
+        if not food.serving_size:
+            return None
+        if (unit or "").upper() == (food.serving_unit or "").upper():
+            return quantity / food.serving_size
+        
+        # Compare in grams; serving_grams is stored at write time
+        serving_grams = food.serving_grams or UnitConversionService.to_grams(
+            food.serving_size,
+            food.serving_unit,
+            food.food_name,
+            food.density_g_per_ml,
+            food.grams_per_piece
+        )
+        if quantity_grams is None or not serving_grams:
+            return None
+        
+        return quantity_grams / serving_grams
+    
+    @staticmethod
+    def _scale_food_macros(food: FoodDatabase, scale: float) -> dict:
+        """
+        Scale a food's per-serving macronutrients.
+        
+        Args:
+            food: Food with per-serving macronutrients
+            scale: Number of servings
+            
+        Returns:
+            Macronutrient dictionary for the scaled amount
+        """
+        return {
+            field: (getattr(food, field) or 0.0) * scale
+            for field in MealValidationService.MACRO_FIELDS
+        }
+    
+    @staticmethod
+    def _name_words(food_name: str) -> set[str]:
+        """
+        Significant words of a food name, singularized.
+        
+        Args:
+            food_name: Food name
+            
+        Returns:
+            Set of words (stop words and 1-2 letter words dropped)
+        """
+        return {
+            singularize(word)
+            for word in re.findall(r"[a-z]+", food_name.lower())
+            if len(word) > 2 and word not in STOP_WORDS
+        }
     
     @staticmethod
     def _find_similar_food(db: Session, food_name: str) -> FoodDatabase | None:
         """
-        Find similar food in database using fuzzy matching.
+        Find the database food with the same significant words as a name.
+        
+        Descriptors like "raw", "cooked" or "whole" are ignored
+        on both sides. Anything else must match exactly: "apple" is not
+        "Apple pie" and "chicken soup" is not "Chicken breast", so those
+        items go to the LLM instead of borrowing another food's values.
         
         Args:
             db: Database session
             food_name: Food name to search
             
         Returns:
-            Best matching food or None
+            Matching food (an identical name first) or None
         """
         from sqlalchemy import func
         
-        # Case-insensitive search
-        words = food_name.lower().split()
+        words = MealValidationService._name_words(food_name) - MealValidationService.NEUTRAL_FOOD_WORDS
+        if not words:
+            return None
+        
+        # Narrow in SQL, then compare word sets here ("berry" is searched as
+        # "berr" so "Blueberries" is a candidate)
+        candidates = db.query(FoodDatabase).filter(*[
+            func.lower(FoodDatabase.food_name).contains(word[:-1] if word.endswith("y") else word)
+            for word in words
+        ]).all()
         
-        # Try to find exact match first
-        for word in words:
-            if len(word) > 3:  # Skip small words
-                food = db.query(FoodDatabase).filter(
-                    func.lower(FoodDatabase.food_name).contains(word)
-                ).first()
-                if food:
-                    return food
+        matches = [
+            food for food in candidates
+            if MealValidationService._name_words(food.food_name)
+            - MealValidationService.NEUTRAL_FOOD_WORDS == words
+        ]
+        if not matches:
+            return None
         
-        return None
+        name = food_name.strip().lower()
+        return min(matches, key=lambda food: (food.food_name.lower() != name, len(food.food_name)))
     
     @staticmethod
     def validate_meal_item(
@@ -0,0 +1,59 @@
+"""
+Standalone meal processing worker
+Leases AI meal processing jobs from the database so processing scales separately from the API
+"""
+
+import argparse
+import asyncio
+import signal
+from app.core.database import AsyncSessionLocal, async_engine, init_db
+from app.core.llm_service import LLMService
+from app.core.settings import settings
+from app.services.meal_job_service import MealJobWorkerPool
+
+
+async def run_worker(concurrency: int):
+    """
+    Run worker tasks until SIGINT/SIGTERM.
+
+    Args:
+        concurrency: Number of jobs processed at once
+    """
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass  # Windows: rely on KeyboardInterrupt
+
+    await LLMService.startup()
+    await MealJobWorkerPool.start(AsyncSessionLocal, workers=concurrency)
+    try:
+        await stop.wait()
+    finally:
+        await MealJobWorkerPool.stop()
+        await LLMService.shutdown()
+        await async_engine.dispose()
+
+
+def main():
+    """Console entry point (pulse-worker)"""
+    parser = argparse.ArgumentParser(description="Process queued AI meal logging jobs")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=max(1, settings.meal_job_workers),
+        help="Jobs processed at once by this process"
+    )
+    args = parser.parse_args()
+
+    init_db()
+    try:
+        asyncio.run(run_worker(args.concurrency))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
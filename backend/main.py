@@ -1,10 +1,14 @@
 """P.U.L.S.E FastAPI Application"""
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer # Import HTTPBearer
-from app.core.database import init_db
+from app.core.database import AsyncSessionLocal, async_engine, init_db
 from app.core.settings import settings
+from app.core.metrics import metrics
+from app.core.llm_service import LLMService
+from app.services.meal_job_service import MealJobWorkerPool
 from app.routes import router as auth_router
 from app.routes.meals import router as meals_router
 from app.routes.nutrition import router as nutrition_router
@@ -24,11 +28,24 @@ security_schemes = {
 # Initialize database
 init_db()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared resources (LLM HTTP pools, warmed models, job workers, DB pools) on startup and close them on shutdown"""
+    await LLMService.startup()
+    await MealJobWorkerPool.start(AsyncSessionLocal)
+    yield
+    await MealJobWorkerPool.stop()
+    await LLMService.shutdown()
+    await async_engine.dispose()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="P.U.L.S.E API",
     description="Personal Unified Lifestyle & Sustenance Engine",
     version="0.3.0",
+    lifespan=lifespan,
     openapi_extra={
         "components": {
             "securitySchemes": security_schemes
@@ -70,6 +87,12 @@ def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics")
+def get_metrics():
+    """Runtime metrics for the LLM pipeline (cache, latency, load)"""
+    return metrics.snapshot()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
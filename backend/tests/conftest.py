@@ -3,7 +3,9 @@ import os
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 # Ensure the backend package root is on sys.path so `import app` works when pytest
 # is invoked from different working directories.
@@ -11,7 +13,8 @@ ROOT = os.path.dirname(os.path.dirname(__file__))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
-from app.core.database import Base, get_db
+from app.core.database import Base, get_async_db, get_db
+from app.core.settings import settings
 from main import app
 
 # Use a temporary file-based SQLite DB for tests so multiple connections
@@ -21,19 +24,41 @@ TEST_DATABASE_URL = f"sqlite:///{TEST_DATABASE_PATH}"
 engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async routes get their own sessions on the same file. Every TestClient runs
+# its own event loop, so don't pool aiosqlite connections across them.
+async_engine = create_async_engine(f"sqlite+aiosqlite:///{TEST_DATABASE_PATH}", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Keep the persistent parse cache out of tests so stubbed responses never leak
+# between runs
+settings.llm_cache_enabled = False
+
+# The lifespan's job workers use the app database; tests run jobs explicitly
+settings.meal_job_workers = 0
+
 # Prevent tests from making real LLM network calls by stubbing the provider
 try:
     from app.core import llm_service
 
-    class _DummyProvider:
-        async def generate(self, prompt: str, max_tokens: int = 1000) -> str:
+    class _DummyProvider(llm_service.LLMProvider):
+        async def generate(self, prompt: str, max_tokens: int = 1000, **kwargs) -> str:
             # Return empty list JSON so parsing returns no items
             return "[]"
 
     llm_service.LLMService._provider = _DummyProvider()
 except Exception:
     # If LLMService isn't available for any reason, continue without stubbing
-    pass
+    _DummyProvider = None
+
+
+@pytest.fixture(autouse=True)
+def stub_llm_provider():
+    # The app lifespan shuts the provider down when a TestClient exits, so
+    # re-install the stub before every test
+    if _DummyProvider is not None:
+        llm_service.LLMService._provider = _DummyProvider()
+        llm_service.LLMService._fallbacks = []
+    yield
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -62,7 +87,30 @@ def client(db_session):
         finally:
             pass
 
+    async def override_get_async_db():
+        # Data written through db_session must be committed to be visible here
+        async with TestingAsyncSessionLocal() as session:
+            yield session
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.pop(get_db, None)
+    app.dependency_overrides.pop(get_async_db, None)
+
+
+@pytest.fixture()
+def auth_headers(db_session):
+    """Create a user directly in the DB and return bearer auth headers for it."""
+    import uuid
+    from app.core.security import create_access_token
+    from app.models import User
+
+    username = f"fixture_{uuid.uuid4().hex[:8]}"
+    user = User(username=username, email=f"{username}@example.com", password_hash="x")
+    db_session.add(user)
+    db_session.commit()
+
+    token = create_access_token(data={"sub": user.user_id, "username": username})
+    return {"Authorization": f"Bearer {token}"}
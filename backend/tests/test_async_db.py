@@ -0,0 +1,39 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.database import Base, run_in_session, to_async_url
+from app.schemas import FoodDatabaseCreate
+from app.services.nutrition_service import AsyncFoodService, FoodService
+
+
+def test_to_async_url_maps_sync_drivers():
+    assert to_async_url("sqlite:///./pulse.db") == "sqlite+aiosqlite:///./pulse.db"
+    assert to_async_url("postgresql://user:secret@db/pulse") == "postgresql+asyncpg://user:secret@db/pulse"
+    assert to_async_url("sqlite+aiosqlite:///./pulse.db") == "sqlite+aiosqlite:///./pulse.db"
+
+
+def test_async_services_share_one_session_across_tasks():
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+
+            async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+                await AsyncFoodService.create_food(db, FoodDatabaseCreate(
+                    food_name="Oatmeal", category="GRAINS", calories_per_100g=68,
+                    serving_size=1, serving_unit="CUP"
+                ))
+                # Concurrent callers on one session are serialized, not interleaved
+                found = await asyncio.gather(*[
+                    AsyncFoodService.search_food(db, "oat") for _ in range(5)
+                ])
+                direct = await run_in_session(db, FoodService.search_food, "oat")
+            return found, direct
+        finally:
+            await engine.dispose()
+
+    found, direct = asyncio.run(run())
+    assert all([food.food_name for food in foods] == ["Oatmeal"] for foods in found)
+    assert [food.food_name for food in direct] == ["Oatmeal"]
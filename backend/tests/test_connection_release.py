@@ -0,0 +1,73 @@
+import asyncio
+from datetime import date
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core import llm_service
+from app.core.database import Base
+from app.core.llm_service import LLMProvider
+from app.core.settings import settings
+from app.models import FoodDatabase, User
+from app.services.meal_processing_service import MealProcessingService
+
+
+PARSED = '[{"food_name": "Oatmeal", "quantity": 1, "unit": "CUP", "estimated_calories": 150, "confidence_score": 0.9}, {"food_name": "mystery stew", "quantity": 1, "unit": "CUP", "estimated_calories": 300, "confidence_score": 0.6}]'
+
+
+def test_ai_logging_holds_no_connection_during_llm_calls(tmp_path, monkeypatch):
+    # A small real pool (aiosqlite defaults to NullPool, which counts nothing)
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=2,
+        max_overflow=0,
+        pool_timeout=5
+    )
+    checked_out = []
+
+    class _SlowProvider(LLMProvider):
+        model = "slow"
+
+        async def generate(self, prompt: str, max_tokens: int = 1000, **kwargs) -> str:
+            checked_out.append(engine.pool.checkedout())
+            await asyncio.sleep(0.05)
+            return PARSED if "Meal Description" in prompt else "{}"
+
+    monkeypatch.setattr(llm_service.LLMService, "_provider", _SlowProvider())
+    monkeypatch.setattr(settings, "fast_parse_enabled", False)
+
+    async def run():
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+
+            sessions = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+            async with sessions() as db:
+                user = User(username="pool", email="pool@example.com", password_hash="x")
+                db.add_all([user, FoodDatabase(
+                    food_name="Oatmeal", category="GRAINS", serving_size=1, serving_unit="CUP",
+                    calories_per_serving=150, protein_grams=5, carbs_grams=27, fat_grams=3
+                )])
+                await db.commit()
+
+            async def log(index: int):
+                # One session per request, as get_async_db provides
+                async with sessions() as db:
+                    return await MealProcessingService.process_meal_with_agent(
+                        db=db,
+                        user_id=user.user_id,
+                        meal_description=f"oatmeal and mystery stew {index}",
+                        meal_type="BREAKFAST",
+                        meal_date=date(2025, 4, 1)
+                    )
+
+            # Five times the pool size; holding connections would exhaust it
+            return await asyncio.gather(*[log(index) for index in range(10)])
+        finally:
+            await engine.dispose()
+
+    meals = asyncio.run(run())
+    assert len(meals) == 10
+    assert all(len(meal.meal_items) == 2 for meal in meals)
+    assert checked_out and max(checked_out) == 0
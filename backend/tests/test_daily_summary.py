@@ -0,0 +1,105 @@
+from datetime import date
+
+from app.core.security import decode_token
+from app.schemas import (
+    MacronutrientsBase, MealEntryCreate, MealEntryUpdate, MealItemCreate, MealItemUpdate
+)
+from app.services.meal_service import MealService
+from app.services.nutrition_service import NutritionService
+
+
+def _summary_values(summary):
+    return (
+        round(summary.total_calories, 6),
+        round(summary.total_protein, 6),
+        round(summary.total_fat, 6),
+        summary.meal_count
+    )
+
+
+def _item(calories, protein):
+    return MealItemCreate(
+        food_name="rice",
+        quantity=1,
+        unit="CUPS",
+        calories=calories,
+        macronutrients=MacronutrientsBase(protein_grams=protein, fat_grams=1)
+    )
+
+
+def test_summary_deltas_match_full_recompute(db_session, auth_headers):
+    user_id = decode_token(auth_headers["Authorization"].split()[1])["sub"]
+    day, other_day = date(2025, 4, 1), date(2025, 4, 2)
+
+    first = MealService.create_meal_entry(db_session, user_id, MealEntryCreate(
+        meal_type="LUNCH", meal_description="rice", meal_date=day,
+        meal_items=[_item(200, 4), _item(100, 2)]
+    ))
+    second = MealService.create_meal_entry(db_session, user_id, MealEntryCreate(
+        meal_type="DINNER", meal_description="rice", meal_date=day, meal_items=[_item(50, 1)]
+    ))
+
+    summary = NutritionService.get_daily_summary(db_session, user_id, day)
+    assert _summary_values(summary) == (350, 7, 3, 2)
+
+    item = MealService.add_meal_item(db_session, first.meal_id, _item(30, 1))
+    MealService.update_meal_item(db_session, item.item_id, MealItemUpdate(calories=80))
+    largest = max(first.meal_items, key=lambda meal_item: meal_item.calories)
+    MealService.delete_meal_item(db_session, largest.item_id)
+    MealService.update_meal_entry(
+        db_session, second.meal_id, user_id, MealEntryUpdate(meal_date=other_day)
+    )
+
+    for summary_date in (day, other_day):
+        db_session.expire_all()
+        incremental = _summary_values(NutritionService.get_daily_summary(db_session, user_id, summary_date))
+        recomputed = _summary_values(NutritionService.update_daily_summary(db_session, user_id, summary_date))
+        assert incremental == recomputed
+
+    assert _summary_values(NutritionService.get_daily_summary(db_session, user_id, day)) == (180, 3, 2, 1)
+
+    MealService.delete_meal_entry(db_session, second.meal_id, user_id)
+    db_session.expire_all()
+    assert _summary_values(NutritionService.get_daily_summary(db_session, user_id, other_day)) == (0, 0, 0, 0)
+
+
+def test_recompute_summaries_aggregates_in_sql(db_session, auth_headers):
+    from sqlalchemy import event
+    from app.models import DailyNutritionSummary, MealEntry
+
+    user_id = decode_token(auth_headers["Authorization"].split()[1])["sub"]
+    days = [date(2025, 5, 1), date(2025, 5, 2), date(2025, 5, 3)]
+    for day in days:
+        for _ in range(3):
+            MealService.create_meal_entry(db_session, user_id, MealEntryCreate(
+                meal_type="SNACK", meal_description="rice", meal_date=day,
+                meal_items=[_item(100, 2), _item(50, 1)]
+            ))
+    # Corrupt the summaries, and drop every meal on the last day behind the service's back
+    db_session.query(DailyNutritionSummary).filter(
+        DailyNutritionSummary.user_id == user_id
+    ).update({"total_calories": -1.0, "meal_count": 99})
+    db_session.query(MealEntry).filter(MealEntry.meal_date == days[2]).delete()
+    db_session.commit()
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        rebuilt = NutritionService.recompute_summaries(
+            db_session, user_ids=[user_id], start_date=days[0], end_date=days[2]
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    db_session.commit()
+
+    # Aggregate, zero the range, upsert
+    assert rebuilt == 2 and len(statements) == 3
+    summaries = NutritionService.get_date_range_summaries(db_session, user_id, days[0], days[2])
+    assert sorted(_summary_values(summary) for summary in summaries) == [
+        (0, 0, 0, 0), (450, 9, 6, 3), (450, 9, 6, 3)
+    ]
@@ -0,0 +1,23 @@
+from sqlalchemy import create_engine, inspect, text
+
+from app.core.database import Base, add_missing_columns
+from app.models import MealItem
+
+
+def test_add_missing_columns_upgrades_old_tables(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        # meal_items as created before quantity_grams existed
+        conn.execute(text(
+            "CREATE TABLE meal_items (item_id VARCHAR PRIMARY KEY, meal_id VARCHAR, food_name VARCHAR, "
+            "quantity FLOAT, unit VARCHAR, calories FLOAT, source VARCHAR, confidence_score FLOAT, "
+            "is_verified BOOLEAN, created_at DATETIME, updated_at DATETIME)"
+        ))
+    Base.metadata.create_all(engine)
+
+    assert "meal_items.quantity_grams" in add_missing_columns(engine)
+    assert add_missing_columns(engine) == []
+    assert {column.name for column in MealItem.__table__.columns} <= {
+        column["name"] for column in inspect(engine).get_columns("meal_items")
+    }
+    engine.dispose()
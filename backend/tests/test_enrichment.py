@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+from app.core import llm_service
+from app.services.validation_service import MealValidationService
+
+
+PARSED_ITEMS = [
+    {"food_name": "egg", "quantity": 2, "unit": "PIECES", "estimated_calories": 140, "confidence_score": 0.9},
+    {"food_name": "toast", "quantity": 1, "unit": "PIECES", "estimated_calories": 80, "confidence_score": 0.8},
+    {"food_name": "orange juice", "quantity": 1, "unit": "CUPS", "estimated_calories": 110, "confidence_score": 0.8},
+]
+
+MACROS = {
+    "protein_grams": 1, "carbs_grams": 2, "fat_grams": 3,
+    "fiber_grams": 0, "sugar_grams": 0, "sodium_mg": 5
+}
+
+
+class _ScriptedProvider:
+    """Answers parse, batch and single-item prompts and records each call"""
+
+    model = "scripted"
+
+    def __init__(self):
+        self.prompts = []
+
+    async def generate(self, prompt: str, max_tokens: int = 1000, **kwargs) -> str:
+        self.prompts.append(prompt)
+        if "Meal Description" in prompt:
+            return json.dumps(PARSED_ITEMS)
+        if "Food items (index" in prompt:
+            # Answer for items 0 and 2 only; item 1 must fall back
+            return json.dumps([dict(MACROS, index=0), dict(MACROS, index=2)])
+        return json.dumps(dict(MACROS, protein_grams=9))
+
+
+def test_batch_enrichment_falls_back_only_for_missing_items(db_session, monkeypatch):
+    provider = _ScriptedProvider()
+    monkeypatch.setattr(llm_service.LLMService, "_provider", provider)
+
+    _, enriched = asyncio.run(
+        MealValidationService.parse_and_enrich_meal("2 eggs, toast and juice", db_session)
+    )
+
+    # 1 parse call + 1 batch call + 1 fallback call for the missing item
+    assert len(provider.prompts) == 3
+    assert [item["macronutrients"]["protein_grams"] for item in enriched] == [1.0, 9.0, 1.0]
+
+
+def test_database_macros_are_scaled_without_llm(db_session, monkeypatch):
+    from app.models import FoodDatabase
+
+    class _FailingProvider:
+        model = "failing"
+
+        async def generate(self, prompt: str, max_tokens: int = 1000, **kwargs) -> str:
+            raise AssertionError("LLM should not be called")
+
+    monkeypatch.setattr(llm_service.LLMService, "_provider", _FailingProvider())
+    db_session.add(FoodDatabase(
+        food_name="Quinoa (cooked)", serving_size=100, serving_unit="GRAMS",
+        calories_per_serving=120, protein_grams=4.4, carbs_grams=21.3, fat_grams=1.9,
+        fiber_grams=2.8, sugar_grams=0.9, sodium_mg=7
+    ))
+    db_session.commit()
+
+    _, enriched = asyncio.run(
+        MealValidationService.parse_and_enrich_meal("150g quinoa", db_session)
+    )
+
+    assert enriched[0]["source"] == "DATABASE_MATCHED"
+    assert enriched[0]["estimated_calories"] == 180
+    assert round(enriched[0]["macronutrients"]["protein_grams"], 2) == 6.6
+
+
+def test_combined_prompt_parses_and_enriches_in_one_call(db_session, monkeypatch):
+    provider = _ScriptedProvider()
+
+    async def generate(prompt: str, max_tokens: int = 1000, **kwargs) -> str:
+        provider.prompts.append(prompt)
+        return json.dumps([dict(item, **MACROS) for item in PARSED_ITEMS])
+
+    provider.generate = generate
+    monkeypatch.setattr(llm_service.LLMService, "_provider", provider)
+
+    parse_result, enriched = asyncio.run(
+        MealValidationService.parse_and_enrich_meal(
+            "2 eggs, toast and juice", db_session, combined=True
+        )
+    )
+
+    assert len(provider.prompts) == 1
+    assert "protein_grams, carbs_grams" in provider.prompts[0]
+    assert parse_result.items[0].macronutrients["sodium_mg"] == 5.0
+    assert all(item["macronutrients"]["fat_grams"] == 3.0 for item in enriched)
@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.agents import MealParsingAgent
+from app.core.llm_service import (
+    AnthropicProvider,
+    LLMService,
+    LocalLLMProvider,
+    OpenAIProvider
+)
+from app.fake_llm import FakeLLMConfig, create_fake_llm_app, fake_completion
+
+
+def _client(app) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://fake")
+
+
+def _providers(app):
+    return [
+        LocalLLMProvider("http://fake", "fake-llm", client=_client(app)),
+        OpenAIProvider("key", client=_client(app), base_url="http://fake"),
+        AnthropicProvider("key", client=_client(app), base_url="http://fake")
+    ]
+
+
+def test_fake_completion_is_deterministic_meal_json():
+    prompt = MealParsingAgent.COMBINED_PROMPT.format(meal_description="2 eggs and 1 cup milk")
+    items = json.loads(fake_completion(prompt))
+    assert [(item["food_name"], item["quantity"], item["unit"]) for item in items] == [
+        ("eggs", 2.0, "PIECES"), ("milk", 1.0, "CUPS")
+    ]
+    assert "protein_grams" in items[0]
+    assert fake_completion(prompt) == json.dumps(items)
+    assert fake_completion("") == ""
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_providers_parse_fake_responses_over_http(stream):
+    app = create_fake_llm_app(FakeLLMConfig(latency_ms=0))
+    prompt = MealParsingAgent.PARSING_PROMPT.format(meal_description="2 eggs and toast")
+    schema = MealParsingAgent.PARSING_SCHEMA
+
+    async def ask(provider):
+        try:
+            if stream:
+                return "".join([chunk async for chunk in provider.generate_stream(prompt, json_schema=schema)])
+            return await provider.generate(prompt, json_schema=schema)
+        finally:
+            await provider.aclose()
+
+    async def scenario():
+        return [await ask(provider) for provider in _providers(app)]
+
+    for text in asyncio.run(scenario()):
+        items = MealParsingAgent.decode_response(text, list)
+        assert [item["food_name"] for item in items] == ["eggs", "toast"]
+
+
+def test_concurrency_cap_queue_and_errors():
+    app = create_fake_llm_app(FakeLLMConfig(latency_ms=20, max_concurrency=2, max_queue=1))
+    server = app.state.server
+
+    async def burst():
+        async with _client(app) as client:
+            responses = await asyncio.gather(*[
+                client.post("/api/generate", json={"prompt": "", "stream": False})
+                for _ in range(5)
+            ])
+        return sorted(response.status_code for response in responses)
+
+    assert asyncio.run(burst()) == [200, 200, 200, 503, 503]
+    assert server.peak_in_flight == 2
+
+    failing = create_fake_llm_app(FakeLLMConfig(latency_ms=0, error_rate=1.0))
+    provider = LocalLLMProvider("http://fake", "fake-llm", client=_client(failing))
+    with pytest.raises(Exception):
+        asyncio.run(provider.generate("x"))
+
+
+def test_llm_service_against_fake_server(monkeypatch):
+    app = create_fake_llm_app(FakeLLMConfig(latency_ms=0))
+    provider = LocalLLMProvider("http://fake", "fake-llm", client=_client(app))
+    monkeypatch.setattr(LLMService, "_provider", provider)
+    monkeypatch.setattr(LLMService, "_fallbacks", [])
+    monkeypatch.setattr(LLMService, "_limiters", {})
+
+    result = asyncio.run(MealParsingAgent.parse_meal("rice and 2 tbsp peanut butter"))
+    assert {item.food_name for item in result.items} == {"rice", "peanut butter"}
+    assert all(item.estimated_calories for item in result.items)
@@ -0,0 +1,37 @@
+import json
+
+import pytest
+
+from app.core.json_parsing import IncrementalJSONArrayParser, extract_json
+
+
+def test_incremental_parser_yields_objects_as_they_complete():
+    text = 'Sure! ```json\n[{"food_name": "egg [large]", "quantity": 2}, {"food_name": "to\\"ast", "quantity": 1}]\n``` done'
+    parser = IncrementalJSONArrayParser()
+
+    decoded = []
+    for index in range(0, len(text), 7):
+        decoded.extend(parser.feed(text[index:index + 7]))
+        if len(decoded) == 1:
+            # First object is available before the second has arrived
+            assert not parser.finished
+
+    assert decoded == [
+        {"food_name": "egg [large]", "quantity": 2},
+        {"food_name": 'to"ast', "quantity": 1},
+    ]
+    assert parser.finished
+
+
+def test_incremental_parser_skips_malformed_elements():
+    parser = IncrementalJSONArrayParser()
+    assert parser.feed('[{"a": 1}, {"b": }, {"c": [1, 2]}]') == [{"a": 1}, {"c": [1, 2]}]
+
+
+def test_extract_json_skips_prose_and_repairs_trailing_commas():
+    text = 'Here you go:\n```json\n[{"food_name": "rice, fried", "quantity": 1,},]\n```\nEnjoy!'
+    assert extract_json(text) == [{"food_name": "rice, fried", "quantity": 1}]
+    assert extract_json('{"protein_grams": 3}') == {"protein_grams": 3}
+
+    with pytest.raises(json.JSONDecodeError):
+        extract_json("I could not find any food in that description.")
@@ -0,0 +1,277 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.core import llm_service
+from app.core.llm_service import LLMService
+
+
+class _SlowProvider:
+    """Sleeps per call and tracks the peak number of concurrent calls"""
+
+    name = "local"
+    model = "slow"
+
+    def __init__(self, delay: float = 0.02):
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+
+    async def generate(self, prompt: str, max_tokens: int = 1000, **kwargs) -> str:
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            return f"echo:{prompt}"
+        finally:
+            self.active -= 1
+
+
+def test_concurrency_limiter_caps_in_flight_requests(monkeypatch):
+    provider = _SlowProvider()
+    monkeypatch.setattr(LLMService, "_provider", provider)
+    monkeypatch.setattr(LLMService, "_limiters", {})
+    monkeypatch.setattr(llm_service.settings, "llm_max_concurrency_local", 2)
+
+    async def burst():
+        return await asyncio.gather(*[LLMService.generate(f"p{i}") for i in range(6)])
+
+    results = asyncio.run(burst())
+
+    assert results == [f"echo:p{i}" for i in range(6)]
+    assert provider.peak == 2
+    stats = LLMService._limiters["local"].stats()
+    assert stats["in_flight"] == 0 and stats["queue_depth"] == 0
+
+
+def test_identical_concurrent_prompts_are_coalesced(monkeypatch):
+    provider = _SlowProvider()
+    monkeypatch.setattr(LLMService, "_provider", provider)
+    monkeypatch.setattr(LLMService, "_limiters", {})
+    monkeypatch.setattr(LLMService, "_inflight", {})
+    before = llm_service.metrics.counter("llm.coalesced_requests")
+
+    async def burst():
+        same = [LLMService.generate("same prompt") for _ in range(4)]
+        different = [LLMService.generate("same prompt", max_tokens=10)]
+        return await asyncio.gather(*same, *different)
+
+    results = asyncio.run(burst())
+
+    assert results == ["echo:same prompt"] * 5
+    assert provider.calls == 2
+    assert llm_service.metrics.counter("llm.coalesced_requests") - before == 3
+    assert LLMService._inflight == {}
+
+
+def test_shutdown_closes_pooled_provider_client(monkeypatch):
+    monkeypatch.setattr(llm_service.settings, "llm_connect_timeout", 1.5)
+    provider = llm_service.LocalLLMProvider("http://localhost:11434", "llama2")
+    monkeypatch.setattr(LLMService, "_provider", provider)
+
+    assert provider.client.timeout.connect == 1.5
+    asyncio.run(LLMService.shutdown())
+
+    assert provider.client.is_closed
+    assert LLMService._provider is None
+
+
+def test_pool_routes_to_least_loaded_and_ejects_failing_node():
+    state = {"a_up": False}
+    hits = {"a": 0, "b": 0}
+
+    async def handler(request):
+        host = request.url.host
+        if request.url.path == "/api/tags":
+            ok = host == "b" or state["a_up"]
+            return httpx.Response(200 if ok else 503, json={})
+        hits[host] += 1
+        if host == "a" and not state["a_up"]:
+            return httpx.Response(500, json={})
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"response": host})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    pool = llm_service.PooledLocalLLMProvider(
+        ["http://a", "http://b"], "llama2", client=client, failure_threshold=2
+    )
+
+    async def scenario():
+        for _ in range(6):
+            try:
+                await pool.generate("hi")
+            except Exception:
+                pass
+        assert not pool.nodes[0].healthy
+        a_hits = hits["a"]
+        await asyncio.gather(*[pool.generate("hi") for _ in range(4)])
+        assert hits["a"] == a_hits  # Ejected node gets no traffic
+
+        state["a_up"] = True
+        await pool.check_health()
+        assert pool.nodes[0].healthy
+
+        # Concurrent requests spread across both nodes
+        results = await asyncio.gather(*[pool.generate("hi") for _ in range(4)])
+        assert sorted(results) == ["a", "a", "b", "b"]
+        await pool.aclose()
+
+    asyncio.run(scenario())
+    assert pool.stats()[1]["latency"]["count"] > 0
+
+
+def test_failed_health_probe_ejects_without_counting_a_request():
+    async def handler(request):
+        return httpx.Response(503, json={})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    pool = llm_service.PooledLocalLLMProvider(["http://a"], "llama2", client=client)
+
+    async def scenario():
+        await pool.check_health()
+        await pool.aclose()
+
+    asyncio.run(scenario())
+    node = pool.stats()[0]
+    assert not node["healthy"]
+    assert (node["requests"], node["failures"], node["probe_failures"]) == (0, 0, 1)
+
+
+class _NamedProvider:
+    def __init__(self, name: str, delay: float = 0.0, fail: bool = False):
+        self.name = name
+        self.model = name
+        self.delay = delay
+        self.fail = fail
+        self.cancelled = False
+
+    async def generate(self, prompt: str, max_tokens: int = 1000, **kwargs) -> str:
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.fail:
+            raise Exception(f"{self.name} down")
+        return self.name
+
+
+def _use_chain(monkeypatch, primary, *fallbacks, hedge_ms=0, deadline=5.0):
+    monkeypatch.setattr(LLMService, "_provider", primary)
+    monkeypatch.setattr(LLMService, "_fallbacks", list(fallbacks))
+    monkeypatch.setattr(LLMService, "_limiters", {})
+    monkeypatch.setattr(LLMService, "_inflight", {})
+    monkeypatch.setattr(llm_service.settings, "llm_hedge_after_ms", hedge_ms)
+    monkeypatch.setattr(llm_service.settings, "llm_request_deadline_seconds", deadline)
+
+
+def test_failed_provider_falls_back_to_next_in_chain(monkeypatch):
+    _use_chain(monkeypatch, _NamedProvider("local", fail=True), _NamedProvider("openai"))
+    assert asyncio.run(LLMService.generate("x")) == "openai"
+
+
+def test_hedged_request_takes_first_answer_and_cancels_loser(monkeypatch):
+    slow = _NamedProvider("local", delay=5)
+    _use_chain(monkeypatch, slow, _NamedProvider("openai", delay=0.01), hedge_ms=20)
+
+    async def run():
+        result = await LLMService.generate("x")
+        await asyncio.sleep(0)  # Let the cancellation land
+        return result
+
+    assert asyncio.run(run()) == "openai"
+    assert slow.cancelled
+
+
+def test_deadline_bounds_a_stalled_provider(monkeypatch):
+    _use_chain(monkeypatch, _NamedProvider("local", delay=5), deadline=0.05)
+    with pytest.raises(Exception, match="deadline"):
+        asyncio.run(LLMService.generate("x"))
+
+
+def test_providers_request_structured_json_output():
+    payloads = []
+
+    async def handler(request):
+        payloads.append(json.loads(request.content))
+        if request.url.path == "/api/generate":
+            return httpx.Response(200, json={"response": "[]"})
+        if request.url.host == "api.openai.com":
+            return httpx.Response(200, json={"choices": [{"message": {"content": "{}"}}]})
+        return httpx.Response(200, json={"content": [{"text": '{"index": 0}]'}]})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    array_schema = {"type": "array", "items": {"type": "object"}}
+    object_schema = {"type": "object"}
+
+    async def scenario():
+        await llm_service.LocalLLMProvider("http://ollama", "llama2", client=client).generate(
+            "p", json_schema=array_schema
+        )
+        openai = llm_service.OpenAIProvider("key", client=client)
+        await openai.generate("p", json_schema=object_schema)
+        await openai.generate("p", json_schema=array_schema)
+        anthropic = llm_service.AnthropicProvider("key", client=client)
+        return await anthropic.generate("p", json_schema=array_schema)
+
+    assert asyncio.run(scenario()) == '[{"index": 0}]'
+    assert payloads[0]["format"] == array_schema
+    assert payloads[1]["response_format"] == {"type": "json_object"}
+    assert "response_format" not in payloads[2]
+    assert payloads[3]["messages"][-1] == {"role": "assistant", "content": "["}
+
+
+def test_parse_failures_are_counted_per_model(monkeypatch):
+    from app.agents import MealParsingAgent
+
+    monkeypatch.setattr(LLMService, "_provider", _NamedProvider("local"))
+    before = llm_service.metrics.counter("llm.parse_failures.local")
+
+    assert MealParsingAgent.decode_response('Sure! {"items": [{"a": 1}]}', list) == [{"a": 1}]
+    with pytest.raises(ValueError):
+        MealParsingAgent.decode_response("no json here", list)
+
+    assert llm_service.metrics.counter("llm.parse_failures.local") - before == 1
+
+
+def test_local_provider_warms_up_in_background_and_keeps_model_loaded(monkeypatch):
+    payloads = []
+    loaded = asyncio.Event()
+
+    async def handler(request):
+        payload = json.loads(request.content)
+        payloads.append(payload)
+        if len(payloads) == 1:
+            # First call loads the model from disk; later calls find it resident
+            await loaded.wait()
+            return httpx.Response(200, json={"response": "", "load_duration": 3e9})
+        return httpx.Response(200, json={"response": "ok", "load_duration": 1e6})
+
+    monkeypatch.setattr(llm_service.settings, "llm_keep_alive", "1h")
+    monkeypatch.setattr(llm_service.settings, "llm_warmup_on_startup", True)
+    monkeypatch.setattr(llm_service.settings, "llm_keep_warm_interval_seconds", 0.01)
+    provider = llm_service.LocalLLMProvider(
+        "http://ollama", "llama2",
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    cold_before = llm_service.metrics.counter("llm.cold_starts")
+
+    async def scenario():
+        await provider.start()
+        # Startup doesn't wait for the model to load
+        await asyncio.wait_for(provider.generate("hi"), timeout=1)
+        loaded.set()
+        await asyncio.sleep(0.05)
+        await provider.aclose()
+
+    asyncio.run(scenario())
+
+    assert payloads[0] == {"model": "llama2", "prompt": "", "keep_alive": "1h"}
+    assert payloads[1]["prompt"] == "hi" and payloads[1]["keep_alive"] == "1h"
+    assert len(payloads) > 2  # Keep-warm pings ran
+    assert llm_service.metrics.counter("llm.cold_starts") - cold_before == 1
+    assert provider._keep_warm_task is None
@@ -0,0 +1,66 @@
+import asyncio
+from datetime import date, datetime, timedelta
+
+from app.models import MealProcessingJob
+from app.services.meal_job_service import MealJobService
+
+
+def _queue_job(db_session, auth_headers):
+    from app.core.security import decode_token
+
+    user_id = decode_token(auth_headers["Authorization"].split()[1])["sub"]
+    return MealJobService.create_meal_job(
+        db_session, user_id, "mystery stew", "DINNER", date(2025, 12, 25), auto_enrich=False
+    )
+
+
+def test_only_one_worker_can_lease_a_job(db_session, auth_headers):
+    job = _queue_job(db_session, auth_headers)
+
+    claimed = MealJobService.claim_next_job(db_session, "worker-a")
+    assert claimed.job_id == job.job_id
+    assert claimed.lease_owner == "worker-a" and claimed.attempts == 1
+    assert MealJobService.claim_next_job(db_session, "worker-b") is None
+    assert MealJobService.renew_lease(db_session, job.job_id, "worker-a")
+    assert not MealJobService.renew_lease(db_session, job.job_id, "worker-b")
+
+
+def test_expired_lease_is_reclaimed_and_stale_worker_discards_results(db_session, auth_headers):
+    job = _queue_job(db_session, auth_headers)
+    stale = MealJobService.claim_next_job(db_session, "worker-a")
+
+    # worker-a stalls past its visibility timeout
+    stale.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db_session.commit()
+
+    reclaimed = MealJobService.claim_next_job(db_session, "worker-b")
+    assert reclaimed.job_id == job.job_id and reclaimed.attempts == 2
+
+    result = asyncio.run(MealJobService.run_job(db_session, stale, "worker-a"))
+    assert result.status == "RUNNING" and result.lease_owner == "worker-b"
+
+    result = asyncio.run(MealJobService.run_job(db_session, reclaimed, "worker-b"))
+    assert result.status == "SUCCEEDED" and result.lease_owner is None
+    assert db_session.get(MealProcessingJob, job.job_id).meal_entry.is_processed
+
+
+def test_worker_runs_jobs_on_async_sessions(db_session, auth_headers):
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from app.core.database import to_async_url
+
+    job = _queue_job(db_session, auth_headers)
+
+    async def run():
+        engine = create_async_engine(to_async_url(str(db_session.get_bind().url)))
+        try:
+            sessions = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+            async with sessions() as db:
+                return await MealJobService.run_next_job(db, "worker-async", sessions)
+        finally:
+            await engine.dispose()
+
+    finished = asyncio.run(run())
+    assert finished.job_id == job.job_id and finished.status == "SUCCEEDED"
+    db_session.expire_all()
+    assert db_session.get(MealProcessingJob, job.job_id).meal_entry.is_processed
@@ -0,0 +1,71 @@
+from datetime import date
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.security import decode_token
+from app.schemas import MacronutrientsBase, MealEntryCreate, MealItemCreate
+from app.services.meal_service import MealService
+
+
+def _log_meals(db_session, user_id, count, meal_date):
+    for index in range(count):
+        MealService.create_meal_entry(db_session, user_id, MealEntryCreate(
+            meal_type="LUNCH",
+            meal_description=f"meal {index}",
+            meal_date=meal_date,
+            meal_items=[
+                MealItemCreate(
+                    food_name=f"food {item}",
+                    quantity=1,
+                    unit="PIECES",
+                    calories=100,
+                    macronutrients=MacronutrientsBase(protein_grams=5)
+                )
+                for item in range(3)
+            ]
+        ))
+
+
+def _count_statements(request):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    # Routes use their own async engine; count statements on every engine
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        response = request()
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+    assert response.status_code == 200
+    return response.json(), len(statements)
+
+
+def test_meal_list_queries_do_not_grow_with_meals(client, db_session, auth_headers):
+    user_id = decode_token(auth_headers["Authorization"].split()[1])["sub"]
+
+    _log_meals(db_session, user_id, 2, date(2025, 3, 1))
+    meals, few = _count_statements(
+        lambda: client.get("/api/meals/date/2025-03-01", headers=auth_headers)
+    )
+    assert len(meals) == 2
+
+    _log_meals(db_session, user_id, 10, date(2025, 3, 1))
+    meals, many = _count_statements(
+        lambda: client.get("/api/meals/date/2025-03-01", headers=auth_headers)
+    )
+    assert len(meals) == 12
+    assert all(item["macronutrients"]["protein_grams"] == 5 for meal in meals for item in meal["meal_items"])
+    assert many == few == 3  # meals, items, macronutrients
+
+    _, listed = _count_statements(
+        lambda: client.get("/api/meals/all", headers=auth_headers)
+    )
+    assert listed == few
+
+    _, single = _count_statements(
+        lambda: client.get(f"/api/meals/{meals[0]['meal_id']}", headers=auth_headers)
+    )
+    assert single == few
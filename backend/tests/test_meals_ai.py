@@ -0,0 +1,149 @@
+import json
+
+from app.core import llm_service
+from app.core.llm_service import LLMProvider
+
+
+STREAMED_ITEMS = '[{"food_name": "egg", "quantity": 2, "unit": "PIECES", "estimated_calories": 140, "confidence_score": 0.9}, {"food_name": "toast", "quantity": 1, "unit": "PIECES", "estimated_calories": 80, "confidence_score": 0.8}]'
+
+
+class _StreamingProvider(LLMProvider):
+    model = "streaming"
+
+    async def generate(self, prompt: str, max_tokens: int = 1000, **kwargs) -> str:
+        return "{}"
+
+    async def generate_stream(self, prompt: str, max_tokens: int = 1000, **kwargs):
+        for index in range(0, len(STREAMED_ITEMS), 16):
+            yield STREAMED_ITEMS[index:index + 16]
+
+
+def _parse_events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_log_ai_stream_emits_items_then_meal(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(llm_service.LLMService, "_provider", _StreamingProvider())
+
+    payload = {
+        "meal_description": "2 eggs and toast",
+        "meal_type": "BREAKFAST",
+        "meal_date": "2025-12-23",
+        "auto_enrich": False
+    }
+    resp = client.post("/api/meals-ai/log-ai/stream", json=payload, headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+
+    events = _parse_events(resp.text)
+    assert [name for name, _ in events] == ["item", "item", "meal"]
+    assert events[0][1]["food_name"] == "egg"
+    meal = events[2][1]
+    assert meal["is_processed"] is True
+    assert sorted(item["food_name"] for item in meal["meal_items"]) == ["egg", "toast"]
+
+
+def test_log_ai_async_returns_202_and_job_completes(client, auth_headers, db_session, monkeypatch):
+    import asyncio
+    from app.services.meal_job_service import MealJobService
+
+    class _ParsingProvider(LLMProvider):
+        model = "parsing"
+
+        async def generate(self, prompt: str, max_tokens: int = 1000, **kwargs) -> str:
+            return STREAMED_ITEMS if "Meal Description" in prompt else "{}"
+
+    monkeypatch.setattr(llm_service.LLMService, "_provider", _ParsingProvider())
+
+    payload = {
+        "meal_description": "scrambled eggs and toast",
+        "meal_type": "BREAKFAST",
+        "meal_date": "2025-12-24",
+        "auto_enrich": False
+    }
+    resp = client.post("/api/meals-ai/log-ai/async", json=payload, headers=auth_headers)
+    assert resp.status_code == 202
+    job = resp.json()
+    assert job["status"] == "PENDING" and job["meal"] is None
+    assert resp.headers["location"].endswith(f"/jobs/{job['job_id']}")
+
+    # The worker pool is disabled in tests; run the queued job directly
+    finished = asyncio.run(MealJobService.run_next_job(db_session, "test-worker"))
+    assert finished.job_id == job["job_id"]
+
+    status = client.get(f"/api/meals-ai/jobs/{job['job_id']}", headers=auth_headers).json()
+    assert status["status"] == "SUCCEEDED"
+    assert status["meal"]["is_processed"] is True
+    assert sorted(item["food_name"] for item in status["meal"]["meal_items"]) == ["egg", "toast"]
+
+    # Deleting the meal takes its job with it
+    assert client.delete(f"/api/meals/{job['meal_id']}", headers=auth_headers).status_code == 204
+    assert client.get(f"/api/meals-ai/jobs/{job['job_id']}", headers=auth_headers).status_code == 404
+
+
+def test_log_ai_batch_dedupes_and_summarizes_each_day_once(client, auth_headers, monkeypatch):
+    from app.services import meal_processing_service
+
+    prompts = []
+
+    class _CountingProvider(LLMProvider):
+        model = "counting"
+
+        async def generate(self, prompt: str, max_tokens: int = 1000, **kwargs) -> str:
+            prompts.append(prompt)
+            return STREAMED_ITEMS
+
+    summary_days = []
+    original_delta = meal_processing_service.NutritionService.apply_summary_delta
+
+    def counting_delta(db, user_id, summary_date, totals=None, meal_count=0):
+        summary_days.append(summary_date)
+        return original_delta(db, user_id, summary_date, totals, meal_count)
+
+    monkeypatch.setattr(llm_service.LLMService, "_provider", _CountingProvider())
+    monkeypatch.setattr(
+        meal_processing_service.NutritionService, "apply_summary_delta", staticmethod(counting_delta)
+    )
+
+    meal = {"meal_type": "BREAKFAST", "auto_enrich": False}
+    payload = {"meals": [
+        dict(meal, meal_description="scrambled eggs and toast", meal_date="2025-12-26"),
+        dict(meal, meal_description="Scrambled  eggs and toast", meal_date="2025-12-27"),
+        dict(meal, meal_description="poached eggs on toast", meal_date="2025-12-27"),
+    ]}
+    resp = client.post("/api/meals-ai/log-ai/batch", json=payload, headers=auth_headers)
+    assert resp.status_code == 200
+
+    meals = resp.json()
+    assert [m["meal_description"] for m in meals] == [m["meal_description"] for m in payload["meals"]]
+    assert all(len(m["meal_items"]) == 2 for m in meals)
+    assert len(prompts) == 2
+    assert sorted(str(day) for day in summary_days) == ["2025-12-26", "2025-12-27"]
+
+
+def test_log_ai_batch_keeps_distinct_meals_apart(client, auth_headers, monkeypatch):
+    import re
+
+    class _EchoProvider(LLMProvider):
+        model = "echo"
+
+        async def generate(self, prompt: str, max_tokens: int = 1000, **kwargs) -> str:
+            description = re.search(r'Meal Description: "(.*)"', prompt).group(1)
+            return json.dumps([{"food_name": description, "quantity": 1, "unit": "CUPS",
+                                "estimated_calories": 100, "confidence_score": 0.9}])
+
+    monkeypatch.setattr(llm_service.LLMService, "_provider", _EchoProvider())
+
+    # Each pair used to share one canonical key
+    descriptions = ["2% milk", "2 milk", "दाल चावल", "寿司"]
+    payload = {"meals": [
+        {"meal_type": "LUNCH", "meal_date": "2025-12-28", "auto_enrich": False, "meal_description": description}
+        for description in descriptions
+    ]}
+    resp = client.post("/api/meals-ai/log-ai/batch", json=payload, headers=auth_headers)
+    assert resp.status_code == 200
+    assert [m["meal_items"][0]["food_name"] for m in resp.json()] == descriptions
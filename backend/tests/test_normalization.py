@@ -0,0 +1,51 @@
+import pytest
+
+from app.agents.normalization import canonicalize_description, singularize
+
+
+@pytest.mark.parametrize("description", [
+    "2 eggs and toast",
+    "toast and two eggs",
+    "2 Eggs & Toast",
+    "Two eggs, toast",
+    "I had 2 eggs with toast",
+])
+def test_equivalent_descriptions_share_a_key(description):
+    assert canonicalize_description(description) == "2 egg, toast"
+
+
+@pytest.mark.parametrize("first, second", [
+    ("2 eggs and toast", "3 eggs and toast"),
+    ("chicken salad", "chicken sandwich"),
+    ("1/2 cup rice", "1 cup rice"),
+    ("2% milk", "2 milk"),
+    ("दाल चावल", "寿司"),
+    ("दाल चावल", "दाल"),
+    ("crème brûlée", "crme brle"),
+])
+def test_different_meals_keep_different_keys(first, second):
+    assert canonicalize_description(first) != canonicalize_description(second)
+
+
+def test_article_after_quantity_is_dropped():
+    assert canonicalize_description("half an avocado") == "0.5 avocado"
+
+
+def test_singularize():
+    assert singularize("berries") == "berry"
+    assert singularize("tomatoes") == "tomato"
+    assert singularize("sandwiches") == "sandwich"
+    assert singularize("oats") == "oats"
+    assert singularize("hummus") == "hummus"
+    assert singularize("glass") == "glass"
+
+
+def test_non_latin_and_accented_text_is_kept():
+    assert canonicalize_description("crème brûlée") == "crème brûlée"
+    assert canonicalize_description("दाल चावल") == "दाल चावल"
+    assert canonicalize_description("寿司") == "寿司"
+
+
+def test_unrecognized_text_falls_back_to_normalized_description():
+    assert canonicalize_description("  ...  ") == "..."
+    assert canonicalize_description("!!") != canonicalize_description("??")
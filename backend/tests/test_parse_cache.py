@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+from app.agents import MealParsingAgent
+from app.agents import parse_cache as parse_cache_module
+from app.agents.parse_cache import ParseCache
+from app.core import llm_service
+from app.core.settings import settings
+
+
+def test_cache_key_ignores_case_and_whitespace():
+    key_a = ParseCache.make_key("2 Eggs  and toast ", "llama2", "1")
+    key_b = ParseCache.make_key("2 eggs and toast", "llama2", "1")
+    assert key_a == key_b
+    assert key_a != ParseCache.make_key("2 eggs and toast", "mistral", "1")
+    assert key_a != ParseCache.make_key("2 eggs and toast", "llama2", "2")
+
+
+def test_cache_key_ignores_item_order_and_phrasing():
+    key = ParseCache.make_key("2 eggs and toast", "llama2", "1")
+    assert ParseCache.make_key("toast and two eggs", "llama2", "1") == key
+    assert ParseCache.make_key("Toast, 2 Eggs", "llama2", "1") == key
+    assert ParseCache.make_key("3 eggs and toast", "llama2", "1") != key
+
+
+def test_cache_persists_counts_and_expires(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = ParseCache(path, ttl_seconds=60, max_entries=10)
+    assert cache.get("k") is None
+    cache.set("k", {"items": []})
+    assert cache.get("k") == {"items": []}
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+    # Survives reopening the store
+    reopened = ParseCache(path, ttl_seconds=60, max_entries=10)
+    assert reopened.get("k") == {"items": []}
+
+    expired = ParseCache(path, ttl_seconds=0, max_entries=10)
+    time.sleep(0.01)
+    assert expired.get("k") is None
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ParseCache(str(tmp_path / "cache.db"), ttl_seconds=60, max_entries=2, touch_interval_seconds=0)
+    cache.set("a", {"v": 1})
+    time.sleep(0.01)
+    cache.set("b", {"v": 2})
+    time.sleep(0.01)
+    cache.get("a")  # "b" is now least recently used
+    time.sleep(0.01)
+    cache.set("c", {"v": 3})
+    assert cache.size() == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1}
+
+
+def test_recent_cache_hits_do_not_write(tmp_path):
+    cache = ParseCache(str(tmp_path / "cache.db"), ttl_seconds=60, max_entries=10)
+    cache.set("a", {"v": 1})
+    writes = cache._conn.total_changes
+    assert [cache.get("a") for _ in range(3)] == [{"v": 1}] * 3
+    assert cache._conn.total_changes == writes
+
+
+def test_parse_meal_uses_cache(monkeypatch):
+    calls = []
+
+    class _CountingProvider:
+        model = "test-model"
+
+        async def generate(self, prompt: str, max_tokens: int = 1000, **kwargs) -> str:
+            calls.append(prompt)
+            return '[{"food_name": "egg", "quantity": 2, "unit": "PIECES", "estimated_calories": 140, "confidence_score": 0.9}]'
+
+    monkeypatch.setattr(settings, "llm_cache_enabled", True)
+    monkeypatch.setattr(settings, "llm_cache_path", ":memory:")
+    monkeypatch.setattr(parse_cache_module, "_parse_cache", None)
+    monkeypatch.setattr(llm_service.LLMService, "_provider", _CountingProvider())
+
+    first = asyncio.run(MealParsingAgent.parse_meal("scrambled eggs"))
+    second = asyncio.run(MealParsingAgent.parse_meal("Scrambled  Eggs"))
+
+    assert len(calls) == 1
+    assert second == first
+    assert second.items[0].food_name == "egg"
+
+
+def test_fallback_answers_are_not_cached_under_primary_model(monkeypatch):
+    calls = []
+
+    class _DownProvider:
+        model = "primary-model"
+
+        async def generate(self, prompt: str, max_tokens: int = 1000, **kwargs) -> str:
+            raise RuntimeError("primary down")
+
+    class _FallbackProvider:
+        model = "fallback-model"
+
+        async def generate(self, prompt: str, max_tokens: int = 1000, **kwargs) -> str:
+            calls.append(prompt)
+            return '[{"food_name": "egg", "quantity": 2, "unit": "PIECES", "estimated_calories": 140, "confidence_score": 0.9}]'
+
+    monkeypatch.setattr(settings, "llm_cache_enabled", True)
+    monkeypatch.setattr(settings, "llm_cache_path", ":memory:")
+    monkeypatch.setattr(parse_cache_module, "_parse_cache", None)
+    monkeypatch.setattr(llm_service.LLMService, "_provider", _DownProvider())
+    monkeypatch.setattr(llm_service.LLMService, "_fallbacks", [_FallbackProvider()])
+
+    asyncio.run(MealParsingAgent.parse_meal("fried eggs"))
+    asyncio.run(MealParsingAgent.parse_meal("fried eggs"))
+
+    assert len(calls) == 2
+    assert parse_cache_module.get_parse_cache().size() == 0
@@ -0,0 +1,106 @@
+import asyncio
+from datetime import date
+
+from app.core import llm_service
+from app.core.llm_service import LLMProvider
+from app.models import MealEntry, MealItem
+from app.services.meal_reprocessing_service import MealReprocessingService
+from tests.conftest import TestingSessionLocal
+
+
+ITEMS = '[{"food_name": "stew", "quantity": 1, "unit": "CUPS", "estimated_calories": 300, "confidence_score": 0.7}]'
+
+
+class _StewProvider(LLMProvider):
+    model = "reparse-model"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def generate(self, prompt: str, max_tokens: int = 1000, **kwargs) -> str:
+        self.calls += 1
+        return ITEMS if "Meal Description" in prompt else "{}"
+
+
+def test_reprocess_resumes_from_checkpoint_and_skips_user_items(db_session, tmp_path, monkeypatch):
+    from app.models import User
+
+    user = User(username="reprocess_user", email="reprocess@example.com", password_hash="x")
+    db_session.add(user)
+    db_session.flush()
+    meals = [
+        MealEntry(user_id=user.user_id, meal_type="DINNER", meal_description=f"beef stew {index}",
+                  meal_date=date(2025, 11, 1 + index % 2), is_processed=False)
+        for index in range(5)
+    ]
+    protected = MealEntry(user_id=user.user_id, meal_type="LUNCH", meal_description="my salad",
+                          meal_date=date(2025, 11, 1), is_processed=False)
+    db_session.add_all(meals + [protected])
+    db_session.flush()
+    db_session.add(MealItem(meal_id=protected.meal_id, food_name="salad", quantity=1,
+                            unit="CUPS", source="USER_INPUT"))
+    db_session.commit()
+
+    provider = _StewProvider()
+    monkeypatch.setattr(llm_service.LLMService, "_provider", provider)
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+
+    # Simulate a crash after the first chunk
+    def crash(checkpoint):
+        raise KeyboardInterrupt
+
+    try:
+        asyncio.run(MealReprocessingService.run(
+            TestingSessionLocal, checkpoint_path, chunk_size=2, progress=crash, auto_enrich=False
+        ))
+    except KeyboardInterrupt:
+        pass
+    assert MealReprocessingService.load_checkpoint(checkpoint_path)["updated"] == 2
+
+    result = asyncio.run(MealReprocessingService.run(
+        TestingSessionLocal, checkpoint_path, chunk_size=2, auto_enrich=False
+    ))
+
+    assert result["done"] and result["updated"] == 5 and result["failed"] == 0
+    assert result["summaries_rebuilt"] == 2
+    assert provider.calls == 5  # Resumed run didn't redo the first chunk
+
+    db_session.expire_all()
+    for meal in meals:
+        assert meal.is_processed and meal.parser_version == "reparse-model/1"
+        assert [item.food_name for item in meal.meal_items] == ["stew"]
+    assert not protected.is_processed
+
+
+def test_reprocess_skips_meals_the_user_edited_during_parsing(db_session, monkeypatch):
+    from app.models import User
+
+    user = User(username="reprocess_race", email="reprocess_race@example.com", password_hash="x")
+    db_session.add(user)
+    db_session.flush()
+    meal = MealEntry(user_id=user.user_id, meal_type="DINNER", meal_description="lamb stew",
+                     meal_date=date(2025, 11, 5), is_processed=False)
+    db_session.add(meal)
+    db_session.commit()
+    meal_id = meal.meal_id
+
+    class _EditingProvider(_StewProvider):
+        async def generate(self, prompt: str, max_tokens: int = 1000, **kwargs) -> str:
+            # The user corrects the meal while the model is still answering
+            with TestingSessionLocal() as other:
+                other.add(MealItem(meal_id=meal_id, food_name="lamb", quantity=200,
+                                   unit="GRAMS", source="MANUAL_CORRECTION"))
+                other.commit()
+            return await super().generate(prompt, max_tokens, **kwargs)
+
+    monkeypatch.setattr(llm_service.LLMService, "_provider", _EditingProvider())
+
+    with TestingSessionLocal() as db:
+        updated, failed = asyncio.run(MealReprocessingService.reprocess_chunk(
+            db, [(meal_id, "lamb stew")], concurrency=1, auto_enrich=False
+        ))
+
+    assert (updated, failed) == (0, 0)
+    db_session.expire_all()
+    assert [item.food_name for item in meal.meal_items] == ["lamb"]
+    assert not meal.is_processed
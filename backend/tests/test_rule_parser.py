@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from app.agents import MealParsingAgent
+from app.agents.rule_parser import RuleBasedMealParser
+from app.core import llm_service
+
+
+@pytest.mark.parametrize("description, expected", [
+    ("2 eggs, 1 cup milk, 30g oats", [("eggs", 2, "PIECES"), ("milk", 1, "CUPS"), ("oats", 30, "GRAMS")]),
+    ("two slices of toast and a banana", [("toast", 2, "PIECES"), ("banana", 1, "PIECES")]),
+    ("1 1/2 cups rice", [("rice", 1.5, "CUPS")]),
+    ("½ cup oatmeal", [("oatmeal", 0.5, "CUPS")]),
+    ("1 l milk", [("milk", 1000, "ML")]),
+    ("3 tbsp peanut butter", [("peanut butter", 3, "TABLESPOONS")]),
+])
+def test_rule_parser_extracts_structured_items(description, expected):
+    items = RuleBasedMealParser.parse(description)
+    assert [(i["food_name"], i["quantity"], i["unit"]) for i in items] == expected
+    assert all(i["confidence_score"] >= 0.8 for i in items)
+
+
+@pytest.mark.parametrize("description", ["apple pie", "some rice", "a bowl of soup", "chicken curry with rice"])
+def test_rule_parser_is_unsure_about_unstructured_text(description):
+    items = RuleBasedMealParser.parse(description)
+    assert min(i["confidence_score"] for i in items) < 0.8
+
+
+def test_parse_meal_skips_llm_for_structured_descriptions(monkeypatch):
+    class _FailingProvider(llm_service.LLMProvider):
+        async def generate(self, prompt: str, max_tokens: int = 1000, **kwargs) -> str:
+            raise AssertionError("LLM should not be called")
+
+    monkeypatch.setattr(llm_service.LLMService, "_provider", _FailingProvider())
+
+    result = asyncio.run(MealParsingAgent.parse_meal("2 eggs, 1 cup milk"))
+    assert [item.food_name for item in result.items] == ["eggs", "milk"]
+    assert not result.requires_verification
+
+
+def test_rule_parser_reads_unit_after_article():
+    [item] = RuleBasedMealParser.parse("half a cup of yogurt")
+    assert (item["food_name"], item["quantity"], item["unit"]) == ("yogurt", 0.5, "CUPS")
+
+
+def test_fast_parse_falls_back_to_llm_when_nothing_supplies_calories(db_session, monkeypatch):
+    from app.services.validation_service import MealValidationService
+
+    class _ParsingProvider(llm_service.LLMProvider):
+        async def generate(self, prompt: str, max_tokens: int = 1000, **kwargs) -> str:
+            return '[{"food_name": "egg", "quantity": 2, "unit": "PIECES", "estimated_calories": 140, "confidence_score": 0.9}, {"food_name": "milk", "quantity": 1, "unit": "CUPS", "estimated_calories": 120, "confidence_score": 0.9}]'
+
+    monkeypatch.setattr(llm_service.LLMService, "_provider", _ParsingProvider())
+
+    _, items = asyncio.run(MealValidationService.parse_and_enrich_meal(
+        "2 eggs, 1 cup milk", db_session, enrich_nutrition=False
+    ))
+    assert [item["estimated_calories"] for item in items] == [140, 120]
@@ -0,0 +1,93 @@
+import asyncio
+
+from app.core import llm_service
+from app.models import FoodDatabase
+from app.services.unit_conversion_service import UnitConversionService
+from app.services.validation_service import MealValidationService
+
+
+def test_to_grams_uses_generic_factors_and_food_table():
+    assert UnitConversionService.to_grams(2, "OUNCES") == 2 * 28.3495
+    assert UnitConversionService.to_grams(1, "CUPS", "whole milk") == 240 * 1.03
+    assert UnitConversionService.to_grams(1, "CUPS", "water") == 240
+    assert UnitConversionService.to_grams(2, "PIECES", "Boiled Egg") == 100
+    assert UnitConversionService.to_grams(1, "PIECES", "eggplant") == 450
+    assert UnitConversionService.to_grams(1, "PIECES", "mystery stew") is None
+
+
+def test_food_table_matches_whole_words():
+    assert UnitConversionService.lookup_food("boiled potatoes") == (None, None)
+    assert UnitConversionService.lookup_food("pineapple") == (None, None)
+    assert UnitConversionService.lookup_food("licorice") == (None, None)
+    assert UnitConversionService.lookup_food("Green Apples") == (None, 182.0)
+    assert UnitConversionService.lookup_food("olive oil") == (0.92, None)
+    assert UnitConversionService.lookup_food("fresh strawberries") == (None, 12.0)
+    assert UnitConversionService.lookup_food("brown rice") == (0.66, None)
+    assert UnitConversionService.lookup_food("Eggs, whole") == (None, 50.0)
+    assert UnitConversionService.lookup_food("toast with butter") == (None, 30.0)
+
+
+def test_lookup_uses_head_noun_not_modifiers():
+    assert UnitConversionService.lookup_food("almond milk") == (1.03, None)
+    assert UnitConversionService.lookup_food("banana bread") == (None, 30.0)
+    assert UnitConversionService.lookup_food("peanut butter") == (1.08, None)
+    assert UnitConversionService.lookup_food("cheese pizza") == (None, None)
+    assert UnitConversionService.lookup_food("egg sandwich") == (None, None)
+    assert UnitConversionService.to_grams(1, "PIECES", "cheese pizza") is None
+
+
+def test_explicit_food_values_override_table():
+    assert UnitConversionService.to_grams(1, "CUPS", "rice", density_g_per_ml=0.8) == 192
+    assert UnitConversionService.to_grams(3, "PIECES", "egg", grams_per_piece=60) == 180
+
+
+def test_database_match_scales_across_units(db_session, monkeypatch):
+    class _FailingProvider:
+        model = "failing"
+
+        async def generate(self, prompt: str, max_tokens: int = 1000, **kwargs) -> str:
+            raise AssertionError("LLM should not be called")
+
+    monkeypatch.setattr(llm_service.LLMService, "_provider", _FailingProvider())
+    db_session.add(FoodDatabase(
+        food_name="Eggs, whole", serving_size=100, serving_unit="GRAMS", serving_grams=100,
+        grams_per_piece=50, calories_per_serving=155, protein_grams=13, carbs_grams=1.1,
+        fat_grams=11, fiber_grams=0, sugar_grams=1.1, sodium_mg=124
+    ))
+    db_session.commit()
+
+    _, enriched = asyncio.run(
+        MealValidationService.parse_and_enrich_meal("3 eggs", db_session)
+    )
+
+    assert enriched[0]["quantity_grams"] == 150
+    assert round(enriched[0]["estimated_calories"], 1) == 232.5
+    assert round(enriched[0]["macronutrients"]["protein_grams"], 1) == 19.5
+
+
+def test_database_match_requires_every_significant_word(db_session):
+    db_session.add_all([
+        FoodDatabase(food_name="Chicken breast", serving_size=100, serving_unit="GRAMS",
+                     calories_per_serving=165, protein_grams=31, carbs_grams=0, fat_grams=3.6),
+        FoodDatabase(food_name="Blueberries, raw", serving_size=1, serving_unit="CUPS",
+                     calories_per_serving=84, protein_grams=1.1, carbs_grams=21, fat_grams=0.5)
+    ])
+    db_session.commit()
+
+    assert MealValidationService._find_similar_food(db_session, "chicken soup") is None
+    assert MealValidationService._find_similar_food(db_session, "chicken") is None
+    assert MealValidationService._find_similar_food(db_session, "chicken breast").food_name == "Chicken breast"
+    assert MealValidationService._find_similar_food(db_session, "blueberries").food_name == "Blueberries, raw"
+
+
+def test_database_match_rejects_foods_with_extra_words(db_session):
+    db_session.add_all([
+        FoodDatabase(food_name="Apple pie", serving_size=1, serving_unit="PIECES", calories_per_serving=300),
+        FoodDatabase(food_name="Chocolate milk", serving_size=1, serving_unit="CUPS", calories_per_serving=210),
+        FoodDatabase(food_name="Apples, raw", serving_size=1, serving_unit="PIECES", calories_per_serving=95)
+    ])
+    db_session.commit()
+
+    assert MealValidationService._find_similar_food(db_session, "apple").food_name == "Apples, raw"
+    assert MealValidationService._find_similar_food(db_session, "fresh apple").food_name == "Apples, raw"
+    assert MealValidationService._find_similar_food(db_session, "milk") is None
@@ -0,0 +1,174 @@
+"""
+Benchmark the combined parse-and-enrich prompt against the two-stage pipeline
+
+Runs each meal description through MealValidationService.parse_and_enrich_meal
+in both modes and reports LLM round trips, estimated tokens and wall time.
+
+Usage:
+    python tools/benchmark_combined_prompt.py              # configured LLM provider
+    python tools/benchmark_combined_prompt.py --simulated  # offline, fixed latency per call
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.llm_service import LLMService
+from app.core.settings import settings
+from app.services.validation_service import MealValidationService
+
+
+MEALS = [
+    "scrambled eggs with buttered toast and a glass of orange juice",
+    "chicken caesar salad and a diet coke",
+    "a bowl of oatmeal with blueberries, honey and almond milk",
+    "leftover pad thai with tofu and some spring rolls",
+    "grilled salmon, brown rice, steamed broccoli and a side salad"
+]
+
+# Rough characters-per-token ratio; providers don't report usage to us
+CHARS_PER_TOKEN = 4
+
+SIMULATED_MACROS = {
+    "protein_grams": 5, "carbs_grams": 20, "fat_grams": 4,
+    "fiber_grams": 2, "sugar_grams": 3, "sodium_mg": 90
+}
+
+
+class _SimulatedProvider:
+    """Answers every prompt shape after a fixed delay"""
+
+    name = "simulated"
+    model = "simulated"
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def generate(self, prompt: str, max_tokens: int = 1000, **kwargs) -> str:
+        await asyncio.sleep(self.latency)
+        description = prompt.split('Meal Description: "', 1)[-1].split('"', 1)[0]
+        names = [part.strip() for part in description.replace(" and ", ",").split(",") if part.strip()]
+
+        if "protein_grams, carbs_grams" in prompt:
+            return json.dumps([
+                dict(SIMULATED_MACROS, food_name=name, quantity=1, unit="PIECES",
+                     estimated_calories=150, confidence_score=0.8)
+                for name in names
+            ])
+        if "Meal Description" in prompt:
+            return json.dumps([
+                {"food_name": name, "quantity": 1, "unit": "PIECES",
+                 "estimated_calories": 150, "confidence_score": 0.8}
+                for name in names
+            ])
+        if "Food items (index" in prompt:
+            count = prompt.count(" - ")
+            return json.dumps([dict(SIMULATED_MACROS, index=index) for index in range(count)])
+        return json.dumps(SIMULATED_MACROS)
+
+
+class _RecordingProvider:
+    """Wraps a provider and records each call"""
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.name = getattr(provider, "name", "local")
+        self.model = getattr(provider, "model", "unknown")
+        self.calls = 0
+        self.prompt_chars = 0
+        self.response_chars = 0
+
+    async def generate(self, prompt: str, max_tokens: int = 1000, **kwargs) -> str:
+        response = await self.provider.generate(prompt, max_tokens, **kwargs)
+        self.calls += 1
+        self.prompt_chars += len(prompt)
+        self.response_chars += len(response)
+        return response
+
+
+async def run_mode(provider, db, combined: bool) -> dict:
+    """
+    Run every benchmark meal in one mode.
+
+    Args:
+        provider: Underlying LLM provider
+        db: Database session for food matching
+        combined: Whether to use the combined prompt
+
+    Returns:
+        Aggregated round trips, estimated tokens and timings
+    """
+    recorder = _RecordingProvider(provider)
+    LLMService._provider = recorder
+    LLMService._fallbacks = []
+
+    timings = []
+    for meal in MEALS:
+        started = time.perf_counter()
+        await MealValidationService.parse_and_enrich_meal(meal, db, combined=combined)
+        timings.append(time.perf_counter() - started)
+
+    return {
+        "mode": "combined" if combined else "two-stage",
+        "round_trips": recorder.calls,
+        "prompt_tokens": recorder.prompt_chars // CHARS_PER_TOKEN,
+        "response_tokens": recorder.response_chars // CHARS_PER_TOKEN,
+        "wall_seconds": sum(timings),
+        "median_seconds": statistics.median(timings)
+    }
+
+
+async def main(simulated: bool, latency: float):
+    # Measure the LLM path: no rule-based shortcut, no cached answers
+    settings.fast_parse_enabled = False
+    settings.llm_cache_enabled = False
+
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+
+    if simulated:
+        provider = _SimulatedProvider(latency)
+    else:
+        await LLMService.startup()
+        provider = LLMService._provider
+    fallbacks = list(LLMService._fallbacks)
+
+    try:
+        results = [
+            await run_mode(provider, db, combined=False),
+            await run_mode(provider, db, combined=True)
+        ]
+    finally:
+        LLMService._provider = provider
+        LLMService._fallbacks = fallbacks
+        if not simulated:
+            await LLMService.shutdown()
+        db.close()
+
+    print(f"{len(MEALS)} meals, tokens estimated at {CHARS_PER_TOKEN} chars/token")
+    print(f"{'mode':<10} {'calls':>6} {'prompt tok':>11} {'resp tok':>9} {'total s':>8} {'median s':>9}")
+    for result in results:
+        print(
+            f"{result['mode']:<10} {result['round_trips']:>6} {result['prompt_tokens']:>11} "
+            f"{result['response_tokens']:>9} {result['wall_seconds']:>8.2f} "
+            f"{result['median_seconds']:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--simulated", action="store_true", help="Use an offline provider")
+    parser.add_argument("--latency", type=float, default=0.5, help="Simulated seconds per call")
+    args = parser.parse_args()
+    asyncio.run(main(args.simulated, args.latency))
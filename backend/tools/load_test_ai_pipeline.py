@@ -0,0 +1,136 @@
+"""
+Load test the AI meal pipeline
+
+Runs MealValidationService.parse_and_enrich_meal for many meals at a fixed
+concurrency and reports throughput and latency percentiles. Point the
+configured provider at a fake server (pulse-fake-llm) to benchmark without a
+model, or use --in-process to run the fake server inside this process.
+
+Usage:
+    pulse-fake-llm --latency-ms 300 --jitter-ms 100 --max-concurrency 4 &
+    LLM_LOCAL_ENDPOINT=http://127.0.0.1:11434 python tools/load_test_ai_pipeline.py -n 200 -c 16
+    python tools/load_test_ai_pipeline.py --in-process --latency-ms 300 -n 200 -c 16
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.llm_service import LLMService, LocalLLMProvider
+from app.core.metrics import TimingStats
+from app.core.settings import settings
+from app.fake_llm import FakeLLMConfig, create_fake_llm_app
+from app.services.validation_service import MealValidationService
+
+
+MEALS = [
+    "scrambled eggs with buttered toast and a glass of orange juice",
+    "chicken caesar salad and a diet coke",
+    "a bowl of oatmeal with blueberries, honey and almond milk",
+    "leftover pad thai with tofu and some spring rolls",
+    "grilled salmon, brown rice, steamed broccoli and a side salad"
+]
+
+
+async def run_load(requests: int, concurrency: int, combined: bool) -> dict:
+    """
+    Parse and enrich meals concurrently through LLMService.
+
+    Args:
+        requests: Total meals to process
+        concurrency: Meals in flight at once
+        combined: Use the combined prompt
+
+    Returns:
+        Throughput, latency and error counts
+    """
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latency = TimingStats()
+    errors = 0
+
+    async def one(index: int):
+        nonlocal errors
+        # Vary descriptions so single-flight doesn't collapse the load
+        meal = f"{MEALS[index % len(MEALS)]} and {index % 7 + 1} crackers"
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await MealValidationService.parse_and_enrich_meal(meal, db, combined=combined)
+            except Exception:
+                errors += 1
+            latency.add(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one(index) for index in range(requests)])
+    elapsed = time.perf_counter() - started
+    db.close()
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "seconds": round(elapsed, 2),
+        "meals_per_second": round(requests / elapsed, 2),
+        "latency": latency.to_dict()
+    }
+
+
+async def main(args: argparse.Namespace):
+    # Measure the LLM path: no rule-based shortcut, no cached answers
+    settings.fast_parse_enabled = False
+    settings.llm_cache_enabled = False
+
+    fake_app = None
+    if args.in_process:
+        fake_app = create_fake_llm_app(FakeLLMConfig(
+            latency_distribution=args.latency_distribution,
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+            max_concurrency=args.server_concurrency,
+            seed=0
+        ))
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=fake_app))
+        LLMService._provider = LocalLLMProvider("http://fake-llm", "fake-llm", client=client)
+        LLMService._fallbacks = []
+
+    try:
+        result = await run_load(args.requests, args.concurrency, args.combined)
+    finally:
+        await LLMService.shutdown()
+
+    for key, value in result.items():
+        print(f"{key}: {value}")
+    if fake_app is not None:
+        print(f"server: {fake_app.state.server.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the AI meal pipeline")
+    parser.add_argument("-n", "--requests", type=int, default=100)
+    parser.add_argument("-c", "--concurrency", type=int, default=8)
+    parser.add_argument("--combined", action="store_true", help="Use the combined prompt")
+    parser.add_argument("--in-process", action="store_true", help="Run the fake server in this process")
+    parser.add_argument(
+        "--latency-distribution",
+        choices=["fixed", "uniform", "exponential", "lognormal"],
+        default="lognormal"
+    )
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--server-concurrency", type=int, default=4)
+    asyncio.run(main(parser.parse_args()))
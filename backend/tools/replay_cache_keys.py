@@ -0,0 +1,83 @@
+"""
+Replay meal descriptions through the parse cache key functions
+
+Compares the hit rate of an exact-string key (lowercase, collapsed whitespace)
+with the canonical key used by ParseCache, assuming an unbounded cache.
+
+Usage:
+    python tools/replay_cache_keys.py descriptions.txt   # one description per line
+    python tools/replay_cache_keys.py --from-db          # meal_entries, oldest first
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.agents.normalization import canonicalize_description
+
+
+def exact_key(meal_description: str) -> str:
+    """Key used before canonicalization"""
+    return " ".join(meal_description.lower().split())
+
+
+def hit_rate(descriptions: list[str], key_function) -> float:
+    """
+    Replay descriptions against an unbounded cache.
+
+    Args:
+        descriptions: Descriptions in arrival order
+        key_function: Maps a description to its cache key
+
+    Returns:
+        Fraction of lookups that were hits
+    """
+    seen = set()
+    hits = 0
+    for description in descriptions:
+        key = key_function(description)
+        if key in seen:
+            hits += 1
+        seen.add(key)
+    return hits / len(descriptions) if descriptions else 0.0
+
+
+def load_from_db() -> list[str]:
+    from app.core.database import SessionLocal
+    from app.models import MealEntry
+
+    db = SessionLocal()
+    try:
+        return [
+            description
+            for (description,) in db.query(MealEntry.meal_description).order_by(MealEntry.created_at)
+        ]
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", nargs="?", help="File with one description per line")
+    parser.add_argument("--from-db", action="store_true", help="Replay stored meal descriptions")
+    args = parser.parse_args()
+
+    if args.from_db:
+        descriptions = load_from_db()
+    elif args.path:
+        descriptions = [line.strip() for line in open(args.path) if line.strip()]
+    else:
+        parser.error("give a descriptions file or --from-db")
+
+    exact = hit_rate(descriptions, exact_key)
+    canonical = hit_rate(descriptions, canonicalize_description)
+    print(f"descriptions: {len(descriptions)}")
+    print(f"exact key hit rate:     {exact:.1%}")
+    print(f"canonical key hit rate: {canonical:.1%}")
+    print(f"improvement:            {canonical - exact:+.1%}")
+
+
+if __name__ == "__main__":
+    main()